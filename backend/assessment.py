@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy import and_, func, literal, select, union_all
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
+import json
 
+from async_db import read_handler
 from db import SessionLocal
 from models import (
     Course,
@@ -12,6 +15,7 @@ from models import (
     CandidateAssessment,
     CandidateTaskProgress,
 )
+from content_cache import cache as content_cache, etag_matches, make_etag
 
 from pydantic import BaseModel
 
@@ -79,145 +83,245 @@ router = APIRouter(
 # Helper logic
 # -----------------------------
 
-def compute_task_unlocked(task, level_tasks, completed_task_ids, level_unlocked):
+def unlock_level_tasks(sorted_tasks, completed_task_ids, level_unlocked):
+    """
+    Unlock state for a level's tasks (sorted by order) in one pass:
+    a content task needs the task right before it completed, an assessment
+    task needs every earlier content task completed.
+    """
     if not level_unlocked:
-        return False
+        return [False] * len(sorted_tasks)
+
+    unlocked = []
+    prev_task_id = None       # first task of the closest lower order
+    contents_done = True      # every content task with a lower order is completed
+    group_order = None
+    group_first = None
+    group_contents_done = True
+
+    for task in sorted_tasks:
+        if task["order"] != group_order:
+            # entering a new order: fold the previous group into the running state
+            if group_order is not None:
+                prev_task_id = group_first
+                contents_done = contents_done and group_contents_done
+            group_order, group_first, group_contents_done = task["order"], task["task_id"], True
+
+        if task["order"] == 1:
+            unlocked.append(True)
+        elif task["type"] == "content":
+            unlocked.append(prev_task_id is None or prev_task_id in completed_task_ids)
+        elif task["type"] == "assessment":
+            unlocked.append(contents_done)
+        else:
+            unlocked.append(False)
+
+        if task["type"] == "content" and task["task_id"] not in completed_task_ids:
+            group_contents_done = False
+
+    return unlocked
+
+
+def load_course_tree(db: Session, course_id: int):
+    """
+    Course -> levels -> tasks (both sorted by order) plus the course's first
+    active assessment (the one list_courses shows), as plain dicts, in two
+    queries. Returns None if the course does not exist.
+    """
+    head = db.execute(
+        select(Course.course_id, Assessment.assessment_id, Assessment.time_limit_minutes)
+        .outerjoin(Assessment, and_(Assessment.course_id == Course.course_id, Assessment.is_active.isnot(False)))
+        .where(Course.course_id == course_id)
+        .order_by(Assessment.assessment_id)
+        .limit(1)
+    ).first()
+    if head is None:
+        return None
 
-    if task.order == 1:
-        return True
+    rows = db.execute(
+        select(
+            Level.level_id, Level.name, Level.order.label("level_order"),
+            Task.task_id, Task.type, Task.title, Task.content, Task.order,
+        )
+        .outerjoin(Task, Task.level_id == Level.level_id)
+        .where(Level.course_id == course_id)
+        .order_by(Level.order, Level.level_id, Task.order, Task.task_id)
+    ).all()
+
+    levels = []
+    for r in rows:
+        if not levels or levels[-1]["level_id"] != r.level_id:
+            levels.append({"level_id": r.level_id, "name": r.name, "order": r.level_order, "tasks": []})
+        if r.task_id is not None:
+            levels[-1]["tasks"].append({
+                "task_id": r.task_id,
+                "type": r.type,
+                "title": r.title,
+                "content": r.content,
+                "order": r.order,
+            })
 
-    previous_tasks = [t for t in level_tasks if t.order < task.order]
+    return {
+        "assessment_id": head.assessment_id if head.assessment_id is not None else course_id,
+        "time_limit_minutes": head.time_limit_minutes if head.assessment_id is not None else 60,
+        "levels": levels,
+    }
 
-    if task.type == "content":
-        prev_task = max(previous_tasks, key=lambda t: t.order)
-        return prev_task.task_id in completed_task_ids
 
-    if task.type == "assessment":
-        required_lessons = [
-            t.task_id for t in previous_tasks if t.type == "content"
-        ]
-        return all(tid in completed_task_ids for tid in required_lessons)
+def payload_size(payload) -> int:
+    return len(json.dumps(payload, default=str))
+
+
+def get_course_tree(db: Session, course_id: int):
+    """Cached load_course_tree; returns (etag, tree) or None."""
+    key = ("course", course_id)
+    version = content_cache.version
+    cached = content_cache.get(key)
+    if cached is not None:
+        return cached
+
+    tree = load_course_tree(db, course_id)
+    if tree is None:
+        return None
+    children = [("level", level["level_id"]) for level in tree["levels"]]
+    children += [("task", task["task_id"]) for level in tree["levels"] for task in level["tasks"]]
+    etag = content_cache.put(key, tree, payload_size(tree), children, version)
+    return etag, tree
+
+
+def load_course_progress(db: Session, candidate_id: int, course_id: int):
+    """
+    The candidate's completed task ids and completed-assessment level ids
+    within one course, in a single query.
+    """
+    course_tasks = (
+        select(Task.task_id, Task.level_id)
+        .join(Level, Level.level_id == Task.level_id)
+        .where(Level.course_id == course_id)
+        .subquery()
+    )
+    rows = db.execute(
+        union_all(
+            select(literal("task"), course_tasks.c.task_id)
+            .join(CandidateTaskProgress, CandidateTaskProgress.task_id == course_tasks.c.task_id)
+            .where(CandidateTaskProgress.candidate_id == candidate_id),
+            # assessment results are keyed by the assessment task's id
+            select(literal("level"), course_tasks.c.level_id)
+            .join(CandidateAssessment, CandidateAssessment.assessment_id == course_tasks.c.task_id)
+            .where(CandidateAssessment.candidate_id == candidate_id),
+        )
+    ).all()
 
-    return False
+    completed_task_ids = {value for kind, value in rows if kind == "task"}
+    completed_levels = {value for kind, value in rows if kind == "level"}
+    return completed_task_ids, completed_levels
 
 # -----------------------------
 # Routes
 # -----------------------------
 
 @router.get("/", response_model=List[CourseListOut])
+@read_handler
 def list_courses(candidate_id: int = Query(...), db: Session = Depends(get_db)):
-    courses = db.query(Course).all()
-    result = []
-
-    completed_assessments = {
-        ca.assessment_id: ca
-        for ca in db.query(CandidateAssessment)
-        .filter(CandidateAssessment.candidate_id == candidate_id)
-        .all()
-    }
-
-    for course in courses:
-        assessment = (
-            db.query(Assessment)
-            .filter(Assessment.course_id == course.course_id)
-            .first()
+    # first active assessment per course
+    first_assessment = (
+        select(
+            Assessment.course_id,
+            func.min(Assessment.assessment_id).label("assessment_id"),
         )
+        .where(Assessment.is_active.isnot(False))
+        .group_by(Assessment.course_id)
+        .subquery()
+    )
 
-        completed = False
-        score = None
-
-        if assessment and assessment.assessment_id in completed_assessments:
-            completed = True
-            score = completed_assessments[assessment.assessment_id].total_score
-
-        result.append(CourseListOut(
-            course_id=course.course_id,
-            description=course.description,
-            difficulty_level=course.difficulty_level,
-            time_limit_minutes=assessment.time_limit_minutes if assessment else 60,
-            is_completed=completed,
-            score=score
-        ))
-
-    return result
+    # catalogue + assessment + this candidate's result in one statement
+    rows = db.execute(
+        select(
+            Course.course_id,
+            Course.description,
+            Course.difficulty_level,
+            Assessment.time_limit_minutes,
+            CandidateAssessment.candidate_assessment_id,
+            CandidateAssessment.total_score,
+        )
+        .outerjoin(first_assessment, first_assessment.c.course_id == Course.course_id)
+        .outerjoin(Assessment, Assessment.assessment_id == first_assessment.c.assessment_id)
+        .outerjoin(
+            CandidateAssessment,
+            and_(
+                CandidateAssessment.assessment_id == Assessment.assessment_id,
+                CandidateAssessment.candidate_id == candidate_id,
+            ),
+        )
+        .order_by(Course.course_id)
+    ).all()
+
+    return [
+        CourseListOut(
+            course_id=r.course_id,
+            description=r.description,
+            difficulty_level=r.difficulty_level,
+            time_limit_minutes=r.time_limit_minutes if r.time_limit_minutes is not None else 60,
+            is_completed=r.candidate_assessment_id is not None,
+            score=r.total_score,
+        )
+        for r in rows
+    ]
 
 
 @router.get("/{course_id}", response_model=AssessmentDetailOut)
+@read_handler
 def get_course_detail(
     course_id: int,
+    response: Response,
     candidate_id: int = Query(...),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
-    course = db.query(Course).filter(Course.course_id == course_id).first()
-    if not course:
+    cached = get_course_tree(db, course_id)
+    if cached is None:
         raise HTTPException(status_code=404, detail="Course not found")
+    content_etag, tree = cached
 
-    completed_task_ids = {
-        p.task_id
-        for p in db.query(CandidateTaskProgress)
-        .filter(CandidateTaskProgress.candidate_id == candidate_id)
-        .all()
-    }
-
-    completed_assessment_levels = set()
-    completed_assessments = (
-        db.query(CandidateAssessment)
-        .filter(CandidateAssessment.candidate_id == candidate_id)
-        .all()
-    )
+    completed_task_ids, completed_assessment_levels = load_course_progress(db, candidate_id, course_id)
 
-    for ca in completed_assessments:
-        task = db.query(Task).filter(Task.task_id == ca.assessment_id).first()
-        if task:
-            completed_assessment_levels.add(task.level_id)
+    # the response is content + this candidate's progress overlay
+    etag = make_etag(content_etag, candidate_id, sorted(completed_task_ids), sorted(completed_assessment_levels))
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
 
     levels_out = []
-    sorted_levels = sorted(course.levels, key=lambda l: l.order)
+    prev_level = None
 
-    for idx, level in enumerate(sorted_levels):
-        if level.order == 1:
+    for level in tree["levels"]:
+        if level["order"] == 1:
             level_unlocked = True
         else:
-            prev_level = sorted_levels[idx - 1]
-            level_unlocked = prev_level.level_id in completed_assessment_levels
-
-        tasks_out = []
-        sorted_tasks = sorted(level.tasks, key=lambda t: t.order)
-
-        for task in sorted_tasks:
-            unlocked = compute_task_unlocked(
-                task,
-                sorted_tasks,
-                completed_task_ids,
-                level_unlocked
-            )
-
-            tasks_out.append(TaskOut(
-                task_id=task.task_id,
-                type=task.type,
-                title=task.title,
-                content=task.content,
-                order=task.order,
-                completed=task.task_id in completed_task_ids,
-                unlocked=unlocked
-            ))
+            level_unlocked = prev_level is not None and prev_level["level_id"] in completed_assessment_levels
+        prev_level = level
+
+        tasks = level["tasks"]
+        unlocked = unlock_level_tasks(tasks, completed_task_ids, level_unlocked)
 
         levels_out.append(LevelOut(
-            level_id=level.level_id,
-            name=level.name,
-            order=level.order,
-            tasks=tasks_out
+            level_id=level["level_id"],
+            name=level["name"],
+            order=level["order"],
+            tasks=[
+                TaskOut(
+                    **task,
+                    completed=task["task_id"] in completed_task_ids,
+                    unlocked=is_unlocked
+                )
+                for task, is_unlocked in zip(tasks, unlocked)
+            ]
         ))
 
-    assessment = (
-        db.query(Assessment)
-        .filter(Assessment.course_id == course.course_id)
-        .first()
-    )
-
     return AssessmentDetailOut(
-        assessment_id=assessment.assessment_id if assessment else course.course_id,
-        time_limit_minutes=assessment.time_limit_minutes if assessment else 60,
+        assessment_id=tree["assessment_id"],
+        time_limit_minutes=tree["time_limit_minutes"],
         levels=levels_out
     )
 
@@ -251,14 +355,32 @@ def complete_task(data: TaskCompleteIn, db: Session = Depends(get_db)):
     return {"status": "completed"}
 
 @router.get("/tasks/{task_id}")
-def get_task(task_id: int, db: Session = Depends(get_db)):
-    task = db.query(Task).filter(Task.task_id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    return {
-        "task_id": task.task_id,
-        "title": task.title,
-        "content": task.content,
-        "type": task.type
-    }
+@read_handler
+def get_task(
+    task_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    key = ("task", task_id)
+    version = content_cache.version
+    cached = content_cache.get(key)
+    if cached is None:
+        task = db.get(Task, task_id)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+
+        payload = {
+            "task_id": task.task_id,
+            "title": task.title,
+            "content": task.content,
+            "type": task.type
+        }
+        cached = content_cache.put(key, payload, payload_size(payload), version=version), payload
+    etag, payload = cached
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return payload
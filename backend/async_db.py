@@ -0,0 +1,128 @@
+# asyncio variant of db.py for `async def` endpoints
+# Same database, pool settings and SQLite pragmas as the sync engine, driven
+# through an async driver (aiosqlite locally, asyncpg for postgresql:// URLs).
+import functools
+import inspect
+import os
+
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from db import (
+    DATABASE_URL,
+    MAX_OVERFLOW,
+    POOL_RECYCLE,
+    POOL_SIZE,
+    POOL_TIMEOUT,
+    SessionLocal,
+    _set_sqlite_pragmas,
+)
+
+# hot read endpoints (see read_handler) run as async def on an AsyncSession.
+# Off for SQLite: aiosqlite funnels every statement through one thread per
+# connection, and sync handlers on the threadpool measured ~2.6x the
+# throughput (benchmarks/bench_async_load.py); networked databases gain
+ASYNC_READS = os.getenv("DB_ASYNC_READS", "0" if DATABASE_URL.startswith("sqlite") else "1") == "1"
+
+# sync driver URL prefix -> async driver URL prefix
+ASYNC_DRIVERS = {
+    "sqlite://": "sqlite+aiosqlite://",
+    "postgresql://": "postgresql+asyncpg://",
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+}
+
+
+def async_url(url: str) -> str:
+    """Rewrite a sync database URL to its async driver; explicit drivers are kept."""
+    for sync_prefix, async_prefix in ASYNC_DRIVERS.items():
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+
+def make_async_engine(url: str = DATABASE_URL, **kwargs):
+    """Async counterpart of db.make_engine."""
+    url = async_url(url)
+    if url.startswith("sqlite"):
+        in_memory = url.endswith(":memory:") or url.endswith("://") or "mode=memory" in url
+        options = {}
+        if in_memory:
+            options["poolclass"] = StaticPool
+        else:
+            options.update(pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW, pool_timeout=POOL_TIMEOUT)
+        options.update(kwargs)
+
+        eng = create_async_engine(url, **options)
+        if not in_memory:
+            event.listen(eng.sync_engine, "connect", _set_sqlite_pragmas)
+        return eng
+
+    options = dict(
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+    options.update(kwargs)
+    return create_async_engine(url, **options)
+
+
+async_engine = make_async_engine(DATABASE_URL)
+
+# AsyncSession wraps a sync Session; using SessionLocal's class keeps the
+# session hooks (match_tracker, content_cache) firing for async writes too
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    sync_session_class=SessionLocal.class_,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def read_handler(fn):
+    """
+    Route a sync handler whose `db` parameter is a Session. With
+    ASYNC_READS off it is returned unchanged (FastAPI runs it on the
+    threadpool); otherwise it becomes an async def that takes an
+    AsyncSession and runs the handler on it with run_sync.
+    """
+    if not ASYNC_READS:
+        return fn
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    async def endpoint(**kwargs):
+        db = kwargs.pop("db")
+        return await db.run_sync(lambda session: fn(db=session, **kwargs))
+
+    endpoint.__signature__ = signature.replace(parameters=[
+        p.replace(annotation=AsyncSession, default=Depends(get_async_db)) if p.name == "db" else p
+        for p in signature.parameters.values()
+    ])
+    return endpoint
+
+
+async def run_db(fn, *args):
+    """
+    fn(session, *args) for async handlers that await other work between
+    queries (login awaits the password hasher). Same switch as
+    read_handler: a sync Session on the threadpool with ASYNC_READS off,
+    AsyncSession.run_sync otherwise.
+    """
+    if not ASYNC_READS:
+        def call():
+            with SessionLocal() as db:
+                return fn(db, *args)
+        return await run_in_threadpool(call)
+    async with AsyncSessionLocal() as db:
+        return await db.run_sync(fn, *args)
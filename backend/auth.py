@@ -1,31 +1,135 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import select, update
 from pydantic import BaseModel
-from db import SessionLocal
+from async_db import run_db
 from models import User, Recruiter
+from passwords import HasherBusy, hasher
+from rate_limit import RateLimited, TokenBucketLimiter, check
+import session_tokens
+from session_tokens import Identity, InvalidToken
 
 router = APIRouter(
     prefix="/auth",
     tags=["auth"]
 )
 
+# login attempts: a burst, then a steady refill per minute. The IP bucket
+# bounds one client across accounts, the email bucket one account across
+# clients; a successful login refills the account's bucket
+ip_limiter = TokenBucketLimiter(
+    burst=float(os.getenv("LOGIN_IP_BURST", "20")),
+    per_minute=float(os.getenv("LOGIN_IP_PER_MINUTE", "30")),
+)
+email_limiter = TokenBucketLimiter(
+    burst=float(os.getenv("LOGIN_EMAIL_BURST", "5")),
+    per_minute=float(os.getenv("LOGIN_EMAIL_PER_MINUTE", "5")),
+)
+
 class LoginIn(BaseModel):
     email: str
     password: str
 
-def get_db():
-    db = SessionLocal()
+
+# -----------------------------
+# Request identity
+# -----------------------------
+bearer = HTTPBearer(auto_error=False)
+
+
+def current_identity(credentials: HTTPAuthorizationCredentials = Depends(bearer)) -> Identity:
+    """Caller's identity from the bearer token; checked without a database query."""
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
     try:
-        yield db
-    finally:
-        db.close()
+        return session_tokens.verify(credentials.credentials)
+    except InvalidToken as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+
+
+def current_recruiter(recruiter_id: int, identity: Identity = Depends(current_identity)) -> Identity:
+    """
+    For /recruiters/{recruiter_id}/... routes: the caller must be that
+    recruiter. The identity's company_id replaces a Recruiter lookup.
+    """
+    if identity.recruiter_id is None or identity.recruiter_id != recruiter_id:
+        raise HTTPException(status_code=403, detail="Not authorized for this recruiter")
+    return identity
+
+
+def current_user(user_id: int, identity: Identity = Depends(current_identity)) -> Identity:
+    """For /.../users/{user_id} routes: the caller must be that user."""
+    if identity.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized for this user")
+    return identity
+
+
+def current_candidate(candidate_id: int, identity: Identity = Depends(current_identity)) -> Identity:
+    """For /.../candidates/{candidate_id}/... routes: the caller must be that candidate."""
+    if identity.user_id != candidate_id:
+        raise HTTPException(status_code=403, detail="Not authorized for this candidate")
+    return identity
+
+
+def current_company(company_id: int, identity: Identity = Depends(current_identity)) -> Identity:
+    """For /companies/{company_id}/... routes: the caller must recruit for that company."""
+    if identity.company_id is None or identity.company_id != company_id:
+        raise HTTPException(status_code=403, detail="Not authorized for this company")
+    return identity
+
+
+def login_user(db, email):
+    """The user and (for recruiters) the linked recruiter in one round trip."""
+    return db.execute(
+        select(
+            User.user_id, User.email, User.role, User.full_name, User.password_hash,
+            Recruiter.recruiter_id, Recruiter.company_id,
+        )
+        .outerjoin(Recruiter, Recruiter.user_id == User.user_id)
+        .where(User.email == email)
+        .order_by(Recruiter.recruiter_id)
+        .limit(1)
+    ).first()
+
+
+def store_rehash(db, user, new_hash):
+    """Replace an outdated hash; skipped if the password changed since it was read."""
+    db.execute(
+        update(User)
+        .where(User.user_id == user.user_id, User.password_hash == user.password_hash)
+        .values(password_hash=new_hash)
+    )
+    db.commit()
+
 
 @router.post("/login")
-def login(payload: LoginIn, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email).first()
+async def login(payload: LoginIn, request: Request):
+    email_key = payload.email.strip().lower()
+    try:
+        check(
+            (ip_limiter, request.client.host if request.client else None),
+            (email_limiter, email_key),
+        )
+    except RateLimited as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    # database work runs on the ASYNC_READS switch; hashing is awaited in between
+    user = await run_db(login_user, payload.email)
 
-    if not user or user.password_hash != f"hashed-{payload.password}":
+    try:
+        ok, new_hash = await hasher.verify_async(payload.password, user.password_hash if user else None)
+    except HasherBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    email_limiter.reset(email_key)
+    if new_hash:
+        # outdated parameters or a legacy hash
+        await run_db(store_rehash, user, new_hash)
+
     out = {
         "user_id": user.user_id,
         "email": user.email,
@@ -34,9 +138,12 @@ def login(payload: LoginIn, db: Session = Depends(get_db)):
     }
 
     # If user is a recruiter, also return the linked recruiter_id (if exists)
-    if user.role == "recruiter":
-        rec = db.query(Recruiter).filter(Recruiter.user_id == user.user_id).first()
-        if rec:
-            out["recruiter_id"] = rec.recruiter_id
+    recruiter_id = company_id = None
+    if user.role == "recruiter" and user.recruiter_id is not None:
+        recruiter_id, company_id = user.recruiter_id, user.company_id
+        out["recruiter_id"] = recruiter_id
 
+    # send as "Authorization: Bearer <access_token>"
+    token, expires_at = session_tokens.issue(user.user_id, user.role, recruiter_id, company_id)
+    out.update(access_token=token, token_type="bearer", expires_at=expires_at)
     return out
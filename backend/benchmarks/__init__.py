@@ -0,0 +1,7 @@
+# benchmarks and checks run against throwaway databases; the app servers they
+# start inherit this environment, so every process of a run (and every token
+# it mints) shares one session secret
+import os
+import secrets
+
+os.environ.setdefault("SESSION_SECRET", secrets.token_hex(32))
@@ -0,0 +1,158 @@
+# HTTP load test: sync Session vs AsyncSession for the course-detail reads
+# Starts uvicorn (one worker) on a seeded temp database and drives it with
+# httpx at a fixed concurrency, reporting p50 / p99 latency and throughput.
+# run from backend/:  python -m benchmarks.bench_async_load --requests 5000 --concurrency 200
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+from fastapi import Depends, FastAPI
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from assessment import get_course_tree, get_db, load_course_progress
+from async_db import get_async_db
+
+# -----------------------------
+# App under test (imported by the uvicorn subprocess)
+# -----------------------------
+app = FastAPI()
+
+
+@app.get("/sync/courses/{course_id}")
+def course_sync(course_id: int, candidate_id: int, db: Session = Depends(get_db)):
+    _, tree = get_course_tree(db, course_id)
+    done, levels = load_course_progress(db, candidate_id, course_id)
+    return {"levels": len(tree["levels"]), "completed": len(done), "passed": len(levels)}
+
+
+@app.get("/async/courses/{course_id}")
+async def course_async(course_id: int, candidate_id: int, db: AsyncSession = Depends(get_async_db)):
+    _, tree = await db.run_sync(get_course_tree, course_id)
+    done, levels = await db.run_sync(load_course_progress, candidate_id, course_id)
+    return {"levels": len(tree["levels"]), "completed": len(done), "passed": len(levels)}
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+def seed(url, courses, candidates):
+    from db import make_engine
+    from models import Base, CandidateTaskProgress, Course, Level, Task, TechnicalDomain, User
+
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    rng = np.random.default_rng(0)
+    task_ids = []
+    with engine.begin() as conn:
+        conn.execute(insert(TechnicalDomain), [{"domain_id": 1, "name": "bench"}])
+        conn.execute(insert(User), [
+            {"user_id": i, "email": f"u{i}@x.io", "password_hash": "-", "role": "candidate", "full_name": f"U {i}"}
+            for i in range(1, candidates + 1)
+        ])
+        conn.execute(insert(Course), [
+            {"course_id": c, "domain_id": 1, "difficulty_level": 1, "description": f"course {c}"}
+            for c in range(1, courses + 1)
+        ])
+        levels = [{"level_id": c * 10 + n, "course_id": c, "name": f"L{n}", "order": n}
+                  for c in range(1, courses + 1) for n in range(1, 4)]
+        conn.execute(insert(Level), levels)
+        tasks = []
+        for level in levels:
+            for n in range(1, 9):
+                task_ids.append(level["level_id"] * 10 + n)
+                tasks.append({"task_id": task_ids[-1], "level_id": level["level_id"], "type": "content",
+                              "title": f"T{n}", "content": "x" * 400, "order": n})
+        conn.execute(insert(Task), tasks)
+        conn.execute(insert(CandidateTaskProgress), [
+            {"candidate_id": int(cand), "task_id": int(task)}
+            for cand in range(1, candidates + 1)
+            for task in rng.choice(task_ids, 12, replace=False)
+        ])
+    engine.dispose()
+
+
+async def drive(base, path, total, concurrency, courses, candidates):
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def client(http):
+        nonlocal errors
+        for i in counter:
+            url = f"{base}/{path}/courses/{i % courses + 1}?candidate_id={i % candidates + 1}"
+            t0 = time.perf_counter()
+            try:
+                r = await http.get(url)
+                r.raise_for_status()
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - t0)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as http:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+    ms = np.array(latencies) * 1000
+    return np.percentile(ms, 50), np.percentile(ms, 99), len(latencies) / elapsed, errors
+
+
+def wait_ready(base, proc, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            httpx.get(f"{base}/docs", timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError("uvicorn did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    base = f"http://127.0.0.1:{args.port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(url, args.courses, args.candidates)
+
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "benchmarks.bench_async_load:app",
+             "--port", str(args.port), "--log-level", "warning", "--timeout-keep-alive", "60"],
+            env={**os.environ, "DATABASE_URL": url},
+        )
+        try:
+            wait_ready(base, server)
+            print(f"{args.requests} requests, {args.concurrency} concurrent clients")
+            print(f"{'path':>6}  {'p50 ms':>8}  {'p99 ms':>8}  {'req/s':>8}  {'errors':>6}")
+            for path in ("sync", "async"):
+                # warm the pool and the content cache before measuring
+                asyncio.run(drive(base, path, args.concurrency * 2, args.concurrency, args.courses, args.candidates))
+                p50, p99, rps, errors = asyncio.run(
+                    drive(base, path, args.requests, args.concurrency, args.courses, args.candidates)
+                )
+                print(f"{path:>6}  {p50:>8.1f}  {p99:>8.1f}  {rps:>8.0f}  {errors:>6}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
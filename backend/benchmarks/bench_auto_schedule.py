@@ -0,0 +1,124 @@
+# bulk auto-scheduler vs one booking request per candidate
+# Seeds a company with recruiters, free slots and ranked candidates, then
+# schedules the top N once through POST /recruiters/{id}/roles/{role}/auto-schedule
+# and once as N calls to POST /recruiters/{id}/availability/{slot}/book (each on
+# a fresh copy of the database).
+# run from backend/:  python -m benchmarks.bench_auto_schedule --candidates 500
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+START = datetime(2030, 1, 7, 9)
+
+
+def seed(url, recruiters, slots_per_recruiter, candidates):
+    from sqlalchemy import insert
+
+    from db import make_engine
+    from models import Base, CandidateJobMatch, Company, JobRole, Recruiter, RecruiterAvailability, User
+
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"user_id": i, "email": f"u{i}@x.io", "password_hash": "-", "role": "candidate", "full_name": f"U {i}"}
+            for i in range(1, recruiters + candidates + 1)
+        ])
+        conn.execute(insert(Company), [{"company_id": 1, "name": "Co"}])
+        conn.execute(insert(Recruiter), [
+            {"recruiter_id": r, "user_id": candidates + r, "company_id": 1}
+            for r in range(1, recruiters + 1)
+        ])
+        conn.execute(insert(JobRole), [{"role_id": 1, "company_id": 1, "title": "Dev"}])
+        conn.execute(insert(CandidateJobMatch), [
+            {"candidate_id": c, "role_id": 1, "match_score": 100 - c % 100}
+            for c in range(1, candidates + 1)
+        ])
+        conn.execute(insert(RecruiterAvailability), [
+            {
+                "recruiter_id": r,
+                "start_time": START + timedelta(hours=s),
+                "end_time": START + timedelta(hours=s + 1),
+                "is_booked": False,
+            }
+            for r in range(1, recruiters + 1)
+            for s in range(slots_per_recruiter)
+        ])
+    engine.dispose()
+
+
+def run(mode, n):
+    """Runs in a child process, so each mode gets a cold app on its own database."""
+    from fastapi.testclient import TestClient
+
+    import recruiter
+    import session_tokens
+    from db import SessionLocal
+    from match_index import index as match_index
+
+    client = TestClient(recruiter.app)
+
+    def as_recruiter(recruiter_id):
+        token, _ = session_tokens.issue(0, "recruiter", recruiter_id=recruiter_id, company_id=1)
+        return {"Authorization": f"Bearer {token}"}
+    window = {"start_time": START.isoformat(), "end_time": (START + timedelta(days=30)).isoformat()}
+
+    t0 = time.perf_counter()
+    if mode == "bulk":
+        r = client.post("/recruiters/1/roles/1/auto-schedule", json={**window, "top_n": n}, headers=as_recruiter(1))
+        r.raise_for_status()
+        scheduled = len(r.json()["scheduled"])
+    else:
+        params = {"start": window["start_time"], "end": window["end_time"], "limit": 500}
+        with SessionLocal() as db:
+            candidates = [cand for _, cand, _, _ in match_index.top(db, [1], n)]
+        scheduled = 0
+        for cand in candidates:
+            slot = client.get("/companies/1/free-slots", params={**params, "limit": 1}, headers=as_recruiter(1)).json()
+            if not slot:
+                break
+            slot = slot[0]
+            r = client.post(
+                f"/recruiters/{slot['recruiter_id']}/availability/{slot['availability_id']}/book",
+                json={"candidate_id": cand, "role_id": 1},
+                headers=as_recruiter(slot["recruiter_id"]),
+            )
+            scheduled += r.status_code == 200
+    elapsed = time.perf_counter() - t0
+    print(f"{mode:>10}  {scheduled} interviews in {elapsed * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=500)
+    parser.add_argument("--recruiters", type=int, default=25)
+    parser.add_argument("--slots", type=int, default=30, help="slots per recruiter")
+    parser.add_argument("--mode", choices=["bulk", "sequential"])
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args.mode, args.candidates)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, "template.db")
+        seed(f"sqlite:///{template}", args.recruiters, args.slots, args.candidates * 2)
+        print(f"{args.recruiters} recruiters x {args.slots} slots, top {args.candidates} candidates")
+        for mode in ("bulk", "sequential"):
+            path = os.path.join(tmp, f"{mode}.db")
+            shutil.copy(template, path)
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_auto_schedule",
+                 "--mode", mode, "--candidates", str(args.candidates)],
+                env={**os.environ, "DATABASE_URL": f"sqlite:///{path}"},
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# profile saves: old delete-and-reinsert vs the diff-based sync
+# Every candidate re-saves their domain selection, once unchanged and once
+# with one domain swapped, through the old save_candidate_domains body and
+# through sync_candidate_domains (one user per call, then every user in one
+# batch call). Counts the INSERT / DELETE statements each approach issues and
+# how many rows still carry a skill level afterwards.
+# run from backend/:  python -m benchmarks.bench_candidate_domains --candidates 2000
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import event, insert
+from sqlalchemy.orm import sessionmaker
+
+from candidate import domain_ids_for, sync_candidate_domains
+from db import make_engine
+from domain_index import DomainRegistry
+from models import Base, CandidateSkillLevel, TechnicalDomain, User
+
+
+def save_old(db, user_id, domain_names):
+    """What save_candidate_domains did: delete every row, look names up, reinsert at level 0."""
+    db.query(CandidateSkillLevel).filter(CandidateSkillLevel.candidate_id == user_id).delete()
+    domains = db.query(TechnicalDomain).filter(TechnicalDomain.name.in_(domain_names)).all()
+    for domain in domains:
+        db.add(CandidateSkillLevel(candidate_id=user_id, domain_id=domain.domain_id, level=0))
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--domains", type=int, default=40)
+    parser.add_argument("--per-candidate", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    names = [f"Domain {d}" for d in range(1, args.domains + 1)]
+    picks = {
+        c: [names[i] for i in rng.choice(args.domains, args.per_candidate, replace=False)]
+        for c in range(1, args.candidates + 1)
+    }
+    # the "changed" save swaps one domain for one the candidate did not have
+    swapped = {c: p[1:] + [next(n for n in names if n not in p)] for c, p in picks.items()}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = []
+        for approach in ("old", "diff", "diff batch"):
+            engine = make_engine(f"sqlite:///{os.path.join(tmp, approach.replace(' ', '_'))}.db")
+            Base.metadata.create_all(engine)
+            with engine.begin() as conn:
+                conn.execute(insert(User), [
+                    {"user_id": c, "email": f"u{c}@x.io", "password_hash": "-", "role": "candidate", "full_name": "U"}
+                    for c in picks
+                ])
+                conn.execute(insert(TechnicalDomain), [{"domain_id": d, "name": n} for d, n in enumerate(names, 1)])
+                conn.execute(insert(CandidateSkillLevel), [
+                    {"candidate_id": c, "domain_id": names.index(n) + 1, "level": int(rng.integers(1, 6))}
+                    for c, p in picks.items() for n in p
+                ])
+
+            statements = [0]
+
+            def count(conn, cursor, statement, parameters, context, executemany):
+                if statement.lstrip().upper().startswith(("INSERT", "DELETE")):
+                    statements[0] += 1
+            event.listen(engine, "before_cursor_execute", count)
+            factory = sessionmaker(bind=engine)
+            registry = DomainRegistry()
+
+            for label, selection in (("unchanged", picks), ("one swap", swapped)):
+                statements[0] = 0
+                t0 = time.perf_counter()
+                with factory() as db:
+                    if approach == "old":
+                        for c, p in selection.items():
+                            save_old(db, c, p)
+                    elif approach == "diff":
+                        for c, p in selection.items():
+                            sync_candidate_domains(db, {c: domain_ids_for(registry.index(db), p)[0]})
+                            db.commit()
+                    else:
+                        index = registry.index(db)
+                        sync_candidate_domains(db, {c: domain_ids_for(index, p)[0] for c, p in selection.items()})
+                        db.commit()
+                elapsed = time.perf_counter() - t0
+                results.append((approach, label, elapsed, statements[0]))
+
+            with engine.connect() as conn:
+                kept = conn.exec_driver_sql("SELECT count(*) FROM candidate_skill_levels WHERE level > 0").scalar()
+            results.append((approach, "levels kept", None, kept))
+            engine.dispose()
+
+    print(f"{args.candidates} candidates x {args.per_candidate} domains")
+    for approach, label, elapsed, count in results:
+        if elapsed is None:
+            print(f"{approach:>10}  {label:<10}  {count} rows still have a level")
+        else:
+            print(f"{approach:>10}  {label:<10}  {elapsed * 1000:8.0f} ms  {count:6d} write statements")
+
+
+if __name__ == "__main__":
+    main()
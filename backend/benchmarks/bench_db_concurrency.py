@@ -0,0 +1,96 @@
+# concurrent read/write load against SQLite: default engine vs db.make_engine
+# run from backend/:  python -m benchmarks.bench_db_concurrency --readers 8 --writers 2 --seconds 5
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from db import make_engine
+from models import Base, Notification, User
+
+
+def seed(engine, users):
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"user_id": i, "email": f"u{i}@x.io", "password_hash": "-", "role": "candidate", "full_name": f"U {i}"}
+            for i in range(1, users + 1)
+        ])
+
+
+def run(engine, readers, writers, seconds, users):
+    Session = sessionmaker(bind=engine)
+    stop = time.perf_counter() + seconds
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+
+    def bump(key):
+        with lock:
+            counts[key] += 1
+
+    def reader(n):
+        while time.perf_counter() < stop:
+            with Session() as db:
+                try:
+                    db.execute(
+                        select(func.count()).select_from(Notification)
+                        .where(Notification.user_id == n % users + 1)
+                    ).scalar()
+                    bump("reads")
+                except OperationalError:
+                    bump("locked")
+
+    def writer(n):
+        i = 0
+        while time.perf_counter() < stop:
+            i += 1
+            with Session() as db:
+                try:
+                    db.add(Notification(user_id=(n + i) % users + 1, type="bench", message="x" * 64))
+                    db.commit()
+                    bump("writes")
+                except OperationalError:
+                    db.rollback()
+                    bump("locked")
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return {k: v / seconds for k, v in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    configs = {
+        # what db.py used before make_engine
+        "default": lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+        "make_engine": make_engine,
+    }
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:.0f}s each")
+    print(f"{'engine':>12}  {'reads/s':>9}  {'writes/s':>9}  {'locked/s':>9}")
+    for name, factory in configs.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = factory(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            seed(engine, args.users)
+            rates = run(engine, args.readers, args.writers, args.seconds, args.users)
+            engine.dispose()
+        print(f"{name:>12}  {rates['reads']:>9.0f}  {rates['writes']:>9.0f}  {rates['locked']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# grading throughput: warm SandboxPool vs one fresh interpreter per submission
+# run from backend/:  python -m benchmarks.bench_grading --submissions 500 --workers 4
+import argparse
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+
+from grading import WORKER_SCRIPT, SandboxPool, worker_job
+
+GREET_TESTS = [
+    {"expression": f"greet({name!r})", "expected": repr(f"Hello, {name}!"), "weight": 1}
+    for name in ("Ada", "World", "")
+]
+SUBMISSIONS = [
+    ("def greet(name):\n    return f'Hello, {name}!'\n", GREET_TESTS),
+    ("def greet(name):\n    return 'Hello, ' + name + '!'\n", GREET_TESTS),
+    ("def greet(name):\n    return 'Hello ' + name\n", GREET_TESTS),
+    ("print('Hello, World!')\n", [{"expected": "Hello, World!", "weight": 1}]),
+]
+LIMITS = {"timeout": 5, "memory_mb": 256}
+
+
+def cold_grade(code, tests):
+    """What a pool-less grader pays: interpreter startup for every submission."""
+    job = worker_job(code, tests, LIMITS)
+    out = subprocess.run([sys.executable, "-I", WORKER_SCRIPT], input=job, capture_output=True, text=True)
+    return json.loads(out.stdout)
+
+
+def report(name, latencies, elapsed):
+    ms = np.array(latencies) * 1000
+    print(f"{name:>6}  {len(ms) / elapsed:>9.0f}  {np.percentile(ms, 50):>8.1f}  {np.percentile(ms, 99):>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--submissions", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    jobs = [SUBMISSIONS[i % len(SUBMISSIONS)] for i in range(args.submissions)]
+    print(f"{args.submissions} submissions queued at once, {args.workers} workers")
+    print(f"{'path':>6}  {'subs/s':>9}  {'p50 ms':>8}  {'p99 ms':>8}")
+
+    # warm pool: every submission is queued immediately, like a deadline spike
+    pool = SandboxPool(workers=args.workers, **LIMITS)
+    pool.start()
+    pool.submit(*jobs[0]).result()
+    t0 = time.perf_counter()
+    futures = [(time.perf_counter(), pool.submit(code, tests)) for code, tests in jobs]
+    latencies = []
+    for submitted, future in futures:
+        future.result()
+        latencies.append(time.perf_counter() - submitted)
+    # completion order is FIFO, so the last result marks the end of the run
+    report("pool", latencies, time.perf_counter() - t0)
+    pool.stop()
+
+    # cold: same concurrency, a new interpreter per submission
+    latencies = []
+
+    def timed(code, tests, submitted):
+        cold_grade(code, tests)
+        latencies.append(time.perf_counter() - submitted)
+
+    with ThreadPoolExecutor(args.workers) as executor:
+        t0 = time.perf_counter()
+        wait([executor.submit(timed, code, tests, time.perf_counter()) for code, tests in jobs])
+        report("cold", latencies, time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# incremental recompute benchmark: time to rescore one candidate after a
+# skill update, as the candidate base grows
+# run from backend/:  python -m benchmarks.bench_incremental --sizes 1000 10000 50000
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from matching import recompute_matches
+from models import Base, CandidateSkillLevel, JobRoleRequirement
+
+
+def seeded_session(path, n_candidates, n_roles, n_domains, rng):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        skills = {
+            (c, int(d)): int(rng.integers(0, 6))
+            for c in range(1, n_candidates + 1)
+            for d in rng.integers(1, n_domains + 1, size=4)
+        }
+        conn.execute(insert(CandidateSkillLevel), [
+            {"candidate_id": c, "domain_id": d, "level": lv} for (c, d), lv in skills.items()
+        ])
+        reqs = {
+            (r, int(d)): int(rng.integers(1, 6))
+            for r in range(1, n_roles + 1)
+            for d in rng.integers(1, n_domains + 1, size=3)
+        }
+        conn.execute(insert(JobRoleRequirement), [
+            {"role_id": r, "domain_id": d, "minimum_level": lv} for (r, d), lv in reqs.items()
+        ])
+    return sessionmaker(bind=engine)()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--roles", type=int, default=200)
+    parser.add_argument("--domains", type=int, default=24)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'candidates':>10}  {'full rebuild':>12}  {'one candidate':>13}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = seeded_session(os.path.join(tmp, "bench.db"), n, args.roles, args.domains, rng)
+
+            t0 = time.perf_counter()
+            recompute_matches(db)
+            full_s = time.perf_counter() - t0
+
+            timings = []
+            for _ in range(args.repeat):
+                cand = int(rng.integers(1, n + 1))
+                row = db.query(CandidateSkillLevel).filter(CandidateSkillLevel.candidate_id == cand).first()
+                row.level = int(rng.integers(0, 6))
+                db.commit()
+                t0 = time.perf_counter()
+                recompute_matches(db, candidate_ids=[cand])
+                timings.append(time.perf_counter() - t0)
+            db.close()
+
+        print(f"{n:>10}  {full_s:>11.3f}s  {np.median(timings) * 1000:>11.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# POST /auth/login throughput with real password hashing
+# Starts the app (uvicorn, one worker) on a seeded temp database and drives
+# logins with httpx at a fixed concurrency while a probe times GET / to see
+# how responsive the server stays. "pool" is /auth/login as shipped (joined
+# query, scrypt on the bounded hasher pool); "inline" is a benchmark-only
+# route shaped like the old login (sync endpoint, user then recruiter
+# query) with the same scrypt verify done on the request thread. Each mode
+# gets a fresh server so peak RSS is per mode. Rate limits are lifted.
+# run from backend/:  python -m benchmarks.bench_login --requests 400 --concurrency 64
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+from benchmarks.bench_async_load import wait_ready
+from benchmarks.bench_sse import rss_kb
+
+
+def seed(url, users):
+    from sqlalchemy import insert
+
+    from db import make_engine
+    from models import Base, Company, Recruiter, User
+    from passwords import hash_password
+
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    password_hash = hash_password("correct horse")  # one derivation shared by everyone
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"user_id": i, "email": f"u{i}@x.io", "password_hash": password_hash,
+             "role": "recruiter" if i % 10 == 0 else "candidate", "full_name": f"U {i}"}
+            for i in range(1, users + 1)
+        ])
+        conn.execute(insert(Company), [{"company_id": 1, "name": "Co"}])
+        conn.execute(insert(Recruiter), [
+            {"recruiter_id": i // 10, "user_id": i, "company_id": 1} for i in range(10, users + 1, 10)
+        ])
+    engine.dispose()
+
+
+def serve(port):
+    import uvicorn
+    from fastapi import Depends, HTTPException
+    from sqlalchemy.orm import Session
+
+    from auth import LoginIn
+    from main import app
+    from models import Recruiter, User
+    from passwords import verify_password
+    from users import get_db
+
+    @app.post("/_bench/login-inline")
+    def login_inline(payload: LoginIn, db: Session = Depends(get_db)):
+        user = db.query(User).filter(User.email == payload.email).first()
+        if not user or not verify_password(payload.password, user.password_hash):
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+        out = {"user_id": user.user_id, "role": user.role}
+        if user.role == "recruiter":
+            rec = db.query(Recruiter).filter(Recruiter.user_id == user.user_id).first()
+            if rec:
+                out["recruiter_id"] = rec.recruiter_id
+        return out
+
+    uvicorn.run(app, port=port, log_level="warning", backlog=4096)
+
+
+async def drive(base, path, total, concurrency, users):
+    latencies, probes, statuses = [], [], {}
+    counter = iter(range(total))
+    done = asyncio.Event()
+
+    async def client(http):
+        for i in counter:
+            t0 = time.perf_counter()
+            r = await http.post(f"{base}{path}", json={"email": f"u{i % users + 1}@x.io", "password": "correct horse"})
+            statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+            if r.status_code == 200:
+                latencies.append(time.perf_counter() - t0)
+
+    async def probe(http):
+        while not done.is_set():
+            t0 = time.perf_counter()
+            (await http.get(f"{base}/")).raise_for_status()
+            probes.append(time.perf_counter() - t0)
+            await asyncio.sleep(0.05)
+
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(limits=limits, timeout=120) as http:
+        prober = asyncio.create_task(probe(http))
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+        done.set()
+        await prober
+    ms = np.array(latencies) * 1000
+    return {
+        "rate": len(latencies) / elapsed,
+        "p50": np.percentile(ms, 50),
+        "p99": np.percentile(ms, 99),
+        "probe_p99": np.percentile(np.array(probes) * 1000, 99),
+        "statuses": statuses,
+    }
+
+
+def peak_rss_kb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8768)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    base = f"http://127.0.0.1:{args.port}"
+    env = {
+        **os.environ,
+        "LOGIN_IP_BURST": "1e9", "LOGIN_IP_PER_MINUTE": "1e9",
+        "LOGIN_EMAIL_BURST": "1e9", "LOGIN_EMAIL_PER_MINUTE": "1e9",
+        # room for every client to queue, so the comparison is not about shedding
+        "HASH_MAX_PENDING": str(args.concurrency * 2),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(url, args.users)
+        env["DATABASE_URL"] = url
+        print(f"{args.requests} logins, {args.concurrency} concurrent clients, {os.cpu_count()} CPUs")
+        print(f"{'mode':>7}  {'logins/s':>8}  {'p50 ms':>8}  {'p99 ms':>8}  {'GET / p99':>9}  {'peak RSS':>8}  statuses")
+        for mode, path in (("inline", "/_bench/login-inline"), ("pool", "/auth/login")):
+            server = subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.bench_login", "--serve", "--port", str(args.port)], env=env,
+            )
+            try:
+                wait_ready(base, server)
+                idle = rss_kb(server.pid)
+                asyncio.run(drive(base, path, args.concurrency, args.concurrency, args.users))  # warm up
+                r = asyncio.run(drive(base, path, args.requests, args.concurrency, args.users))
+                peak = peak_rss_kb(server.pid)
+            finally:
+                server.terminate()
+                server.wait()
+            print(f"{mode:>7}  {r['rate']:>8.1f}  {r['p50']:>8.0f}  {r['p99']:>8.0f}  {r['probe_p99']:>7.0f}ms  "
+                  f"{(peak - idle) / 1024:>+6.0f}MB  {r['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
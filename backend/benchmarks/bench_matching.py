@@ -0,0 +1,72 @@
+# match engine benchmark: pairs scored per second
+# run from backend/:  python -m benchmarks.bench_matching --candidates 200000 --roles 2000
+import argparse
+import time
+
+import numpy as np
+
+from matching import build_matrix, iter_score_blocks
+
+
+def synthetic_triples(n_rows, n_domains, per_row, max_level, rng):
+    rows = np.repeat(np.arange(n_rows), per_row)
+    domains = rng.integers(0, n_domains, size=rows.size)
+    levels = rng.integers(0, max_level + 1, size=rows.size)
+    return np.stack([rows, domains, levels], axis=1)
+
+
+def python_loop(skills, reqs):
+    # reference: one Python-level score per (candidate, role) pair
+    out = []
+    for c in skills:
+        for r in reqs:
+            req = [(c[d], r[d]) for d in range(len(r)) if r[d] > 0]
+            out.append(round(100 * sum(min(a, b) / b for a, b in req) / len(req)) if req else 0)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=100_000)
+    parser.add_argument("--roles", type=int, default=1_000)
+    parser.add_argument("--domains", type=int, default=24)
+    parser.add_argument("--skills-per-candidate", type=int, default=4)
+    parser.add_argument("--requirements-per-role", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    domain_ids = np.arange(args.domains)
+
+    t0 = time.perf_counter()
+    skills = build_matrix(
+        synthetic_triples(args.candidates, args.domains, args.skills_per_candidate, 5, rng),
+        np.arange(args.candidates), domain_ids,
+    )
+    reqs = build_matrix(
+        synthetic_triples(args.roles, args.domains, args.requirements_per_role, 5, rng),
+        np.arange(args.roles), domain_ids,
+    )
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    checksum = 0
+    for _, _, scores in iter_score_blocks(skills, reqs):
+        checksum += int(scores.sum(dtype=np.int64))
+    score_s = time.perf_counter() - t0
+    pairs = args.candidates * args.roles
+
+    sample = skills[:200], reqs[:200]
+    t0 = time.perf_counter()
+    python_loop(*sample)
+    loop_s = time.perf_counter() - t0
+    loop_rate = sample[0].shape[0] * sample[1].shape[0] / loop_s
+
+    print(f"matrices:       {args.candidates} x {args.domains}, {args.roles} x {args.domains} (built in {build_s:.3f}s)")
+    print(f"vectorized:     {pairs:,} pairs in {score_s:.3f}s -> {pairs / score_s:,.0f} pairs/s (checksum {checksum})")
+    print(f"python loop:    {loop_rate:,.0f} pairs/s (200 x 200 sample)")
+    print(f"speedup:        {pairs / score_s / loop_rate:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# notification write throughput: outbox batches vs one INSERT per request
+# "inline" commits each notification on its own, as the interview endpoints
+# did; "outbox" posts them from several threads and waits until every one is
+# in the table.
+# run from backend/:  python -m benchmarks.bench_notifications --notifications 5000
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from db import make_engine
+from models import Base, Notification
+from notification_outbox import NotificationOutbox
+
+
+def inline(factory, n, users):
+    for i in range(n):
+        with factory() as db:
+            db.add(Notification(user_id=i % users + 1, type="interview", message=f"n{i}", is_read=False))
+            db.commit()
+
+
+def outboxed(factory, n, users, threads):
+    box = NotificationOutbox(factory)
+    post_us = []
+
+    def post(i):
+        t0 = time.perf_counter()
+        box.post(i % users + 1, "interview", f"n{i}")
+        post_us.append((time.perf_counter() - t0) * 1e6)
+
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(post, range(n)))
+    box.stop()
+    return np.array(post_us)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notifications", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("inline", "outbox"):
+            engine = make_engine(f"sqlite:///{os.path.join(tmp, mode + '.db')}")
+            Base.metadata.create_all(engine)
+            factory = sessionmaker(bind=engine)
+
+            t0 = time.perf_counter()
+            if mode == "inline":
+                inline(factory, args.notifications, args.users)
+                extra = ""
+            else:
+                post_us = outboxed(factory, args.notifications, args.users, args.threads)
+                extra = f"  post() p50 {np.percentile(post_us, 50):.0f} us  p99 {np.percentile(post_us, 99):.0f} us"
+            elapsed = time.perf_counter() - t0
+
+            with factory() as db:
+                stored = db.scalar(select(func.count()).select_from(Notification))
+            engine.dispose()
+            print(f"{mode:>7}  {stored} rows in {elapsed * 1000:.0f} ms  ({stored / elapsed:,.0f}/s){extra}")
+
+
+if __name__ == "__main__":
+    main()
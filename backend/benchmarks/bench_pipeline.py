@@ -0,0 +1,85 @@
+# recruiter pipeline benchmark: top-K index vs the SQL ORDER BY ... LIMIT path
+# run from backend/:  python -m benchmarks.bench_pipeline --rows 1000000
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from match_index import MatchIndex
+from models import Base, CandidateJobMatch, JobRole
+
+# the query recruiter_pipeline ran before the index
+PIPELINE_SQL = text("""
+    SELECT m.candidate_id, m.role_id, jr.title, m.match_score, m.last_updated
+    FROM candidate_job_matches m
+    JOIN job_roles jr ON jr.role_id = m.role_id
+    WHERE jr.company_id = :company_id
+    ORDER BY m.match_score DESC
+    LIMIT 50
+""")
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return np.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--roles", type=int, default=200)
+    parser.add_argument("--companies", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    per_role = args.rows // args.roles
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(JobRole), [
+                {"role_id": r, "company_id": r % args.companies + 1, "title": f"Role {r}"}
+                for r in range(1, args.roles + 1)
+            ])
+            for r in range(1, args.roles + 1):
+                scores = rng.integers(1, 101, size=per_role).tolist()
+                conn.execute(insert(CandidateJobMatch), [
+                    {"candidate_id": c, "role_id": r, "match_score": s}
+                    for c, s in enumerate(scores, start=1)
+                ])
+
+        db = sessionmaker(bind=engine)()
+        company_roles = [r for r in range(1, args.roles + 1) if r % args.companies == 0]
+
+        def sql_company():
+            db.execute(PIPELINE_SQL, {"company_id": 1}).all()
+
+        index = MatchIndex()
+        t0 = time.perf_counter()
+        index.top(db, company_roles, 50)
+        warm_ms = (time.perf_counter() - t0) * 1000
+
+        page = index.top(db, company_roles, 50)
+        cursor = page[-1][:3]
+
+        print(f"{args.rows:,} match rows, {args.roles} roles, {len(company_roles)} roles in the company")
+        print(f"SQL ORDER BY score LIMIT 50:     {timed(sql_company, args.repeat):9.3f} ms")
+        print(f"index, company top 50:           {timed(lambda: index.top(db, company_roles, 50), args.repeat):9.3f} ms"
+              f"  (first load {warm_ms:.0f} ms)")
+        print(f"index, single role top 50:       {timed(lambda: index.top(db, company_roles[:1], 50), args.repeat):9.3f} ms")
+        print(f"index, company page 2 (keyset):  {timed(lambda: index.top(db, company_roles, 50, cursor), args.repeat):9.3f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# bulk role import vs one POST /recruiters/{id}/roles per role
+# Seeds technical domains and scored candidates, then imports the same
+# generated roles once as a streamed JSON lines upload and once role by role
+# (each on a fresh copy of the database). Also times the match rescore the
+# import queues for the new roles.
+# run from backend/:  python -m benchmarks.bench_role_import --roles 5000
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+LANGUAGES = [
+    "Python", "JavaScript", "TypeScript", "Java", "Go", "Rust", "Kotlin", "Swift", "Ruby", "PHP",
+    "SQL", "Kubernetes", "Docker", "Terraform", "React", "Angular", "Django", "Spring", "GraphQL", "Kafka",
+]
+
+# how a job ad might phrase each domain
+PHRASES = ["{}", "strong {} skills", "{} (3+ years)", "experience with {}", "{} development"]
+
+
+def seed(url, candidates):
+    from sqlalchemy import insert
+
+    from db import make_engine
+    from models import Base, CandidateSkillLevel, Company, Recruiter, TechnicalDomain, User
+
+    rng = np.random.default_rng(0)
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"user_id": i, "email": f"u{i}@x.io", "password_hash": "-", "role": "candidate", "full_name": f"U {i}"}
+            for i in range(1, candidates + 2)
+        ])
+        conn.execute(insert(Company), [{"company_id": 1, "name": "Co"}])
+        conn.execute(insert(Recruiter), [{"recruiter_id": 1, "user_id": candidates + 1, "company_id": 1}])
+        conn.execute(insert(TechnicalDomain), [
+            {"domain_id": d, "name": f"{name} Development", "description": f"{name} programming assessments"}
+            for d, name in enumerate(LANGUAGES, start=1)
+        ])
+        conn.execute(insert(CandidateSkillLevel), [
+            {"candidate_id": c, "domain_id": int(d), "level": int(rng.integers(1, 6))}
+            for c in range(1, candidates + 1)
+            for d in rng.choice(np.arange(1, len(LANGUAGES) + 1), 4, replace=False)
+        ])
+    engine.dispose()
+
+
+def generate_roles(n, per_role):
+    rng = np.random.default_rng(1)
+    for r in range(n):
+        picks = rng.choice(len(LANGUAGES), per_role, replace=False)
+        yield {
+            "title": f"Engineer {r}",
+            "description": "Build and run things.",
+            "requirements": [
+                {"requirement_text": PHRASES[int(rng.integers(len(PHRASES)))].format(LANGUAGES[p]), "level": int(rng.integers(1, 6))}
+                for p in picks
+            ],
+        }
+
+
+def run(mode, roles, per_role):
+    """Runs in a child process, so each mode gets a cold app on its own database."""
+    from fastapi.testclient import TestClient
+
+    import main
+    import match_tracker
+    import session_tokens
+
+    token, _ = session_tokens.issue(1, "recruiter", recruiter_id=1, company_id=1)
+    client = TestClient(main.app, headers={"Authorization": f"Bearer {token}"})
+    t0 = time.perf_counter()
+    if mode == "bulk":
+        def body():
+            for role in generate_roles(roles, per_role):
+                yield (json.dumps(role) + "\n").encode()
+
+        r = client.post("/recruiters/1/roles/import", content=body(), headers={"content-type": "application/x-ndjson"})
+        r.raise_for_status()
+        stats = r.json()
+        detail = f"{stats['resolved']} requirements resolved, {stats['unresolved_count']} not"
+    else:
+        for role in generate_roles(roles, per_role):
+            client.post("/recruiters/1/roles", json={"company_id": 1, **role}).raise_for_status()
+        detail = ""
+    imported = time.perf_counter() - t0
+    match_tracker.worker.wait_idle()
+    rescored = time.perf_counter() - t0 - imported
+    print(f"{mode:>10}  {roles} roles in {imported * 1000:.0f} ms, rescore {rescored * 1000:.0f} ms  {detail}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--roles", type=int, default=5000)
+    parser.add_argument("--requirements", type=int, default=4, help="per role")
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--one-by-one", type=int, default=500, help="roles for the per-request run")
+    parser.add_argument("--mode", choices=["bulk", "single"])
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args.mode, args.roles, args.requirements)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, "template.db")
+        seed(f"sqlite:///{template}", args.candidates)
+        print(f"{len(LANGUAGES)} domains, {args.candidates} candidates, {args.requirements} requirements per role")
+        for mode, roles in (("bulk", args.roles), ("single", args.one_by_one)):
+            path = os.path.join(tmp, f"{mode}.db")
+            shutil.copy(template, path)
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_role_import", "--mode", mode,
+                 "--roles", str(roles), "--requirements", str(args.requirements)],
+                env={**os.environ, "DATABASE_URL": f"sqlite:///{path}"},
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
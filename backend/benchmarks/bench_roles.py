@@ -0,0 +1,97 @@
+# GET /recruiters/{id}/roles: old N+1 loop vs one joined query vs the role cache
+# run from backend/:  python -m benchmarks.bench_roles --roles 500
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import event, insert
+from sqlalchemy.orm import sessionmaker
+
+from db import make_engine
+from models import Base, Company, JobRole, JobRoleRequirement, Recruiter, TechnicalDomain, User
+from role_cache import RoleCache, load_company_roles
+
+
+def list_roles_n_plus_one(db, recruiter_id):
+    """What list_roles did before the cache: one query per role, one per domain."""
+    recruiter = db.query(Recruiter).filter(Recruiter.recruiter_id == recruiter_id).first()
+    roles = db.query(JobRole).filter(JobRole.company_id == recruiter.company_id).all()
+    out = []
+    for r in roles:
+        reqs = db.query(JobRoleRequirement).filter(JobRoleRequirement.role_id == r.role_id).all()
+        out.append({
+            "role_id": r.role_id,
+            "company_id": r.company_id,
+            "title": r.title,
+            "description": r.description,
+            "requirements": [{
+                "id": q.id,
+                "text": (q.domain.name if q.domain is not None else (f"Level {q.minimum_level}" if q.minimum_level is not None else "")),
+                "level": q.minimum_level
+            } for q in reqs]
+        })
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--roles", type=int, default=500)
+    parser.add_argument("--requirements", type=int, default=5, help="per role")
+    parser.add_argument("--domains", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(User), [{"user_id": 1, "email": "r@x.io", "password_hash": "-", "role": "recruiter", "full_name": "R"}])
+            conn.execute(insert(Company), [{"company_id": 1, "name": "Co"}, {"company_id": 2, "name": "Other"}])
+            conn.execute(insert(Recruiter), [{"recruiter_id": 1, "user_id": 1, "company_id": 1}])
+            conn.execute(insert(TechnicalDomain), [{"domain_id": d, "name": f"domain {d}"} for d in range(1, args.domains + 1)])
+            # the company's roles, interleaved with another company's
+            conn.execute(insert(JobRole), [
+                {"role_id": r, "company_id": 1 + r % 2, "title": f"Role {r}", "description": "d" * 200}
+                for r in range(1, args.roles * 2 + 1)
+            ])
+            conn.execute(insert(JobRoleRequirement), [
+                {"role_id": r, "domain_id": int(d), "minimum_level": int(rng.integers(1, 6))}
+                for r in range(1, args.roles * 2 + 1)
+                for d in rng.choice(np.arange(1, args.domains + 1), args.requirements, replace=False)
+            ])
+
+        queries = []
+        event.listen(engine, "before_cursor_execute", lambda *a: queries.append(1))
+        factory = sessionmaker(bind=engine)
+        cache = RoleCache()
+
+        def timed(fn):
+            samples = []
+            for _ in range(args.repeat):
+                with factory() as db:
+                    queries.clear()
+                    t0 = time.perf_counter()
+                    result = fn(db)
+                    samples.append(time.perf_counter() - t0)
+            return np.median(samples) * 1000, len(queries), result
+
+        old_ms, old_q, old = timed(lambda db: list_roles_n_plus_one(db, 1))
+        cold_ms, cold_q, (_, cold) = timed(lambda db: load_company_roles(db, 1))
+        cache.get(factory(), 1)
+        hit_ms, hit_q, (_, hit) = timed(lambda db: cache.get(db, 1))
+        engine.dispose()
+
+    # the old loop had no ORDER BY on requirements
+    for role in old:
+        role["requirements"].sort(key=lambda q: q["id"])
+    assert old == cold == hit
+    print(f"{len(old)} roles x {args.requirements} requirements")
+    for label, ms, q in (("N+1", old_ms, old_q), ("joined", cold_ms, cold_q), ("cached", hit_ms, hit_q)):
+        print(f"{label:>7}  {ms:9.3f} ms  {q:4d} queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# idle SSE connections on one worker
+# Starts the app (uvicorn, one worker) on a seeded temp database, opens one
+# /events stream per user and holds them idle, then posts one notification to
+# every user through the outbox. Reports the server's memory per connection
+# and how long the fan-out took to reach every stream.
+# run from backend/:  python -m benchmarks.bench_sse --connections 10000
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_async_load import wait_ready
+
+
+def seed(url, users):
+    from sqlalchemy import insert
+
+    from db import make_engine
+    from models import Base, User
+
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"user_id": i, "email": f"u{i}@x.io", "password_hash": "-", "role": "candidate", "full_name": f"U {i}"}
+            for i in range(1, users + 1)
+        ])
+    engine.dispose()
+
+
+def serve(port, users):
+    """The app plus one benchmark-only route that notifies every user."""
+    import uvicorn
+
+    from main import app
+    from notification_outbox import outbox
+
+    @app.post("/_bench/notify-all")
+    def notify_all():
+        outbox.post_many({"user_id": i, "type": "bench", "message": "hello"} for i in range(1, users + 1))
+        return {"ok": True}
+
+    uvicorn.run(app, port=port, log_level="warning", backlog=4096)
+
+
+def rss_kb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+
+
+async def connect(port, user_id):
+    import session_tokens
+
+    token, _ = session_tokens.issue(user_id, "candidate")
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET /events/users/{user_id}?token={token} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+    await writer.drain()
+    await reader.readuntil(b": connected\n\n")
+    return reader, writer
+
+
+async def run(port, users, server_pid):
+    idle_kb = rss_kb(server_pid)
+    streams = []
+    t0 = time.perf_counter()
+    for start in range(1, users + 1, 500):
+        streams += await asyncio.gather(*(connect(port, u) for u in range(start, min(start + 500, users + 1))))
+    connect_s = time.perf_counter() - t0
+    await asyncio.sleep(1)
+    held_kb = rss_kb(server_pid)
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    t0 = time.perf_counter()
+    writer.write(b"POST /_bench/notify-all HTTP/1.1\r\nHost: bench\r\nContent-Length: 0\r\n\r\n")
+    await writer.drain()
+
+    async def received(stream):
+        await stream[0].readuntil(b"event: notification\n")
+        return time.perf_counter() - t0
+
+    latencies = sorted(await asyncio.gather(*(received(s) for s in streams)))
+    for _, w in streams:
+        w.close()
+    writer.close()
+    return connect_s, idle_kb, held_kb, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.connections)
+        return
+
+    base = f"http://127.0.0.1:{args.port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(url, args.connections)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.bench_sse", "--serve",
+             "--port", str(args.port), "--connections", str(args.connections)],
+            env={**os.environ, "DATABASE_URL": url},
+        )
+        try:
+            wait_ready(base, server)
+            connect_s, idle_kb, held_kb, latencies = asyncio.run(run(args.port, args.connections, server.pid))
+        finally:
+            server.terminate()
+            server.wait()
+
+    n = len(latencies)
+    print(f"{n} streams opened in {connect_s:.1f} s")
+    print(f"server RSS {idle_kb / 1024:.0f} MB idle -> {held_kb / 1024:.0f} MB holding them "
+          f"({(held_kb - idle_kb) / n:.1f} KB per stream)")
+    print(f"one notification per user: p50 {latencies[n // 2] * 1000:.0f} ms  "
+          f"p99 {latencies[int(n * 0.99)] * 1000:.0f} ms  all {latencies[-1] * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
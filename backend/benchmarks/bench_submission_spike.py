@@ -0,0 +1,137 @@
+# deadline spike against /assessments/submit
+# Starts the real app (uvicorn, one worker) on a seeded temp database and fires
+# every submission at once. Half of them report a start time just inside the
+# assessment's limit (about to expire), half just started. Reports submit
+# latency, 429s, and how long each group waited for its grade; expiring
+# submissions should be graded first.
+# run from backend/:  python -m benchmarks.bench_submission_spike --submissions 400
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import numpy as np
+from sqlalchemy import insert
+
+import session_tokens
+from benchmarks.bench_async_load import wait_ready
+
+LIMIT_MINUTES = 60
+TASK_ID = 1
+WORK = 300_000  # loop iterations per test run in each submission
+
+
+def seed(url, candidates):
+    from db import make_engine
+    from models import Assessment, Base, Course, Level, Task, TaskTestCase, TechnicalDomain, User
+
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(TechnicalDomain), [{"domain_id": 1, "name": "bench"}])
+        conn.execute(insert(User), [
+            {"user_id": i, "email": f"u{i}@x.io", "password_hash": "-", "role": "candidate", "full_name": f"U {i}"}
+            for i in range(1, candidates + 1)
+        ])
+        conn.execute(insert(Course), [{"course_id": 1, "domain_id": 1, "difficulty_level": 1, "description": "c"}])
+        conn.execute(insert(Assessment), [{"course_id": 1, "time_limit_minutes": LIMIT_MINUTES}])
+        conn.execute(insert(Level), [{"level_id": 1, "course_id": 1, "name": "L1", "order": 1}])
+        conn.execute(insert(Task), [{"task_id": TASK_ID, "level_id": 1, "type": "assessment", "title": "greet", "order": 1}])
+        conn.execute(insert(TaskTestCase), [
+            {"task_id": TASK_ID, "expression": f"greet({name!r})", "expected": repr(f"Hello, {name}!"), "weight": 1}
+            for name in ("Ada", "World", "")
+        ])
+    engine.dispose()
+
+
+async def spike(base, candidates):
+    now = datetime.utcnow()
+    expiring = {c: c % 2 == 0 for c in range(1, candidates + 1)}
+    # each candidate submits and polls with their own session token
+    auth = {c: {"Authorization": f"Bearer {session_tokens.issue(c, 'candidate')[0]}"} for c in expiring}
+    submit_ms, rejected, jobs = [], 0, {}
+
+    async def submit(http, candidate_id):
+        nonlocal rejected
+        started = now - timedelta(minutes=LIMIT_MINUTES - 1) if expiring[candidate_id] else now
+        body = {
+            "task_id": TASK_ID,
+            # distinct ASTs, so every submission really runs in the sandbox, and
+            # enough work per run that grading falls behind the spike
+            "answer_text": f"_ = sum(range({WORK + candidate_id}))\ndef greet(name):\n    return f'Hello, {{name}}!'\n",
+            "started_at": started.isoformat(),
+        }
+        t0 = time.perf_counter()
+        r = await http.post(f"{base}/assessments/submit", json=body, headers=auth[candidate_id])
+        submit_ms.append((time.perf_counter() - t0) * 1000)
+        if r.status_code == 429:
+            rejected += 1
+        else:
+            r.raise_for_status()
+            jobs[candidate_id] = (r.json()["job_id"], time.perf_counter())
+
+    async def wait_graded(http, candidate_id):
+        job_id, submitted = jobs[candidate_id]
+        while True:
+            r = await http.get(f"{base}/assessments/submissions/{job_id}", headers=auth[candidate_id])
+            if r.json()["state"] in ("done", "failed"):
+                return expiring[candidate_id], time.perf_counter() - submitted, r.json()["state"]
+            await asyncio.sleep(min(1.0, float(r.headers.get("Retry-After", 1))))
+
+    async def floor(http):
+        t0 = time.perf_counter()
+        (await http.get(f"{base}/")).raise_for_status()
+        floor_ms.append((time.perf_counter() - t0) * 1000)
+
+    floor_ms = []
+    limits = httpx.Limits(max_connections=200, max_keepalive_connections=200)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as http:
+        # same burst against the health check: the HTTP cost on this host
+        await asyncio.gather(*(floor(http) for _ in expiring))
+        await asyncio.gather(*(submit(http, c) for c in expiring))
+        graded = await asyncio.gather(*(wait_graded(http, c) for c in jobs))
+    return np.array(floor_ms), np.array(submit_ms), rejected, graded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--submissions", type=int, default=400)
+    parser.add_argument("--depth", type=int, default=2000, help="SUBMISSION_QUEUE_DEPTH for the server")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    base = f"http://127.0.0.1:{args.port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(url, args.submissions)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app",
+             "--port", str(args.port), "--log-level", "warning", "--timeout-keep-alive", "60"],
+            env={**os.environ, "DATABASE_URL": url, "SUBMISSION_QUEUE_DEPTH": str(args.depth)},
+        )
+        try:
+            wait_ready(base, server)
+            floor_ms, submit_ms, rejected, graded = asyncio.run(spike(base, args.submissions))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{args.submissions} submissions at once, queue depth limit {args.depth}")
+    for label, ms in (("GET /", floor_ms), ("submit", submit_ms)):
+        print(f"{label:>9}  p50 {np.percentile(ms, 50):.1f} ms  p99 {np.percentile(ms, 99):.1f} ms  max {ms.max():.1f} ms")
+    print(f"429s {rejected}")
+    failed = sum(1 for _, _, state in graded if state != "done")
+    for label, flag in (("expiring", True), ("fresh", False)):
+        waits = np.array([s for e, s, _ in graded if e is flag]) * 1000
+        if len(waits):
+            print(f"{label:>9} graded after  p50 {np.percentile(waits, 50):.0f} ms  max {waits.max():.0f} ms")
+    print(f"failed jobs {failed}")
+
+
+if __name__ == "__main__":
+    main()
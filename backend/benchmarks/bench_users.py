@@ -0,0 +1,121 @@
+# exporting every user: old GET /users/ vs keyset pages vs the NDJSON stream
+# Starts the app (uvicorn, one worker) on a seeded temp database, once per
+# mode so peak RSS is per mode. "orm" is a benchmark-only route shaped like
+# the old list_users (every User object, validated into one JSON array);
+# "pages" walks GET /users/ 1000 rows at a time via X-Next-Cursor;
+# "ndjson" reads GET /users/?format=ndjson in one streamed response.
+# run from backend/:  python -m benchmarks.bench_users --users 200000
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+import httpx
+
+from benchmarks.bench_async_load import wait_ready
+from benchmarks.bench_login import peak_rss_kb
+from benchmarks.bench_sse import rss_kb
+
+
+def seed(url, users):
+    from sqlalchemy import insert
+
+    from db import make_engine
+    from models import Base, User
+
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for start in range(1, users + 1, 50_000):
+            conn.execute(insert(User), [
+                {"user_id": i, "email": f"user{i}@example.com", "password_hash": "-" * 80,
+                 "role": "recruiter" if i % 20 == 0 else "candidate", "full_name": f"User Number {i}",
+                 "is_active": i % 7 != 0}
+                for i in range(start, min(start + 50_000, users + 1))
+            ])
+    engine.dispose()
+
+
+def serve(port):
+    import uvicorn
+    from fastapi import Depends
+    from sqlalchemy.orm import Session
+
+    from main import app
+    from models import User
+    from users import UserOut, get_db
+
+    @app.get("/_bench/users-orm", response_model=List[UserOut])
+    def list_users_orm(db: Session = Depends(get_db)):
+        return db.query(User).all()
+
+    uvicorn.run(app, port=port, log_level="warning")
+
+
+def export(base, mode):
+    """(rows, bytes) read from the server."""
+    with httpx.Client(base_url=base, timeout=600) as http:
+        if mode == "orm":
+            r = http.get("/_bench/users-orm")
+            r.raise_for_status()
+            return len(r.json()), len(r.content)
+        if mode == "pages":
+            rows = size = 0
+            params = {"limit": 1000}
+            while True:
+                r = http.get("/users/", params=params)
+                r.raise_for_status()
+                rows += len(r.json())
+                size += len(r.content)
+                if "x-next-cursor" not in r.headers:
+                    return rows, size
+                params["cursor"] = r.headers["x-next-cursor"]
+        rows = size = 0
+        with http.stream("GET", "/users/", params={"format": "ndjson"}) as r:
+            r.raise_for_status()
+            for line in r.iter_lines():
+                rows += 1
+                size += len(line) + 1
+        return rows, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--port", type=int, default=8769)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    base = f"http://127.0.0.1:{args.port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(url, args.users)
+        print(f"{args.users} users")
+        print(f"{'mode':>7}  {'rows':>7}  {'MB':>6}  {'seconds':>7}  {'peak RSS':>8}")
+        for mode in ("orm", "pages", "ndjson"):
+            server = subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.bench_users", "--serve", "--port", str(args.port)],
+                env={**os.environ, "DATABASE_URL": url},
+            )
+            try:
+                wait_ready(base, server)
+                idle = rss_kb(server.pid)
+                t0 = time.perf_counter()
+                rows, size = export(base, mode)
+                elapsed = time.perf_counter() - t0
+                peak = peak_rss_kb(server.pid)
+            finally:
+                server.terminate()
+                server.wait()
+            print(f"{mode:>7}  {rows:>7}  {size / 2 ** 20:>6.1f}  {elapsed:>7.2f}  {(peak - idle) / 1024:>+6.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# determinism check for the grade cache key
+# Runs submissions through grade_cache.normalize and fails (exit 1) when one
+# whose output can differ between runs (hash / id values, set ordering,
+# modules reached around the import check) gets a cache key, or when a
+# plain answer does not.
+# run from backend/:  python -m benchmarks.check_grade_cache
+import sys
+
+from grade_cache import normalize
+
+# (name, code, should be cached)
+CASES = [
+    ("plain answer", "print(sum(int(x) for x in input().split()))", True),
+    ("pure import", "import math\nprint(math.sqrt(16))", True),
+    ("dict ordering", "print(list({'b': 1, 'a': 2}))", True),
+    ("time import", "import time\nprint(time.time())", False),
+    ("__import__", "print(__import__('random').random())", False),
+    ("importlib", "import math\nprint(math.importlib)", False),
+    ("builtins lookup", "print(__builtins__.__dict__['__import__']('os').getpid())", False),
+    ("hash", "print(hash('abc'))", False),
+    ("id", "print(id(object()))", False),
+    ("set literal", "print(list({'a', 'b', 'c'}))", False),
+    ("set comprehension", "print([c for c in {c for c in 'abc'}])", False),
+    ("set call", "print(list(set('abc')))", False),
+    ("frozenset", "print(list(frozenset('abc')))", False),
+    ("eval", "print(eval('1 + 1'))", False),
+    ("getattr", "import math\nprint(getattr(math, 'pi'))", False),
+]
+
+
+def main():
+    failures = 0
+    for name, code, should_cache in CASES:
+        cached = normalize(code) is not None
+        ok = cached == should_cache
+        failures += not ok
+        print(f"{name:<18} {'cached' if cached else 'bypass':<7} {'ok' if ok else 'FAILED'}")
+    sys.exit(failures)
+
+
+if __name__ == "__main__":
+    main()
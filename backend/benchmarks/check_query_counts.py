@@ -0,0 +1,118 @@
+# statement-count check for the course endpoints
+# Seeds a fresh SQLite database with a small and a large catalogue, counts
+# the statements each endpoint sends (before_cursor_execute on both
+# engines) and fails (exit 1) when a count exceeds its bound or grows with
+# the number of courses, i.e. when a per-course query creeps back in.
+# run from backend/:  python -m benchmarks.check_query_counts
+import os
+import subprocess
+import sys
+import tempfile
+
+# (path, most statements allowed)
+ENDPOINTS = [
+    ("/courses/?candidate_id=2", 1),
+    ("/courses/1?candidate_id=2", 3),
+]
+
+# catalogue sizes compared; counts must not differ between them
+SIZES = (3, 60)
+
+
+def seed(url, courses):
+    from sqlalchemy import insert
+
+    from db import make_engine
+    from models import (
+        Assessment, Base, CandidateAssessment, Course, Level, Task, TechnicalDomain, User,
+    )
+
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(TechnicalDomain), [{"domain_id": 1, "name": "python"}])
+        conn.execute(insert(User), [
+            {"user_id": 2, "email": "cand@x.io", "password_hash": "-", "role": "candidate", "full_name": "C"},
+        ])
+        conn.execute(insert(Course), [
+            {"course_id": c, "domain_id": 1, "difficulty_level": 1, "description": f"course {c}"}
+            for c in range(1, courses + 1)
+        ])
+        # a retired assessment ahead of each active one
+        conn.execute(insert(Assessment), [
+            {"assessment_id": 2 * c - 1 + a, "course_id": c, "time_limit_minutes": 30, "is_active": bool(a)}
+            for c in range(1, courses + 1) for a in (0, 1)
+        ])
+        conn.execute(insert(CandidateAssessment), [
+            {"candidate_id": 2, "assessment_id": 2 * c, "total_score": 50} for c in range(1, courses + 1, 2)
+        ])
+        conn.execute(insert(Level), [
+            {"level_id": c * 10 + n, "course_id": c, "name": f"L{n}", "order": n}
+            for c in range(1, courses + 1) for n in (1, 2)
+        ])
+        conn.execute(insert(Task), [
+            {"task_id": level * 10 + t, "level_id": level, "type": "content", "title": "T", "content": "x", "order": t}
+            for c in range(1, courses + 1) for level in (c * 10 + 1, c * 10 + 2) for t in (1, 2)
+        ])
+    engine.dispose()
+
+
+def count():
+    """{path: (status, statements)} against the DATABASE_URL database."""
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    import main
+    from async_db import async_engine
+    from db import engine
+
+    statements = [0]
+
+    def counter(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", counter)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter)
+    client = TestClient(main.app)
+    counts = {}
+    for path, _ in ENDPOINTS:
+        statements[0] = 0
+        status = client.get(path).status_code
+        counts[path] = (status, statements[0])
+    return counts
+
+
+def main():
+    if "DATABASE_URL" in os.environ:
+        for path, (status, statements) in count().items():
+            print(f"{path}\t{status}\t{statements}")
+        return
+
+    # one process per catalogue size, so nothing is cached between them
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            url = f"sqlite:///{os.path.join(tmp, f'courses_{size}.db')}"
+            seed(url, size)
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.check_query_counts"],
+                cwd=backend, env={**os.environ, "DATABASE_URL": url},
+                capture_output=True, text=True, check=True,
+            ).stdout
+            for line in out.splitlines():
+                path, status, statements = line.split("\t")
+                results[path, size] = (int(status), int(statements))
+
+    failures = 0
+    for path, bound in ENDPOINTS:
+        counts = [results[path, size] for size in SIZES]
+        ok = all(status == 200 and n <= bound for status, n in counts) and len({n for _, n in counts}) == 1
+        failures += not ok
+        shown = "  ".join(f"{size} courses: {n}" for size, (_, n) in zip(SIZES, counts))
+        print(f"GET {path:<28} {shown}  (max {bound})  {'ok' if ok else 'FAILED'}")
+    sys.exit(failures)
+
+
+if __name__ == "__main__":
+    main()
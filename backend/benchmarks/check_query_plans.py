@@ -0,0 +1,140 @@
+# EXPLAIN QUERY PLAN check for the main endpoints
+# Calls each endpoint against a fresh SQLite database built by `alembic upgrade
+# head`, captures every SELECT it issues and fails (exit 1) when SQLite plans a
+# full table scan.
+# run from backend/:  python -m benchmarks.check_query_plans
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+# tables an endpoint legitimately reads in full (the course catalogue)
+ALLOWED_SCANS = {"courses"}
+
+# (app, method, path, json body); "candidate" is main called as candidate 2
+ENDPOINTS = [
+    ("main", "POST", "/auth/login", {"email": "rec@x.io", "password": "pw"}),
+    ("main", "GET", "/users/2", None),
+    ("main", "GET", "/users/?role=candidate&active=true&cursor=1", None),
+    ("main", "GET", "/candidate/domains/2", None),
+    ("main", "GET", "/courses/?candidate_id=2", None),
+    ("main", "GET", "/courses/1?candidate_id=2", None),
+    ("main", "GET", "/courses/tasks/11", None),
+    ("main", "GET", "/recruiters/1/roles", None),
+    ("candidate", "GET", "/interviews/candidates/2/interviews?decision=pending", None),
+    ("main", "GET", "/notifications/users/1?cursor=2100-01-01T00:00:00:9", None),
+    ("main", "GET", "/notifications/users/1/unread", None),
+    ("recruiter", "GET", "/recruiters/1/pipeline", None),
+    ("recruiter", "GET", "/recruiters/1/candidates/2", None),
+    ("recruiter", "GET", "/recruiters/1/interviews", None),
+    ("recruiter", "GET", "/recruiters/1/availability", None),
+    ("recruiter", "GET", "/recruiters/1/notifications", None),
+]
+
+# "SCAN t" / "SCAN t AS x" without an index; "SCAN t USING INDEX" is a range walk
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+def seed(url):
+    from sqlalchemy import insert
+
+    from db import make_engine
+    from models import (
+        Assessment, CandidateJobMatch, CandidateSkillLevel, Company, Course, Interview, JobRole,
+        JobRoleRequirement, Level, Notification, Recruiter, RecruiterAvailability, Task,
+        TechnicalDomain, User, UserProfile,
+    )
+
+    engine = make_engine(url)
+    with engine.begin() as conn:
+        conn.execute(insert(TechnicalDomain), [{"domain_id": 1, "name": "python"}])
+        conn.execute(insert(User), [
+            {"user_id": 1, "email": "rec@x.io", "password_hash": "hashed-pw", "role": "recruiter", "full_name": "R"},
+            {"user_id": 2, "email": "cand@x.io", "password_hash": "hashed-pw", "role": "candidate", "full_name": "C"},
+        ])
+        conn.execute(insert(UserProfile), [{"user_id": 2, "name": "C", "is_anonymous": False}])
+        conn.execute(insert(Company), [{"company_id": 1, "name": "Co"}])
+        conn.execute(insert(Recruiter), [{"recruiter_id": 1, "user_id": 1, "company_id": 1}])
+        conn.execute(insert(JobRole), [{"role_id": 1, "company_id": 1, "title": "Dev"}])
+        conn.execute(insert(JobRoleRequirement), [{"role_id": 1, "domain_id": 1, "minimum_level": 2}])
+        conn.execute(insert(CandidateSkillLevel), [{"candidate_id": 2, "domain_id": 1, "level": 3}])
+        conn.execute(insert(CandidateJobMatch), [{"candidate_id": 2, "role_id": 1, "match_score": 80}])
+        conn.execute(insert(Course), [{"course_id": 1, "domain_id": 1, "difficulty_level": 1, "description": "c"}])
+        conn.execute(insert(Assessment), [{"assessment_id": 1, "course_id": 1, "time_limit_minutes": 60}])
+        conn.execute(insert(Level), [{"level_id": 1, "course_id": 1, "name": "L1", "order": 1}])
+        conn.execute(insert(Task), [{"task_id": 11, "level_id": 1, "type": "content", "title": "T", "content": "x", "order": 1}])
+        conn.execute(insert(Interview), [{"candidate_id": 2, "recruiter_id": 1, "role_id": 1, "status": "requested"}])
+        conn.execute(insert(RecruiterAvailability), [{"recruiter_id": 1}])
+        conn.execute(insert(Notification), [{"user_id": 1, "type": "t", "message": "m"}])
+    engine.dispose()
+
+
+def check():
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    import main
+    import recruiter
+    import session_tokens
+    from async_db import async_engine
+    from db import engine
+    from domain_index import registry as domain_registry
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    # loaded by main's startup hook, which TestClient only runs as a context manager
+    domain_registry.load()
+
+    event.listen(engine, "before_cursor_execute", capture)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+
+    # recruiter 1 of company 1; ignored by the endpoints that need no token
+    token, _ = session_tokens.issue(1, "recruiter", recruiter_id=1, company_id=1)
+    headers = {"Authorization": f"Bearer {token}"}
+    candidate_token, _ = session_tokens.issue(2, "candidate")
+    apps = {
+        "main": TestClient(main.app, headers=headers),
+        "recruiter": TestClient(recruiter.app, headers=headers),
+        "candidate": TestClient(main.app, headers={"Authorization": f"Bearer {candidate_token}"}),
+    }
+    failures = 0
+    with engine.connect() as conn:
+        for app, method, path, body in ENDPOINTS:
+            captured.clear()
+            status = apps[app].request(method, path, json=body).status_code
+            scans = set()
+            for statement, parameters in captured:
+                for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+                    match = FULL_SCAN.match(row[-1])
+                    if match and match.group(1) not in ALLOWED_SCANS:
+                        scans.add(match.group(1))
+            failures += bool(scans)
+            verdict = f"FULL SCAN {', '.join(sorted(scans))}" if scans else "ok"
+            print(f"{method:>5} {path:<34} {status}  {len(captured):>2} queries  {verdict}")
+    return failures
+
+
+def main():
+    if "DATABASE_URL" in os.environ:
+        sys.exit(check())
+
+    # empty database built by the migrations alone, so indexes that exist
+    # in models.py but not in a migration fail here; then re-run against it
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'plans.db')}"
+        env = {**os.environ, "DATABASE_URL": url}
+        subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=backend, env=env, check=True)
+        subprocess.run([sys.executable, "-c", "from benchmarks.check_query_plans import seed; import db; seed(db.DATABASE_URL)"],
+                       cwd=backend, env=env, check=True)
+        result = subprocess.run([sys.executable, "-m", "benchmarks.check_query_plans"], cwd=backend, env=env)
+    sys.exit(result.returncode)
+
+
+if __name__ == "__main__":
+    main()
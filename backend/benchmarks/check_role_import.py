@@ -0,0 +1,67 @@
+# row validation check for the bulk role import
+# Parses JSON lines and CSV uploads with malformed rows through the import
+# parsers and fails (exit 1) unless every bad row comes back as a per-row
+# error (rather than raising or reaching the database) and every good row
+# parses to the expected record.
+# run from backend/:  python -m benchmarks.check_role_import
+import io
+import json
+import sys
+
+from role_import import csv_records, jsonl_records
+
+# (name, row, expected record or None for a per-row error)
+JSONL_ROWS = [
+    ("valid", {"title": "Dev", "description": "d", "requirements": ["Python:3", {"text": "SQL", "level": 2}]},
+     {"title": "Dev", "description": "d", "requirements": [("Python", 3), ("SQL", 2)]}),
+    ("no requirements", {"title": "Dev"}, {"title": "Dev", "description": None, "requirements": []}),
+    ("number requirement", {"title": "Dev", "requirements": [5]}, None),
+    ("list requirement", {"title": "Dev", "requirements": [["Python", 3]]}, None),
+    ("object description", {"title": "Dev", "description": {"a": 1}, "requirements": []}, None),
+    ("number description", {"title": "Dev", "description": 7}, None),
+    ("text level", {"title": "Dev", "requirements": [{"text": "Python", "level": "high"}]}, None),
+    ("float level", {"title": "Dev", "requirements": [{"text": "Python", "level": 2.5}]}, None),
+    ("bool level", {"title": "Dev", "requirements": [{"text": "Python", "level": True}]}, None),
+    ("level too high", {"title": "Dev", "requirements": [{"text": "Python", "level": 101}]}, None),
+    ("negative level", {"title": "Dev", "requirements": [{"text": "Python", "level": -1}]}, None),
+]
+
+CSV_ROWS = [
+    ("valid", "Dev,d,Python:3;SQL", {"title": "Dev", "description": "d", "requirements": [("Python", 3), ("SQL", None)]}),
+    ("level too high", "Dev,d,Python:500", None),
+    ("no title", ",d,Python:3", None),
+]
+
+
+def verdicts(name, parsed, expected):
+    """(name, ok) for one parsed row."""
+    if expected is None:
+        return name, isinstance(parsed, str)
+    return name, parsed == expected
+
+
+def main():
+    results = []
+    body = "\n".join(json.dumps(row) for _, row, _ in JSONL_ROWS).encode()
+    try:
+        parsed = [record for _, record in jsonl_records(io.BytesIO(body))]
+    except Exception as exc:
+        parsed = [f"raised {type(exc).__name__}"] * len(JSONL_ROWS)
+    for (name, _, expected), record in zip(JSONL_ROWS, parsed):
+        results.append(("jsonl", *verdicts(name, record, expected), record))
+
+    body = "\n".join(["title,description,requirements"] + [row for _, row, _ in CSV_ROWS]).encode()
+    parsed = [record for _, record in csv_records(io.BytesIO(body))]
+    for (name, _, expected), record in zip(CSV_ROWS, parsed):
+        results.append(("csv", *verdicts(name, record, expected), record))
+
+    failures = 0
+    for fmt, name, ok, record in results:
+        failures += not ok
+        shown = record if isinstance(record, str) else "parsed"
+        print(f"{fmt:>5}  {name:<20} {'ok' if ok else 'FAILED'}  {shown}")
+    sys.exit(failures)
+
+
+if __name__ == "__main__":
+    main()
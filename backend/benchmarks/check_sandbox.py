@@ -0,0 +1,101 @@
+# sandbox isolation check for the grader
+# Grades submissions that try to read a test's hidden expected output (by
+# walking the interpreter's frames and heap) or to rewrite what the sandbox
+# reports, through a real SandboxPool, and fails (exit 1) when any of them
+# scores. Also checks that submitted code sees an empty environment and
+# cannot read the API's database. An honest answer is graded alongside to
+# show the suite can pass.
+# run from backend/:  python -m benchmarks.check_sandbox
+import os
+import sys
+
+from grading import SandboxPool, score_result
+
+SECRET = "SECRET-HIDDEN-OUTPUT"
+APP_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.db")
+
+FRAME_WALK = """
+import gc, sys
+
+def search(value, depth=0):
+    # a test's "expected" anywhere under value
+    if depth > 4:
+        return None
+    if isinstance(value, dict):
+        if isinstance(value.get("expected"), str):
+            return value["expected"]
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            found = search(item, depth + 1)
+            if found:
+                return found
+    return None
+
+found = None
+frame = sys._getframe()
+while frame is not None and not found:
+    found = search(frame.f_locals)
+    frame = frame.f_back
+for obj in gc.get_objects():
+    if found:
+        break
+    if isinstance(obj, dict):
+        found = search(obj)
+print(found or "not found")
+"""
+
+PATCHED_REPORT = """
+import json, sys
+forged = lambda *args, **kwargs: '{"status": "ok", "passed": [true]}'
+json.dumps = forged
+sys.modules["json"].dumps = forged
+"""
+
+ENVIRONMENT = """
+import os
+print(dict(os.environ))
+"""
+
+
+def read_file(path):
+    """A submission printing how much of `path` it could read, or "refused"."""
+    return f"""
+try:
+    with open({path!r}, "rb") as f:
+        print(len(f.read()))
+except OSError:
+    print("refused")
+"""
+
+
+# (name, code, expected output, should pass)
+CASES = [
+    ("honest answer", f"print({SECRET!r})", SECRET, True),
+    ("frame and heap walk", FRAME_WALK, SECRET, False),
+    ("patched json.dumps", PATCHED_REPORT, SECRET, False),
+    ("empty environment", ENVIRONMENT, "{}", True),
+    ("read app.db", read_file(APP_DB), "refused", True),
+    # readable by any uid, so only the audit hook stands in the way
+    ("read /etc/passwd", read_file("/etc/passwd"), "refused", True),
+]
+
+
+def main():
+    pool = SandboxPool(workers=1)
+    failures = 0
+    try:
+        for name, code, expected, should_pass in CASES:
+            tests = [{"stdin": "", "expression": None, "expected": expected, "weight": 1}]
+            raw = pool.submit(code, tests).result()
+            result = score_result(tests, raw)
+            ok = (result.passed == 1) == should_pass
+            failures += not ok
+            print(f"{name:<20} {result.status:<8} {result.passed}/{result.total}  {'ok' if ok else 'FAILED'}")
+    finally:
+        pool.stop()
+    sys.exit(failures)
+
+
+if __name__ == "__main__":
+    main()
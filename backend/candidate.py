@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import bindparam, insert, select
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List
 
+import match_tracker
+from async_db import read_handler
 from db import SessionLocal
-from models import CandidateSkillLevel, TechnicalDomain
+from domain_index import registry as domain_registry
+from models import CandidateSkillLevel, User
 
 def get_db():
     db = SessionLocal()
@@ -18,58 +22,135 @@ router = APIRouter (
     tags=["candidate"]
 )
 
+# users per POST /candidate/domains/batch
+MAX_BATCH_USERS = 5000
+
+# candidate ids per IN (...) when reading current selections
+READ_CHUNK = 500
+
 class CandidateDomainsIn(BaseModel):
     user_id: int
     domains: List[str]
 
+class CandidateDomainsBatchIn(BaseModel):
+    users: List[CandidateDomainsIn] = Field(max_length=MAX_BATCH_USERS)
+
+# -----------------------------
+# Helpers
+# -----------------------------
+
+def domain_ids_for(index, names):
+    """(domain ids, unknown names) from the cached name -> domain_id map."""
+    ids, unknown = set(), []
+    for name in names:
+        domain_id = index.domain_id(name)
+        if domain_id is None:
+            unknown.append(name)
+        else:
+            ids.add(domain_id)
+    return ids, unknown
+
+
+def sync_candidate_domains(db: Session, selections) -> tuple:
+    """
+    Make each candidate's skill rows match {user_id: {domain_id}}: insert the
+    added domains at level 0, delete the removed ones and leave the rest, and
+    their levels, untouched. Only candidates whose selection changed are
+    queued for a match rescore. Does not commit; returns (added, removed).
+    """
+    table = CandidateSkillLevel.__table__
+    user_ids = list(selections)
+    current = {}
+    for start in range(0, len(user_ids), READ_CHUNK):
+        rows = db.execute(
+            select(table.c.candidate_id, table.c.domain_id)
+            .where(table.c.candidate_id.in_(user_ids[start:start + READ_CHUNK]))
+        )
+        for candidate_id, domain_id in rows:
+            current.setdefault(candidate_id, set()).add(domain_id)
+
+    added, removed = [], []
+    for user_id, wanted in selections.items():
+        have = current.get(user_id, set())
+        added += [{"candidate_id": user_id, "domain_id": d, "level": 0} for d in wanted - have]
+        removed += [{"cid": user_id, "did": d} for d in have - wanted]
+
+    if removed:
+        db.execute(
+            table.delete().where(table.c.candidate_id == bindparam("cid"), table.c.domain_id == bindparam("did")),
+            removed,
+        )
+    if added:
+        db.execute(insert(table), added)
+    # core statements skip the flush hooks, so flag the changed candidates
+    match_tracker.mark_dirty(
+        db, candidate_ids={r["candidate_id"] for r in added} | {r["cid"] for r in removed}
+    )
+    return len(added), len(removed)
+
+# -----------------------------
+# Routes
+# -----------------------------
+
 @router.post("/domains")
 def save_candidate_domains (
     payload: CandidateDomainsIn,
     db: Session = Depends(get_db)
 ):
-    user_id = payload.user_id
-    domain_names = payload.domains
-    # remove existing domain selection for this user
-    db.query(CandidateSkillLevel).filter (
-        CandidateSkillLevel.candidate_id == user_id
-    ).delete()
-
-    # fetch domain records by name
-    domains = db.query(TechnicalDomain).filter (
-        TechnicalDomain.name.in_(domain_names)
-    ).all()
-
-    if len(domains) != len(domain_names):
+    domain_ids, unknown = domain_ids_for(domain_registry.index(db), payload.domains)
+    if unknown:
         raise HTTPException (
             status_code = 400,
             detail = "One or more domains are invalid"
         )
-    
-    # insert new domain selections
-    for domain in domains:
-        db.add (
-            CandidateSkillLevel (
-                candidate_id = user_id,
-                domain_id = domain.domain_id,
-                level = 0
-            )
-        )
+
+    # only added and removed domains are written; kept ones keep their level
+    added, removed = sync_candidate_domains(db, {payload.user_id: domain_ids})
     db.commit()
-    return {"status": "ok"}
+    return {"status": "ok", "added": added, "removed": removed}
+
+@router.post("/domains/batch")
+def save_candidate_domains_batch (
+    payload: CandidateDomainsBatchIn,
+    db: Session = Depends(get_db)
+):
+    """
+    Set many candidates' domain selections at once (onboarding imports).
+    All-or-nothing: unknown domains or users reject the whole batch.
+    """
+    index = domain_registry.index(db)
+    selections, unknown = {}, set()
+    for item in payload.users:
+        if item.user_id in selections:
+            raise HTTPException(status_code=400, detail=f"Duplicate user_id {item.user_id}")
+        selections[item.user_id], missing = domain_ids_for(index, item.domains)
+        unknown.update(missing)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown domains: {', '.join(sorted(unknown))}")
+
+    user_ids = list(selections)
+    found = set()
+    for start in range(0, len(user_ids), READ_CHUNK):
+        found.update(db.scalars(select(User.user_id).where(User.user_id.in_(user_ids[start:start + READ_CHUNK]))))
+    if len(found) != len(user_ids):
+        missing = sorted(set(user_ids) - found)
+        raise HTTPException(status_code=400, detail=f"Unknown users: {', '.join(map(str, missing[:20]))}")
+
+    added, removed = sync_candidate_domains(db, selections)
+    db.commit()
+    return {"status": "ok", "users": len(selections), "added": added, "removed": removed}
 
 # load selected domains
 @router.get("/domains/{user_id}", response_model=List[str])
+@read_handler
 def get_candidate_domains (
     user_id: int,
     db: Session = Depends(get_db)
 ):
-    rows = (
-        db.query(TechnicalDomain.name).join (
-            CandidateSkillLevel,
-            CandidateSkillLevel.domain_id == TechnicalDomain.domain_id
-        )
-        .filter(CandidateSkillLevel.candidate_id == user_id)
-        .all()
-    )
+    # names come from the in-memory domain registry instead of a join
+    domain_ids = db.scalars (
+        select(CandidateSkillLevel.domain_id)
+        .where(CandidateSkillLevel.candidate_id == user_id)
+    ).all()
 
-    return [row[0] for row in rows]
\ No newline at end of file
+    return [name for name in domain_registry.names(db, domain_ids) if name is not None]
@@ -0,0 +1,179 @@
+# in-process cache for course content (Course / Level / Task)
+# Content is effectively immutable after authoring, so course trees and task
+# bodies are kept in memory and only the per-candidate progress overlay is
+# read per request. Writes through SessionLocal drop the affected entries.
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+
+from db import SessionLocal
+from models import Assessment, Course, Level, Task
+
+# total size of cached payloads, in bytes of their JSON encoding
+MAX_BYTES = 32 * 1024 * 1024
+
+# entries older than this are reloaded, bounding staleness when another
+# process (seed_db.py, a second worker) edits content
+MAX_AGE_SECONDS = 300
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag over JSON-serialisable parts."""
+    blob = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":")).encode()
+    return f'W/"{hashlib.sha1(blob).hexdigest()[:20]}"'
+
+
+def etag_matches(if_none_match, etag) -> bool:
+    """True when an If-None-Match header covers `etag`."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    strip = lambda tag: tag.strip().removeprefix("W/")
+    return strip(etag) in {strip(tag) for tag in if_none_match.split(",")}
+
+
+class ContentCache:
+    """
+    LRU of key -> (etag, payload) capped by total payload size. Also
+    remembers which course each cached level / task belongs to so that a
+    write to any of them can drop the course tree.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES, max_age=MAX_AGE_SECONDS):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (etag, payload, size, loaded_at, children)
+        self._bytes = 0
+        self._course_of = {}  # ("level" | "task", id) -> course_id
+        # bumped by every invalidation; a load that raced one is not stored
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """(etag, payload) for a fresh entry, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[3] > self.max_age:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    @property
+    def version(self):
+        """Read before loading an entry from the database; pass it to put."""
+        return self._version
+
+    def put(self, key, payload, size, children=(), version=None):
+        """
+        Cache `payload` under `key` and return its etag. `children` are the
+        ("level" | "task", id) keys a ("course", id) entry was built from.
+        A payload loaded before an invalidation (`version` is behind) is
+        returned but not stored.
+        """
+        etag = make_etag(key, payload)
+        if size > self.max_bytes:
+            return etag
+
+        with self._lock:
+            if version is not None and version != self._version:
+                return etag
+            self._pop(key)
+            self._entries[key] = (etag, payload, size, time.monotonic(), tuple(children))
+            self._bytes += size
+            for child in children:
+                self._course_of[child] = key[1]
+            # evict least recently used entries until under the cap
+            while self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+        return etag
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[2]
+        for child in entry[4]:
+            self._course_of.pop(child, None)
+
+    def invalidate(self, course_ids=(), level_ids=(), task_ids=()):
+        with self._lock:
+            self._version += 1
+            courses = set(course_ids)
+            courses.update(self._course_of.get(("level", i)) for i in level_ids)
+            courses.update(self._course_of.get(("task", i)) for i in task_ids)
+            courses.discard(None)
+            for course_id in courses:
+                self._pop(("course", course_id))
+            for task_id in task_ids:
+                self._pop(("task", task_id))
+
+    def clear(self):
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._course_of.clear()
+            self._bytes = 0
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+
+cache = ContentCache()
+
+
+# -----------------------------
+# Invalidation hooks
+# -----------------------------
+_INFO_KEY = "content_dirty"
+
+# model -> (invalidate() argument, attribute holding that id)
+TRACKED = {
+    Course: ("course_ids", "course_id"),
+    Level: ("level_ids", "level_id"),
+    Task: ("task_ids", "task_id"),
+    # a course's tree carries its first active assessment
+    Assessment: ("course_ids", "course_id"),
+}
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_dirty(session, flush_context):
+    dirty = None
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        tracked = TRACKED.get(type(obj))
+        if tracked is None:
+            continue
+        if dirty is None:
+            dirty = session.info.setdefault(
+                _INFO_KEY, {"course_ids": set(), "level_ids": set(), "task_ids": set()}
+            )
+        arg, attr = tracked
+        state = inspect(obj)
+        dirty[arg].update(state.attrs[attr].history.sum())
+        # moving a level / task also changes its old and new parent
+        if isinstance(obj, Level):
+            dirty["course_ids"].update(state.attrs.course_id.history.sum())
+        elif isinstance(obj, Task):
+            dirty["level_ids"].update(state.attrs.level_id.history.sum())
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _dispatch_dirty(session):
+    dirty = session.info.pop(_INFO_KEY, None)
+    if dirty:
+        cache.invalidate(**{k: {i for i in v if i is not None} for k, v in dirty.items()})
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_dirty(session):
+    session.info.pop(_INFO_KEY, None)
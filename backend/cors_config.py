@@ -11,4 +11,5 @@ def add_cors_middleware(app):
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],  # keyset pagination cursor
     )
\ No newline at end of file
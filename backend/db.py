@@ -1,7 +1,8 @@
 # for sqlite3 connection 
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
 import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -13,11 +14,69 @@ DATABASE_URL = os.getenv (
     f"sqlite:///{os.path.join(BASE_DIR, 'app.db')}"
 )
 
+# -----------------------------
+# Tuning (all overridable from the environment)
+# -----------------------------
+
+# connection pool; used for both SQLite files and server databases
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))        # seconds to wait for a connection
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))      # seconds before a connection is replaced
+
+# per-connection SQLite pragmas: WAL lets readers run alongside the writer,
+# busy_timeout makes writers queue instead of failing with "database is locked"
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # negative = KiB, i.e. 64 MB
+    "temp_store": "MEMORY",
+}
+
+
+def _set_sqlite_pragmas(dbapi_conn, connection_record):
+    cur = dbapi_conn.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cur.execute(f"PRAGMA {name}={value}")
+    cur.close()
+
+
+def make_engine(url: str = DATABASE_URL, **kwargs):
+    """
+    Engine factory for the app database. SQLite files get WAL + the pragmas
+    above on every pooled connection; in-memory SQLite shares one connection;
+    anything else (e.g. postgresql://) gets a sized, pre-pinged pool.
+    Extra kwargs are passed through to create_engine.
+    """
+    if url.startswith("sqlite"):
+        in_memory = url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+        options = {"connect_args": {"check_same_thread": False}}
+        if in_memory:
+            options["poolclass"] = StaticPool
+        else:
+            options.update(pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW, pool_timeout=POOL_TIMEOUT)
+        options.update(kwargs)
+
+        eng = create_engine(url, **options)
+        if not in_memory:
+            event.listen(eng, "connect", _set_sqlite_pragmas)
+        return eng
+
+    options = dict(
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+    options.update(kwargs)
+    return create_engine(url, **options)
+
+
 # the actual db connection
-engine = create_engine (
-    DATABASE_URL,
-    connect_args = {"check_same_thread": False}
-)
+engine = make_engine(DATABASE_URL)
 
 # routes to db
 SessionLocal = sessionmaker (
@@ -26,4 +85,4 @@ SessionLocal = sessionmaker (
     bind=engine,
 )
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
@@ -0,0 +1,223 @@
+# process-wide TechnicalDomain registry
+# The catalogue is small and rarely changes, so it is loaded once (at
+# startup) into an immutable snapshot with O(1) id <-> name lookups, and
+# routers read names from it instead of joining technical_domains.
+# Free-text requirements ("Python 3", "strong JS skills", "pyhton") are
+# resolved against an inverted token index over domain names and
+# descriptions, weighted by how rare each token is across domains. Tokens
+# missing from the vocabulary get one fuzzy lookup (difflib) against it,
+# so common typos still resolve. Writes to technical_domains through
+# SessionLocal swap the snapshot and notify caches holding domain names.
+import math
+import re
+import threading
+import time
+from difflib import get_close_matches
+
+from sqlalchemy import event, select
+
+from db import SessionLocal
+from models import TechnicalDomain
+
+# rebuilt after this long, bounding staleness when another process edits domains
+MAX_AGE_SECONDS = 300
+
+# an id missing from a snapshot at least this old triggers one reload
+# (a domain another process added); younger snapshots are trusted
+MISS_RELOAD_SECONDS = 5
+
+# name tokens count this much more than description tokens
+NAME_WEIGHT = 2.0
+
+# difflib similarity needed to treat an unknown token as a typo of a known one
+FUZZY_CUTOFF = 0.8
+
+# common shorthand -> the token domain names use
+ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "golang": "go",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+}
+
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+
+
+def tokenize(text) -> list:
+    tokens = []
+    for token in _TOKEN.findall((text or "").lower()):
+        token = ALIASES.get(token, token)
+        if not token.isdigit():
+            tokens.append(token)
+    return tokens
+
+
+class DomainIndex:
+    """
+    token -> {domain_id: weight}. A text resolves to the domain with the
+    highest summed weight, provided it matched at least one token that not
+    every domain shares and no other domain ties it.
+    """
+
+    def __init__(self, domains, loaded_at=None, version=0):
+        # domains: (domain_id, name, description)
+        self.by_id = {}  # domain_id -> name
+        self.names = {}  # lowercased name -> domain_id
+        self.postings = {}
+        self.loaded_at = time.monotonic() if loaded_at is None else loaded_at
+        self.version = version
+
+        doc_tokens = {}
+        for domain_id, name, description in domains:
+            self.by_id[domain_id] = name
+            self.names[(name or "").strip().lower()] = domain_id
+            tokens = {t: 1.0 for t in tokenize(description)}
+            tokens.update((t, NAME_WEIGHT) for t in tokenize(name))
+            doc_tokens[domain_id] = tokens
+
+        n = len(doc_tokens)
+        df = {}
+        for tokens in doc_tokens.values():
+            for token in tokens:
+                df[token] = df.get(token, 0) + 1
+        # tokens every domain has (e.g. "development") are kept for tie-breaks
+        # but cannot resolve a text on their own
+        self.common = {t for t, count in df.items() if n > 1 and count == n}
+        for domain_id, tokens in doc_tokens.items():
+            for token, weight in tokens.items():
+                idf = math.log(1 + n / df[token])
+                self.postings.setdefault(token, {})[domain_id] = weight * idf
+        self.vocabulary = sorted(self.postings)
+        self._fuzzy = {}  # unknown token -> closest known token or None
+
+    def domain_id(self, name):
+        """domain_id for an exact (case-insensitive) domain name, or None."""
+        return self.names.get((name or "").strip().lower())
+
+    def name(self, domain_id):
+        """Domain name for an id, or None for an unknown (or NULL) id."""
+        return self.by_id.get(domain_id)
+
+    def resolve(self, text):
+        """domain_id for a requirement text, or None when nothing fits."""
+        exact = self.domain_id(text)
+        if exact is not None:
+            return exact
+
+        scores = {}
+        distinctive = set()
+        for token in set(tokenize(text)):
+            if token not in self.postings:
+                if token not in self._fuzzy:
+                    close = get_close_matches(token, self.vocabulary, n=1, cutoff=FUZZY_CUTOFF)
+                    self._fuzzy[token] = close[0] if close else None
+                token = self._fuzzy[token]
+                if token is None:
+                    continue
+            for domain_id, weight in self.postings[token].items():
+                scores[domain_id] = scores.get(domain_id, 0.0) + weight
+                if token not in self.common:
+                    distinctive.add(domain_id)
+        if not distinctive:
+            return None
+        ranked = sorted(scores.items(), key=lambda item: -item[1])
+        best, best_score = ranked[0]
+        if best not in distinctive or (len(ranked) > 1 and ranked[1][1] == best_score):
+            return None
+        return best
+
+
+class DomainRegistry:
+    """
+    Holds the current DomainIndex snapshot. Every invalidation bumps
+    `version`; a snapshot built while one happened is returned to its
+    caller but not kept. Callbacks registered with on_change run after each
+    invalidation, for caches that embed domain names.
+    """
+
+    def __init__(self, max_age=MAX_AGE_SECONDS):
+        self.max_age = max_age
+        self.version = 0
+        self._lock = threading.Lock()
+        self._index = None
+        self._listeners = []
+
+    def current(self):
+        """The snapshot if one is loaded and fresh, else None; never queries."""
+        index = self._index
+        if index is None or time.monotonic() - index.loaded_at > self.max_age:
+            return None
+        return index
+
+    def index(self, db=None) -> DomainIndex:
+        """The snapshot, loading it through `db` (or a new session) when missing or stale."""
+        index = self.current()
+        return index if index is not None else self.load(db)
+
+    def load(self, db=None) -> DomainIndex:
+        with self._lock:
+            version = self.version
+        stmt = select(TechnicalDomain.domain_id, TechnicalDomain.name, TechnicalDomain.description)
+        if db is None:
+            with SessionLocal() as session:
+                rows = session.execute(stmt).all()
+        else:
+            rows = db.execute(stmt).all()
+        index = DomainIndex(rows, version=version)
+        with self._lock:
+            if version == self.version:
+                self._index = index
+        return index
+
+    def names(self, db, domain_ids) -> list:
+        """
+        Name per id (None for NULL or unknown ids), in order. A non-null id
+        missing from the snapshot reloads it once before being given up on.
+        """
+        index = self.index(db)
+        missing = any(i is not None and index.name(i) is None for i in domain_ids)
+        if missing and time.monotonic() - index.loaded_at >= MISS_RELOAD_SECONDS:
+            index = self.load(db)
+        return [index.name(i) for i in domain_ids]
+
+    def resolve(self, db, text):
+        return self.index(db).resolve(text)
+
+    def on_change(self, callback):
+        self._listeners.append(callback)
+        return callback
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self._index = None
+        for callback in self._listeners:
+            callback()
+
+
+registry = DomainRegistry()
+
+
+# -----------------------------
+# Invalidation hooks
+# -----------------------------
+_INFO_KEY = "domains_dirty"
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_dirty(session, flush_context):
+    if any(isinstance(obj, TechnicalDomain) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_INFO_KEY] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _dispatch_dirty(session):
+    if session.info.pop(_INFO_KEY, None):
+        registry.invalidate()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_dirty(session):
+    session.info.pop(_INFO_KEY, None)
@@ -0,0 +1,133 @@
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import select
+
+import session_tokens
+from auth import bearer, current_identity
+from models import JobRole
+from pubsub import broker, company_channel, user_channel
+from session_tokens import Identity, InvalidToken
+
+router = APIRouter(
+    prefix="/events",
+    tags=["events"]
+)
+
+# idle streams get a comment line this often, so proxies keep them open and
+# dead clients are noticed
+HEARTBEAT_SECONDS = 15
+
+# client reconnect delay (ms) sent with the first frame
+RETRY_MS = 5000
+
+# -----------------------------
+# Publishers
+# -----------------------------
+
+def publish_notifications(rows):
+    """Push freshly written notification rows (dicts with notification_id) to their users."""
+    for row in rows:
+        broker.publish(user_channel(row["user_id"]), "notification", {
+            "notification_id": row["notification_id"],
+            "type": row["type"],
+            "message": row["message"],
+            "is_read": False,
+            "created_at": row["created_at"].isoformat(),
+        })
+
+
+def publish_matches(db, written):
+    """
+    Push rescored (candidate_id, role_id) -> score pairs: each candidate gets
+    their new scores, each company the ids of its roles whose ranking moved.
+    Pairs that fell below the match threshold are not listed, so clients
+    treat these as a cue to refetch.
+    """
+    if not written:
+        return
+    by_candidate, role_ids = {}, set()
+    for (candidate_id, role_id), score in written.items():
+        by_candidate.setdefault(candidate_id, {})[role_id] = score
+        role_ids.add(role_id)
+    for candidate_id, scores in by_candidate.items():
+        broker.publish(user_channel(candidate_id), "match", {"scores": scores})
+
+    by_company = {}
+    for role_id, company_id in db.execute(
+        select(JobRole.role_id, JobRole.company_id).where(JobRole.role_id.in_(role_ids))
+    ):
+        by_company.setdefault(company_id, []).append(role_id)
+    for company_id, ids in by_company.items():
+        broker.publish(company_channel(company_id), "match", {"role_ids": sorted(ids)})
+
+# -----------------------------
+# Helpers
+# -----------------------------
+
+def stream_identity(
+    token: Optional[str] = Query(None),
+    credentials: HTTPAuthorizationCredentials = Depends(bearer),
+) -> Identity:
+    """
+    Caller's identity for a stream. EventSource cannot send headers, so
+    browsers pass the session token as ?token=; other clients may use the
+    Authorization header.
+    """
+    if token is None:
+        return current_identity(credentials)
+    try:
+        return session_tokens.verify(token)
+    except InvalidToken as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+
+def sse(event: Optional[str], data) -> str:
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data)}\n\n"
+
+# -----------------------------
+# Routes
+# -----------------------------
+
+@router.get("/users/{user_id}")
+async def user_events(user_id: int, request: Request, identity: Identity = Depends(stream_identity)):
+    """
+    Server-sent events for one user: `notification` for each new
+    notification, `match` when their match scores (or, for recruiters, their
+    company's pipelines) change, and `resync` when events were dropped
+    because the client fell behind and it should refetch.
+    """
+    if identity.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized for this user")
+
+    # the token names the recruiter's company, so opening a stream needs no
+    # database query and the stream holds no pooled connection
+    channels = [user_channel(user_id)]
+    if identity.company_id is not None:
+        channels.append(company_channel(identity.company_id))
+
+    async def stream():
+        async with broker.subscribe(channels) as subscription:
+            yield f"retry: {RETRY_MS}\n: connected\n\n"
+            while True:
+                item = await subscription.get(HEARTBEAT_SECONDS)
+                if subscription.dropped:
+                    subscription.dropped = 0
+                    yield sse("resync", {})
+                if item is None:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                event, data = item
+                yield sse(event, data)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
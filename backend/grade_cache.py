@@ -0,0 +1,240 @@
+# grade cache for /assessments/submit
+# Submissions are normalised to their AST (comments, blank lines and
+# formatting drop out) and hashed together with the task's test suite, so
+# equivalent answers are scored once. Entries live in the grade_cache table
+# with LRU eviction, fronted by an in-process LRU; identical submissions in
+# flight share one sandbox run.
+import ast
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import grading
+from models import GradeCacheEntry
+
+# rows kept in grade_cache; least recently used rows beyond this are deleted
+MAX_ENTRIES = 50_000
+
+# eviction check runs once per this many stores
+EVICT_EVERY = 200
+
+# in-process tier in front of the table
+MEMORY_ENTRIES = 4096
+
+# hits served from memory are written back to the table in batches of this size
+TOUCH_BATCH = 100
+
+# grading outcomes that depend only on the source and the tests
+# (timeouts and memory failures can be load dependent)
+CACHEABLE = {"ok", "error"}
+
+# imports that keep a submission deterministic; anything else bypasses the cache
+PURE_MODULES = {
+    "math", "string", "collections", "itertools", "functools", "operator", "re",
+    "typing", "dataclasses", "heapq", "bisect", "statistics", "fractions", "decimal",
+}
+
+# names and attributes whose results vary between runs, or that reach modules
+# past the import check; a submission using any of them bypasses the cache
+IMPURE_NAMES = {
+    "__import__", "importlib", "__builtins__", "__globals__", "__loader__", "__spec__",
+    "globals", "locals", "vars", "eval", "exec", "compile", "getattr", "open",
+    "hash", "id", "set", "frozenset",
+}
+
+# set displays and comprehensions iterate in hash order, which varies per
+# process for strings
+IMPURE_NODES = (ast.Set, ast.SetComp)
+
+
+def normalize(code: str):
+    """
+    Canonical form of a submission: the AST dump, or None when the source
+    does not parse, imports something non-deterministic or uses a name
+    from IMPURE_NAMES.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            modules = [node.module or ""]
+        elif isinstance(node, IMPURE_NODES):
+            return None
+        elif isinstance(node, ast.Name) and node.id in IMPURE_NAMES:
+            return None
+        elif isinstance(node, ast.Attribute) and node.attr in IMPURE_NAMES:
+            return None
+        else:
+            continue
+        if any(m.split(".")[0] not in PURE_MODULES for m in modules):
+            return None
+    return ast.dump(tree)
+
+
+def suite_version(tests) -> str:
+    """Hash of a task's test suite as sent to the sandbox (see grading.suite_payload)."""
+    blob = json.dumps(grading.suite_payload(tests), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+
+def cache_key(task_id, tests, code):
+    normalized = normalize(code)
+    if normalized is None:
+        return None
+    blob = f"{task_id}\0{suite_version(tests)}\0{normalized}"
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class GradeCache:
+    def __init__(self, max_entries=MAX_ENTRIES, memory_entries=MEMORY_ENTRIES):
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (GradeResult, grade_ms)
+        self._touched = {}  # key -> memory hits not yet written to the table
+        self._inflight = {}  # key -> asyncio.Future of (GradeResult, grade_ms)
+        self._stores = 0
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.saved_ms = 0.0
+
+    def _count(self, attr, saved_ms=0.0):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+            self.saved_ms += saved_ms or 0.0
+
+    def _remember(self, key, result, grade_ms):
+        with self._lock:
+            self._memory[key] = (result, grade_ms)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _recall(self, key):
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+                self._touched[key] = self._touched.get(key, 0) + 1
+            return cached
+
+    async def _flush_touched(self, db):
+        """Write memory hits back so the table's LRU order reflects them."""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            table = GradeCacheEntry.__table__
+            await db.execute(
+                update(table)
+                .where(table.c.key == bindparam("k"))
+                .values(hits=table.c.hits + bindparam("n"), last_used=datetime.utcnow()),
+                [{"k": k, "n": n} for k, n in touched.items()],
+            )
+
+    async def grade(self, db, task_id, tests, code) -> grading.GradeResult:
+        """
+        Cached grading.grade. Cache writes are staged on `db` and land with
+        the caller's commit.
+        """
+        key = cache_key(task_id, tests, code)
+        if key is None:
+            self._count("bypassed")
+            return await grading.grade(code, tests)
+
+        cached = self._recall(key)
+        if cached is not None:
+            result, grade_ms = cached
+            self._count("hits", grade_ms)
+            if len(self._touched) >= TOUCH_BATCH:
+                await self._flush_touched(db)
+            return result
+
+        entry = await db.get(GradeCacheEntry, key)
+        if entry is not None:
+            entry.hits = (entry.hits or 0) + 1
+            entry.last_used = datetime.utcnow()
+            result = grading.GradeResult(
+                score=entry.score, passed=entry.passed, total=entry.total, status=entry.status
+            )
+            self._remember(key, result, entry.grade_ms)
+            self._count("hits", entry.grade_ms)
+            return result
+
+        shared = self._inflight.get(key)
+        if shared is not None:
+            result, grade_ms = await asyncio.shield(shared)
+            self._count("hits", grade_ms)
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        # mark a failure as retrieved even when nobody else was waiting on it
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            started = time.perf_counter()
+            result = await grading.grade(code, tests)
+            grade_ms = (time.perf_counter() - started) * 1000
+            if result.status in CACHEABLE:
+                self._remember(key, result, grade_ms)
+            future.set_result((result, grade_ms))
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._inflight[key]
+
+        self._count("misses")
+        if result.status in CACHEABLE:
+            await self._store(db, key, task_id, result, grade_ms)
+        return result
+
+    async def _store(self, db, key, task_id, result, grade_ms):
+        insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        await db.execute(
+            insert(GradeCacheEntry.__table__)
+            .values(
+                key=key, task_id=task_id, score=result.score, passed=result.passed,
+                total=result.total, status=result.status, grade_ms=grade_ms, hits=0,
+                last_used=datetime.utcnow(),
+            )
+            .on_conflict_do_nothing(index_elements=["key"])
+        )
+        await self._flush_touched(db)
+        with self._lock:
+            self._stores += 1
+            evict = self._stores % EVICT_EVERY == 0
+        if evict:
+            await self._evict(db)
+
+    async def _evict(self, db):
+        excess = (await db.scalar(select(func.count()).select_from(GradeCacheEntry))) - self.max_entries
+        if excess > 0:
+            oldest = select(GradeCacheEntry.key).order_by(GradeCacheEntry.last_used).limit(excess)
+            await db.execute(delete(GradeCacheEntry).where(GradeCacheEntry.key.in_(oldest)))
+
+    def metrics(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_ms": round(self.saved_ms, 1),
+            "memory_entries": len(self._memory),
+        }
+
+
+cache = GradeCache()
@@ -0,0 +1,179 @@
+# server-side grading of assessment submissions
+# A fixed pool of warm sandbox_worker.py processes; each submission is forked
+# from one of them, so interpreter startup is paid once per worker rather than
+# once per submission. Workers only see the code and each test's input; the
+# expected outputs never leave this process, and results are compared here.
+import asyncio
+import json
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+log = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("GRADER_WORKERS", str(os.cpu_count() or 2)))
+TIMEOUT_SECONDS = float(os.getenv("GRADER_TIMEOUT_SECONDS", "5"))
+MEMORY_MB = int(os.getenv("GRADER_MEMORY_MB", "256"))
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_worker.py")
+
+
+class GradingUnavailable(RuntimeError):
+    """The sandbox cannot run on this host (it needs fork and rlimits)."""
+
+
+@dataclass
+class GradeResult:
+    score: int  # 0-100, weighted share of passed tests
+    passed: int
+    total: int
+    status: str  # ok / error / timeout / memory / crashed
+
+
+def suite_payload(tests):
+    """TaskTestCase rows -> the dicts sandbox_worker.py expects."""
+    return [
+        {"stdin": t.stdin, "expression": t.expression, "expected": t.expected, "weight": t.weight or 1}
+        for t in tests
+    ]
+
+
+def worker_job(code, tests, limits) -> str:
+    """One job line for sandbox_worker.py: the code and each test's input, never its expected output."""
+    inputs = [{"stdin": t.get("stdin"), "expression": t.get("expression")} for t in tests]
+    return json.dumps({"code": code, "tests": inputs, "limits": limits}) + "\n"
+
+
+def _normalise(text):
+    return "\n".join(line.rstrip() for line in (text or "").strip().splitlines())
+
+
+def _passed(test, output):
+    if "error" in output:
+        return False
+    if test.get("expression"):
+        return output.get("value") == test["expected"]
+    return _normalise(output.get("stdout")) == _normalise(test["expected"])
+
+
+def score_result(tests, result) -> GradeResult:
+    outputs = result["outputs"]
+    if len(outputs) == len(tests):
+        passed = [_passed(t, o) for t, o in zip(tests, outputs)]
+    else:
+        passed = [False] * len(tests)
+    weights = [t["weight"] for t in tests]
+    earned = sum(w for w, ok in zip(weights, passed) if ok)
+    total = sum(weights)
+    return GradeResult(
+        score=round(100 * earned / total) if total else 0,
+        passed=sum(passed),
+        total=len(tests),
+        status=result["status"],
+    )
+
+
+class SandboxPool:
+    """
+    `workers` long-lived sandbox processes, each driven by one thread that
+    feeds it jobs from a shared queue. A worker that dies is replaced.
+    """
+
+    def __init__(self, workers=WORKERS, timeout=TIMEOUT_SECONDS, memory_mb=MEMORY_MB):
+        self.workers = workers
+        self.limits = {"timeout": timeout, "memory_mb": memory_mb}
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._workdir = None
+
+    def _spawn(self):
+        # none of the API's environment (SESSION_SECRET, DATABASE_URL, ...)
+        # and an empty working directory, so relative paths reach nothing
+        return subprocess.Popen(
+            [sys.executable, "-I", WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            env={},
+            cwd=self._workdir,
+        )
+
+    def start(self):
+        if os.name != "posix":
+            raise GradingUnavailable("server-side grading needs a POSIX host")
+        with self._lock:
+            if self._threads:
+                return
+            self._workdir = tempfile.mkdtemp(prefix="grader-")
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"grader-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, code, tests) -> Future:
+        """Future resolving to sandbox_worker's {"status", "outputs"} dict; see score_result."""
+        self.start()
+        future = Future()
+        self._jobs.put((worker_job(code, tests, self.limits), future))
+        return future
+
+    @property
+    def pending(self):
+        return self._jobs.qsize()
+
+    def _run(self):
+        proc = self._spawn()
+        try:
+            while True:
+                item = self._jobs.get()
+                if item is None:
+                    return
+                job, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    proc.stdin.write(job)
+                    proc.stdin.flush()
+                    line = proc.stdout.readline()
+                    if not line:
+                        raise RuntimeError("sandbox worker exited")
+                    future.set_result(json.loads(line))
+                except Exception as e:
+                    log.exception("sandbox worker failed; restarting it")
+                    future.set_exception(e)
+                    proc.kill()
+                    proc.wait()
+                    proc = self._spawn()
+        finally:
+            proc.kill()
+            proc.wait()
+
+    def stop(self, timeout=None):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._jobs.put(None)
+        for thread in threads:
+            thread.join(timeout)
+        if threads and self._workdir:
+            shutil.rmtree(self._workdir, ignore_errors=True)
+            self._workdir = None
+
+
+pool = SandboxPool()
+
+
+async def grade(code, tests) -> GradeResult:
+    """Run `code` against TaskTestCase rows without blocking the event loop."""
+    payload = suite_payload(tests)
+    result = await asyncio.wrap_future(pool.submit(code, payload))
+    return score_result(payload, result)
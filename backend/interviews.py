@@ -0,0 +1,158 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import BaseModel
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from async_db import read_handler
+from auth import current_candidate
+from db import SessionLocal
+from models import Company, Interview, InterviewDecision, InterviewNote, InterviewStatus, JobRole
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+router = APIRouter(
+    prefix="/interviews",
+    tags=["interviews"]
+)
+
+# -----------------------------
+# Schemas
+# -----------------------------
+
+class CandidateInterviewItem(BaseModel):
+    interview_id: int
+    scheduled_time: Optional[str] = None
+    status: Optional[str] = None
+    role_id: Optional[int] = None
+    role_title: Optional[str] = None
+    company_name: Optional[str] = None
+    decision: Optional[str] = None
+    fit_score: Optional[int] = None
+    has_notes: bool
+
+# -----------------------------
+# Helpers
+# -----------------------------
+
+def parse_feed_cursor(cursor: Optional[str]):
+    """Keyset cursor "<scheduled_time iso or empty>:<interview_id>" from the previous page."""
+    if cursor is None:
+        return None
+    try:
+        scheduled, interview_id = cursor.rsplit(":", 1)
+        return (datetime.fromisoformat(scheduled) if scheduled else None), int(interview_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def feed_query(candidate_id: int):
+    """
+    One row per interview with its role, company and latest recruiter note,
+    newest first (unscheduled requests last).
+    """
+    latest_note = (
+        select(func.max(InterviewNote.id))
+        .where(InterviewNote.interview_id == Interview.interview_id)
+        .correlate(Interview)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Interview.interview_id,
+            Interview.scheduled_time,
+            Interview.status,
+            Interview.role_id,
+            JobRole.title,
+            Company.name,
+            InterviewNote.decision,
+            InterviewNote.fit_score,
+            InterviewNote.id,
+        )
+        .outerjoin(JobRole, JobRole.role_id == Interview.role_id)
+        .outerjoin(Company, Company.company_id == JobRole.company_id)
+        .outerjoin(InterviewNote, InterviewNote.id == latest_note)
+        .where(Interview.candidate_id == candidate_id)
+        .order_by(Interview.scheduled_time.desc().nulls_last(), Interview.interview_id.desc())
+    )
+
+
+def after_cursor(scheduled: Optional[datetime], interview_id: int):
+    """Rows that sort after (scheduled, interview_id) in feed_query's order."""
+    if scheduled is None:
+        return and_(Interview.scheduled_time.is_(None), Interview.interview_id < interview_id)
+    return or_(
+        Interview.scheduled_time < scheduled,
+        and_(Interview.scheduled_time == scheduled, Interview.interview_id < interview_id),
+        Interview.scheduled_time.is_(None),
+    )
+
+# -----------------------------
+# Routes
+# -----------------------------
+
+@router.get(
+    "/candidates/{candidate_id}/interviews",
+    response_model=List[CandidateInterviewItem],
+    dependencies=[Depends(current_candidate)],
+)
+@read_handler
+def candidate_interviews(
+    candidate_id: int,
+    response: Response,
+    status: Optional[InterviewStatus] = None,
+    decision: Optional[InterviewDecision] = None,
+    role: Optional[str] = Query(None, max_length=100, description="role title contains"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    A candidate's interviews with role, company and feedback in one query.
+    Pass the X-Next-Cursor header of a page as `cursor` to get the next one.
+    """
+    after = parse_feed_cursor(cursor)
+    stmt = feed_query(candidate_id)
+
+    if status is not None:
+        stmt = stmt.where(Interview.status == status)
+    if decision is InterviewDecision.pending:
+        # no note yet counts as pending
+        stmt = stmt.where(or_(InterviewNote.id.is_(None), InterviewNote.decision == decision))
+    elif decision is not None:
+        stmt = stmt.where(InterviewNote.decision == decision)
+    if role:
+        stmt = stmt.where(func.lower(JobRole.title).contains(role.lower(), autoescape=True))
+    if after is not None:
+        stmt = stmt.where(after_cursor(*after))
+
+    rows = db.execute(stmt.limit(limit)).all()
+
+    if len(rows) == limit:
+        last = rows[-1]
+        scheduled = last.scheduled_time.isoformat() if last.scheduled_time else ""
+        response.headers["X-Next-Cursor"] = f"{scheduled}:{last.interview_id}"
+
+    return [
+        CandidateInterviewItem(
+            interview_id=row.interview_id,
+            scheduled_time=row.scheduled_time.isoformat() if row.scheduled_time else None,
+            status=row.status.value if row.status else None,
+            role_id=row.role_id,
+            role_title=row.title,
+            company_name=row.name,
+            decision=row.decision.value if row.decision else None,
+            fit_score=row.fit_score,
+            has_notes=row.id is not None,
+        )
+        for row in rows
+    ]
@@ -6,6 +6,18 @@ from users import router as users_router
 from auth import router as auth_router
 from candidate import router as candidate_router
 from recruiter_routes import router as recruiter_router
+from submissions import router as submissions_router
+from interviews import router as interviews_router
+from notifications import router as notifications_router
+from events import router as events_router
+from notification_outbox import outbox
+from passwords import hasher
+from domain_index import registry as domain_registry
+import grading
+import session_tokens
+from submission_queue import queue as submission_queue
+from async_db import async_engine
+import match_tracker  # registers the session hooks that keep match scores fresh
 
 app = FastAPI(title="WeaselTalent API")
 
@@ -18,6 +30,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # keyset pagination cursor; grading queue poll location and interval
+    expose_headers=["X-Next-Cursor", "Location", "Retry-After"],
 )
 
 # -----------------------------
@@ -28,7 +42,48 @@ app.include_router(users_router)
 app.include_router(candidate_router)
 app.include_router(courses_router)
 app.include_router(recruiter_router)
-# app.include_router(interviews_router)
+app.include_router(submissions_router)
+app.include_router(interviews_router)
+app.include_router(notifications_router)
+app.include_router(events_router)
+
+# -----------------------------
+# Background workers
+# -----------------------------
+@app.on_event("startup")
+def check_session_secret():
+    # registered first, so a missing SESSION_SECRET stops startup before anything runs
+    session_tokens.require_secret()
+
+
+@app.on_event("startup")
+async def start_submission_queue():
+    submission_queue.start()
+
+
+@app.on_event("startup")
+def load_domain_registry():
+    # routers read domain names from memory instead of joining technical_domains
+    domain_registry.load()
+
+
+@app.on_event("shutdown")
+async def stop_submission_queue():
+    await submission_queue.stop()
+
+
+@app.on_event("shutdown")
+def stop_workers():
+    match_tracker.worker.stop(timeout=5)
+    grading.pool.stop(timeout=5)
+    outbox.stop(timeout=5)
+    hasher.stop()
+
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    # aiosqlite runs each pooled connection on a non-daemon thread
+    await async_engine.dispose()
 
 # -----------------------------
 # Health check (optional but useful)
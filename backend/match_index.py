@@ -0,0 +1,209 @@
+# in-memory top-K index over candidate_job_matches, one sorted array per role
+# Keeps recruiter pipeline reads off the database; rows past the cached
+# prefix are fetched with a keyset query on (role_id, match_score).
+import heapq
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+
+from sqlalchemy import and_, or_, select
+
+from models import CandidateJobMatch, JobRole
+
+# rows kept per role; pages past this fall through to SQL
+CAPACITY = 1000
+
+# roles (and company role lists) older than this are reloaded, bounding
+# staleness when another process (a second worker, a script) rescores
+MAX_AGE_SECONDS = 300
+
+
+class RoleTopK:
+    """
+    Exact top-N prefix of one role's matches ordered by (score DESC,
+    candidate_id ASC). `complete` means the prefix is the whole role.
+    """
+
+    def __init__(self, role_id, rows, complete, capacity=CAPACITY):
+        self.role_id = role_id
+        self.capacity = capacity
+        self.complete = complete
+        self.keys = sorted((-score, cand) for cand, score, _ in rows)
+        self.rows = {cand: (score, updated) for cand, score, updated in rows}
+        self.loaded_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def discard(self, cand):
+        old = self.rows.pop(cand, None)
+        if old is not None:
+            del self.keys[bisect_left(self.keys, (-old[0], cand))]
+
+    def put(self, cand, score, updated):
+        self.discard(cand)
+        key = (-score, cand)
+        # past the tail of a partial prefix we cannot know where it belongs
+        if not self.complete and self.keys and key > self.keys[-1]:
+            return
+        insort(self.keys, key)
+        self.rows[cand] = (score, updated)
+        if len(self.keys) > self.capacity:
+            _, dropped = self.keys.pop()
+            del self.rows[dropped]
+            self.complete = False
+
+    @property
+    def stale(self):
+        # a partial prefix that has shrunk a lot is cheaper to reload than to page past
+        return not self.complete and len(self.keys) < self.capacity // 2
+
+    def page(self, limit, after=None, inclusive=False):
+        """
+        Up to `limit` (-score, candidate_id) keys after the (score,
+        candidate_id) cursor (at-or-after when `inclusive`).
+        Returns (keys, exhausted) where exhausted means the cached prefix ran
+        out before `limit` and more rows may exist in the database.
+        """
+        start = 0
+        if after is not None:
+            key = (-after[0], after[1])
+            start = (bisect_left if inclusive else bisect_right)(self.keys, key)
+
+        keys = self.keys[start:start + limit]
+        return keys, len(keys) < limit and not self.complete
+
+    def updated(self, cand):
+        return self.rows.get(cand, (None, None))[1]
+
+
+class MatchIndex:
+    def __init__(self, capacity=CAPACITY, max_age=MAX_AGE_SECONDS):
+        self.capacity = capacity
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._roles = {}
+        self._company_roles = {}  # company_id -> (role_ids, loaded_at)
+        # bumped by every apply / invalidation; a load that raced one is used
+        # for its own read but not stored
+        self._version = 0
+
+    # -----------------------------
+    # Loading
+    # -----------------------------
+    def _fetch(self, db, role_id, limit, after=None, inclusive=False):
+        t = CandidateJobMatch
+        q = select(t.candidate_id, t.match_score, t.last_updated).where(t.role_id == role_id)
+        if after is not None:
+            score, cand = after
+            next_cand = t.candidate_id >= cand if inclusive else t.candidate_id > cand
+            q = q.where(or_(t.match_score < score, and_(t.match_score == score, next_cand)))
+        q = q.order_by(t.match_score.desc(), t.candidate_id.asc()).limit(limit)
+        return [tuple(r) for r in db.execute(q).all()]
+
+    def _role(self, db, role_id):
+        """The role's cached prefix; loaded outside the lock when missing, stale or too old."""
+        with self._lock:
+            entry = self._roles.get(role_id)
+            if entry is not None and not entry.stale and time.monotonic() - entry.loaded_at <= self.max_age:
+                return entry
+            version = self._version
+
+        rows = self._fetch(db, role_id, self.capacity + 1)
+        complete = len(rows) <= self.capacity
+        entry = RoleTopK(role_id, rows[: self.capacity], complete, self.capacity)
+        with self._lock:
+            if version == self._version:
+                self._roles[role_id] = entry
+        return entry
+
+    def company_roles(self, db, company_id):
+        with self._lock:
+            cached = self._company_roles.get(company_id)
+            if cached is not None and time.monotonic() - cached[1] <= self.max_age:
+                return cached[0]
+            version = self._version
+
+        roles = db.execute(
+            select(JobRole.role_id).where(JobRole.company_id == company_id)
+        ).scalars().all()
+        with self._lock:
+            if version == self._version:
+                self._company_roles[company_id] = (roles, time.monotonic())
+        return roles
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def _role_page(self, db, role_id, limit, after=None, after_role=None):
+        """Lazily yields (-score, candidate_id, role_id, last_updated), best first."""
+        # on an exact (score, candidate) tie with the cursor, higher role ids come later
+        inclusive = after_role is not None and role_id > after_role
+        entry = self._role(db, role_id)
+        with self._lock:
+            keys, exhausted = entry.page(limit, after, inclusive)
+
+        for neg, cand in keys:
+            yield neg, cand, role_id, entry.updated(cand)
+
+        if exhausted:
+            # continue past the cached prefix with a keyset query
+            if keys:
+                after, inclusive = (-keys[-1][0], keys[-1][1]), False
+            for cand, score, updated in self._fetch(db, role_id, limit - len(keys), after, inclusive):
+                yield -score, cand, role_id, updated
+
+    def top(self, db, role_ids, limit=50, after=None):
+        """
+        Best `limit` (score, candidate_id, role_id, last_updated) rows across
+        `role_ids`, ordered by score DESC, candidate_id, role_id and strictly
+        after the optional (score, candidate_id, role_id) cursor.
+        """
+        after_key = None if after is None else (after[0], after[1])
+        after_role = None if after is None else after[2]
+        pages = [self._role_page(db, rid, limit, after_key, after_role) for rid in role_ids]
+        # (-score, candidate, role) is unique, so tuples merge without a key function
+        merged = heapq.merge(*pages) if len(pages) > 1 else iter(pages[0] if pages else ())
+        return [(-neg, cand, role, updated) for neg, cand, role, updated in islice(merged, limit)]
+
+    # -----------------------------
+    # Sync
+    # -----------------------------
+    def apply(self, candidate_ids, written, stamp):
+        """
+        Fold a scoped recompute into the cached roles: `written` maps
+        (candidate_id, role_id) -> score for every row rewritten at `stamp`;
+        any other cached row for those candidates was deleted.
+        """
+        by_role = {}
+        for (cand, role), score in written.items():
+            by_role.setdefault(role, {})[cand] = score
+
+        with self._lock:
+            self._version += 1
+            for role_id, entry in self._roles.items():
+                scores = by_role.get(role_id, {})
+                for cand in candidate_ids:
+                    if cand in scores:
+                        entry.put(cand, scores[cand], stamp)
+                    else:
+                        entry.discard(cand)
+
+    def invalidate(self, role_ids=None):
+        """Drop cached roles (all of them when role_ids is None)."""
+        with self._lock:
+            self._version += 1
+            if role_ids is None:
+                self._roles.clear()
+            else:
+                for role_id in role_ids:
+                    self._roles.pop(role_id, None)
+
+    def forget_company(self, company_id):
+        with self._lock:
+            self._version += 1
+            self._company_roles.pop(company_id, None)
+
+
+index = MatchIndex()
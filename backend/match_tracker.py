@@ -0,0 +1,137 @@
+# incremental match recomputation
+# Session hooks record which candidates / roles had their matching inputs
+# change; after commit a background worker rescores only those rows.
+import logging
+import threading
+
+from sqlalchemy import event, inspect
+
+from db import SessionLocal
+from models import CandidateAssessment, CandidateSkillLevel, JobRoleRequirement
+from matching import recompute_matches
+
+log = logging.getLogger(__name__)
+
+# model -> (scope, attribute holding the id)
+TRACKED = {
+    CandidateSkillLevel: ("candidates", "candidate_id"),
+    CandidateAssessment: ("candidates", "candidate_id"),
+    JobRoleRequirement: ("roles", "role_id"),
+}
+
+_INFO_KEY = "match_dirty"
+
+
+# -----------------------------
+# Background worker
+# -----------------------------
+class MatchRecomputeWorker:
+    """
+    Single background thread that coalesces dirty ids and rescores them in
+    batches. Ids marked while a batch runs are picked up by the next one.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._cond = threading.Condition()
+        self._candidates = set()
+        self._roles = set()
+        self._busy = False
+        self._stopped = False
+        self._thread = None
+
+    def submit(self, candidate_ids=(), role_ids=()):
+        with self._cond:
+            self._candidates.update(candidate_ids)
+            self._roles.update(role_ids)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name="match-recompute", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def wait_idle(self, timeout=None) -> bool:
+        """Block until everything submitted so far has been rescored."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not (self._busy or self._candidates or self._roles),
+                timeout,
+            )
+
+    def stop(self, timeout=None):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopped or self._candidates or self._roles)
+                if self._stopped:
+                    return
+                candidates, self._candidates = self._candidates, set()
+                roles, self._roles = self._roles, set()
+                self._busy = True
+
+            try:
+                db = self.session_factory()
+                try:
+                    recompute_matches(db, candidate_ids=sorted(candidates), role_ids=sorted(roles))
+                finally:
+                    db.close()
+            except Exception:
+                log.exception("match recompute failed for %d candidates / %d roles", len(candidates), len(roles))
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+
+worker = MatchRecomputeWorker()
+
+
+# -----------------------------
+# Session hooks
+# -----------------------------
+def _dirty(session):
+    return session.info.setdefault(_INFO_KEY, {"candidates": set(), "roles": set()})
+
+
+def mark_dirty(session, candidate_ids=(), role_ids=()):
+    """
+    Flag ids for rescoring when `session` commits. Needed for bulk
+    query().update() / delete() calls, which bypass the flush hooks.
+    """
+    dirty = _dirty(session)
+    dirty["candidates"].update(i for i in candidate_ids if i is not None)
+    dirty["roles"].update(i for i in role_ids if i is not None)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_dirty(session, flush_context):
+    dirty = None
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        tracked = TRACKED.get(type(obj))
+        if tracked is None:
+            continue
+        scope, attr = tracked
+        # include the previous value so a moved row rescores both owners
+        history = inspect(obj).attrs[attr].history
+        ids = (*history.added, *history.unchanged, *history.deleted)
+        if dirty is None:
+            dirty = _dirty(session)
+        dirty[scope].update(i for i in ids if i is not None)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _dispatch_dirty(session):
+    dirty = session.info.pop(_INFO_KEY, None)
+    if dirty and (dirty["candidates"] or dirty["roles"]):
+        worker.submit(dirty["candidates"], dirty["roles"])
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_dirty(session):
+    session.info.pop(_INFO_KEY, None)
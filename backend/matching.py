@@ -0,0 +1,340 @@
+# match engine: scores every candidate against every job role
+from datetime import datetime
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from db import SessionLocal
+from events import publish_matches
+from match_index import index as match_index
+from models import (
+    Assessment,
+    CandidateAssessment,
+    CandidateJobMatch,
+    CandidateSkillLevel,
+    Course,
+    JobRoleRequirement,
+)
+
+# -----------------------------
+# Tuning
+# -----------------------------
+
+# an assessment score at or above this counts as having reached the course's
+# difficulty level in that course's domain
+PASS_SCORE = 60
+
+# pairs scoring below this are not stored (keeps the table sparse)
+MIN_MATCH_SCORE = 1
+
+# upper bound on the candidate x role score buffer, in cells
+BLOCK_CELLS = 8_000_000
+
+# rows per executemany() batch when upserting / deleting
+WRITE_BATCH = 5_000
+
+
+# -----------------------------
+# Matrix loading
+# -----------------------------
+
+def load_candidate_levels(
+    db: Session,
+    candidate_ids: Optional[Iterable[int]] = None,
+    domain_ids: Optional[Iterable[int]] = None,
+):
+    """
+    Effective (candidate_id, domain_id, level) triples: the self-reported
+    CandidateSkillLevel, raised to the difficulty of any passed course.
+    """
+    candidate_ids = None if candidate_ids is None else list(candidate_ids)
+    domain_ids = None if domain_ids is None else list(domain_ids)
+
+    skills = select(
+        CandidateSkillLevel.candidate_id,
+        CandidateSkillLevel.domain_id,
+        func.coalesce(CandidateSkillLevel.level, 0),
+    ).where(CandidateSkillLevel.domain_id.isnot(None))
+
+    passed = (
+        select(
+            CandidateAssessment.candidate_id,
+            Course.domain_id,
+            func.max(func.coalesce(Course.difficulty_level, 0)),
+        )
+        .join(Assessment, Assessment.assessment_id == CandidateAssessment.assessment_id)
+        .join(Course, Course.course_id == Assessment.course_id)
+        .where(
+            CandidateAssessment.total_score >= PASS_SCORE,
+            Course.domain_id.isnot(None),
+        )
+        .group_by(CandidateAssessment.candidate_id, Course.domain_id)
+    )
+
+    if candidate_ids is not None:
+        skills = skills.where(CandidateSkillLevel.candidate_id.in_(candidate_ids))
+        passed = passed.where(CandidateAssessment.candidate_id.in_(candidate_ids))
+    if domain_ids is not None:
+        skills = skills.where(CandidateSkillLevel.domain_id.in_(domain_ids))
+        passed = passed.where(Course.domain_id.in_(domain_ids))
+
+    rows = db.execute(skills).all() + db.execute(passed).all()
+    return np.array(rows, dtype=np.int64).reshape(-1, 3)
+
+
+def load_role_requirements(db: Session, role_ids: Optional[Iterable[int]] = None):
+    """(role_id, domain_id, minimum_level) triples for domain-resolved requirements."""
+    q = select(
+        JobRoleRequirement.role_id,
+        JobRoleRequirement.domain_id,
+        func.coalesce(JobRoleRequirement.minimum_level, 0),
+    ).where(
+        JobRoleRequirement.role_id.isnot(None),
+        JobRoleRequirement.domain_id.isnot(None),
+    )
+    if role_ids is not None:
+        q = q.where(JobRoleRequirement.role_id.in_(list(role_ids)))
+
+    rows = db.execute(q).all()
+    return np.array(rows, dtype=np.int64).reshape(-1, 3)
+
+
+def build_matrix(triples, row_ids, domain_ids):
+    """
+    Scatter (row_id, domain_id, level) triples into a dense
+    len(row_ids) x len(domain_ids) float32 matrix holding level + 1, so that
+    0 means "domain not listed" and a listed level 0 is still visible.
+    Duplicate cells keep the highest level. Both id arrays must be sorted and
+    contain every id in the triples.
+    """
+    m = np.zeros((len(row_ids), len(domain_ids)), dtype=np.float32)
+    if len(triples) == 0:
+        return m
+
+    r = np.searchsorted(row_ids, triples[:, 0])
+    d = np.searchsorted(domain_ids, triples[:, 1])
+    levels = np.maximum(triples[:, 2], 0).astype(np.float32) + 1.0
+    np.maximum.at(m, (r, d), levels)
+    return m
+
+
+# -----------------------------
+# Scoring
+# -----------------------------
+
+def expand_thresholds(skills, requirements):
+    """
+    Rewrite min(level, required) as a dot product so scoring becomes a
+    matrix multiply. With t_0 = 0 < t_1 < ... < t_J the distinct required
+    levels:
+
+        min(a, b) = sum_j clip(a - t_(j-1), 0, t_j - t_(j-1)) * [b >= t_j]
+
+    Returns (A, B) with one column block per threshold, such that
+    A @ B.T sums min(level, required) over domains.
+    """
+    thresholds = np.unique(requirements[requirements > 0])
+    if thresholds.size == 0:
+        return skills[:, :0], requirements[:, :0]
+    lower = np.concatenate([[0.0], thresholds[:-1]]).astype(np.float32)
+
+    a_blocks, b_blocks = [], []
+    for lo, hi in zip(lower, thresholds):
+        a_blocks.append(np.clip(skills - lo, 0.0, hi - lo))
+        b_blocks.append((requirements >= hi).astype(np.float32))
+    return np.hstack(a_blocks), np.hstack(b_blocks)
+
+
+def iter_score_blocks(skills, requirements, block_cells: int = BLOCK_CELLS):
+    """
+    Score a candidates x domains skill matrix against a roles x domains
+    requirement matrix (both as produced by build_matrix). Yields
+    (start, stop, scores) where scores is the int16 0-100 matrix for
+    candidate rows start:stop against every role.
+
+    Each required domain contributes min(level, required) / required and a
+    role's score is the mean over its required domains. Roles with no
+    resolved requirements score 0.
+    """
+    n_c = skills.shape[0]
+    n_r = requirements.shape[0]
+    if n_c == 0 or n_r == 0:
+        return
+
+    # per-domain weight 1 / (required * n_required) folds the mean into the sum
+    required = requirements > 0
+    n_req = required.sum(axis=1).astype(np.float32)
+    weight = np.zeros_like(requirements)
+    np.divide(100.0, requirements * np.maximum(n_req, 1.0)[:, None], out=weight, where=required)
+
+    a, b = expand_thresholds(skills, requirements)
+    # the weight is per (role, domain) so it can be folded into every threshold block
+    b *= np.tile(weight, (1, b.shape[1] // max(1, weight.shape[1])))
+    bt = np.ascontiguousarray(b.T)
+
+    # candidates are scored in blocks so the output buffer stays bounded
+    block = max(1, min(n_c, block_cells // n_r))
+    for start in range(0, n_c, block):
+        stop = min(start + block, n_c)
+        yield start, stop, np.rint(a[start:stop] @ bt).astype(np.int16)
+
+
+def score_matrix(skills, requirements, block_cells: int = BLOCK_CELLS):
+    """Score everything at once; returns the full candidates x roles int16 matrix."""
+    out = np.zeros((skills.shape[0], requirements.shape[0]), dtype=np.int16)
+    for start, stop, scores in iter_score_blocks(skills, requirements, block_cells):
+        out[start:stop] = scores
+    return out
+
+
+def load_matrices(db: Session, candidate_ids=None, role_ids=None):
+    """
+    Load the skill and requirement matrices for the given scope (None means
+    everyone). Returns (candidate_ids, role_ids, skills, requirements) with
+    the id arrays labelling the matrix rows.
+    """
+    req_triples = load_role_requirements(db, role_ids)
+    # when scoring a few roles only candidates listing one of their domains
+    # can score above 0, so skip loading everyone else
+    domain_ids = None if role_ids is None else np.unique(req_triples[:, 1]).tolist()
+    skill_triples = load_candidate_levels(db, candidate_ids, domain_ids)
+
+    cand = np.unique(skill_triples[:, 0])
+    roles = np.unique(req_triples[:, 0])
+    domains = np.unique(np.concatenate([skill_triples[:, 1], req_triples[:, 1]]))
+
+    skills = build_matrix(skill_triples, cand, domains)
+    reqs = build_matrix(req_triples, roles, domains)
+    return cand, roles, skills, reqs
+
+
+# -----------------------------
+# Persistence
+# -----------------------------
+
+def _insert_for(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        return pg_insert
+    return sqlite_insert
+
+
+def _chunks(seq, size):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+def _upsert_statement(db: Session):
+    insert = _insert_for(db)
+    stmt = insert(CandidateJobMatch.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=["candidate_id", "role_id"],
+        set_={
+            "match_score": stmt.excluded.match_score,
+            "last_updated": stmt.excluded.last_updated,
+        },
+    )
+
+
+def upsert_matches(db: Session, cand, roles, scores, stamp, min_score: int = MIN_MATCH_SCORE, collect=None):
+    """
+    Bulk-upsert every (candidate, role) pair in a score block that reaches
+    min_score. Written pairs are added to the `collect` dict as
+    (candidate_id, role_id) -> score when given. Returns the number of rows
+    written.
+    """
+    ci, ri = np.nonzero(scores >= min_score)
+    if len(ci) == 0:
+        return 0
+
+    rows = [
+        {"candidate_id": c, "role_id": r, "match_score": s, "last_updated": stamp}
+        for c, r, s in zip(cand[ci].tolist(), roles[ri].tolist(), scores[ci, ri].tolist())
+    ]
+    stmt = _upsert_statement(db)
+    for batch in _chunks(rows, WRITE_BATCH):
+        db.execute(stmt, batch)
+    if collect is not None:
+        collect.update(((r["candidate_id"], r["role_id"]), r["match_score"]) for r in rows)
+    return len(rows)
+
+
+def delete_stale_matches(db: Session, stamp, column=None, ids=None):
+    """
+    Remove rows (optionally limited to `column IN ids`) that were not
+    rewritten at `stamp`: pairs that fell below the threshold or whose
+    candidate / role lost its inputs.
+    """
+    table = CandidateJobMatch.__table__
+    base = table.delete().where(table.c.last_updated < stamp)
+    if column is None:
+        return db.execute(base).rowcount
+
+    removed = 0
+    for batch in _chunks(list(ids), WRITE_BATCH):
+        removed += db.execute(base.where(table.c[column].in_(batch))).rowcount
+    return removed
+
+
+def _score_and_write(db: Session, stamp, candidate_ids=None, role_ids=None, min_score=MIN_MATCH_SCORE, collect=None):
+    cand, roles, skills, reqs = load_matrices(db, candidate_ids, role_ids)
+    scored = written = 0
+    for start, stop, scores in iter_score_blocks(skills, reqs):
+        scored += scores.size
+        written += upsert_matches(db, cand[start:stop], roles, scores, stamp, min_score, collect)
+    return scored, written
+
+
+def recompute_matches(db: Session, candidate_ids=None, role_ids=None, min_score: int = MIN_MATCH_SCORE):
+    """
+    Rescore the given candidates against every role and every candidate
+    against the given roles, write the results and commit. Leaving both
+    scopes as None rebuilds the whole table.
+    Returns {"scored": pairs, "written": rows, "removed": rows}.
+    """
+    stamp = datetime.utcnow()
+    scored = written = removed = 0
+    candidate_rows, role_rows = {}, {}
+
+    if candidate_ids is None and role_ids is None:
+        scored, written = _score_and_write(db, stamp, min_score=min_score)
+        removed = delete_stale_matches(db, stamp)
+    else:
+        if candidate_ids:
+            s, w = _score_and_write(db, stamp, candidate_ids=candidate_ids, min_score=min_score, collect=candidate_rows)
+            scored, written = scored + s, written + w
+        if role_ids:
+            s, w = _score_and_write(db, stamp, role_ids=role_ids, min_score=min_score, collect=role_rows)
+            scored, written = scored + s, written + w
+        if candidate_ids:
+            removed += delete_stale_matches(db, stamp, "candidate_id", candidate_ids)
+        if role_ids:
+            removed += delete_stale_matches(db, stamp, "role_id", role_ids)
+
+    db.commit()
+
+    # keep the pipeline's top-K index in step with what was just written
+    if candidate_ids is None and role_ids is None:
+        match_index.invalidate()
+    else:
+        if candidate_ids:
+            match_index.apply(candidate_ids, candidate_rows, stamp)
+        if role_ids:
+            match_index.invalidate(role_ids)
+        publish_matches(db, {**role_rows, **candidate_rows})
+
+    return {"scored": scored, "written": written, "removed": removed}
+
+
+# -----------------------------
+# Run as a batch job
+# -----------------------------
+if __name__ == "__main__":
+    session = SessionLocal()
+    try:
+        print(recompute_matches(session))
+    finally:
+        session.close()
@@ -0,0 +1,207 @@
+"""baseline schema
+
+The tables the app created with create_all() before migrations were
+introduced, without the indexes later revisions add. Tables that already
+exist are left alone, so databases built by create_all() upgrade cleanly.
+
+Revision ID: 0000
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0000"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INTERVIEW_STATUS = sa.Enum("scheduled", "requested", "completed", "cancelled", name="interviewstatus")
+INTERVIEW_DECISION = sa.Enum("advance", "reject", "pending", name="interviewdecision")
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("user_id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False, unique=True),
+        sa.Column("password_hash", sa.String(), nullable=False),
+        sa.Column("role", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("last_login", sa.DateTime()),
+        sa.Column("is_active", sa.Boolean()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "user_profiles",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.user_id"), primary_key=True),
+        sa.Column("name", sa.String()),
+        sa.Column("dob", sa.DateTime()),
+        sa.Column("photo", sa.String()),
+        sa.Column("is_anonymous", sa.Boolean()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "technical_domains",
+        sa.Column("domain_id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False, unique=True),
+        sa.Column("description", sa.Text()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "candidate_skill_levels",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("users.user_id")),
+        sa.Column("domain_id", sa.Integer(), sa.ForeignKey("technical_domains.domain_id")),
+        sa.Column("level", sa.Integer()),
+        sa.UniqueConstraint("candidate_id", "domain_id"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "courses",
+        sa.Column("course_id", sa.Integer(), primary_key=True),
+        sa.Column("domain_id", sa.Integer(), sa.ForeignKey("technical_domains.domain_id")),
+        sa.Column("difficulty_level", sa.Integer()),
+        sa.Column("description", sa.Text()),
+        sa.Column("is_active", sa.Boolean()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "assessments",
+        sa.Column("assessment_id", sa.Integer(), primary_key=True),
+        sa.Column("course_id", sa.Integer(), sa.ForeignKey("courses.course_id")),
+        sa.Column("generated_at", sa.DateTime()),
+        sa.Column("time_limit_minutes", sa.Integer()),
+        sa.Column("is_active", sa.Boolean()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "candidate_assessments",
+        sa.Column("candidate_assessment_id", sa.Integer(), primary_key=True),
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("users.user_id")),
+        sa.Column("assessment_id", sa.Integer(), sa.ForeignKey("assessments.assessment_id")),
+        sa.Column("total_score", sa.Integer()),
+        sa.Column("completed_at", sa.DateTime()),
+        sa.UniqueConstraint("candidate_id", "assessment_id"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "levels",
+        sa.Column("level_id", sa.Integer(), primary_key=True),
+        sa.Column("course_id", sa.Integer(), sa.ForeignKey("courses.course_id")),
+        sa.Column("name", sa.String()),
+        sa.Column("order", sa.Integer()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "tasks",
+        sa.Column("task_id", sa.Integer(), primary_key=True),
+        sa.Column("level_id", sa.Integer(), sa.ForeignKey("levels.level_id")),
+        sa.Column("type", sa.String()),
+        sa.Column("title", sa.String()),
+        sa.Column("content", sa.Text()),
+        sa.Column("order", sa.Integer()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "candidate_task_progress",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("users.user_id"), nullable=False),
+        sa.Column("task_id", sa.Integer(), sa.ForeignKey("tasks.task_id"), nullable=False),
+        sa.Column("completed_at", sa.DateTime()),
+        sa.UniqueConstraint("candidate_id", "task_id"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "companies",
+        sa.Column("company_id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "recruiters",
+        sa.Column("recruiter_id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.user_id")),
+        sa.Column("company_id", sa.Integer(), sa.ForeignKey("companies.company_id")),
+        sa.Column("job_title", sa.String()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "job_roles",
+        sa.Column("role_id", sa.Integer(), primary_key=True),
+        sa.Column("company_id", sa.Integer(), sa.ForeignKey("companies.company_id")),
+        sa.Column("title", sa.String()),
+        sa.Column("description", sa.Text()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "job_role_requirements",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("role_id", sa.Integer(), sa.ForeignKey("job_roles.role_id")),
+        sa.Column("domain_id", sa.Integer(), sa.ForeignKey("technical_domains.domain_id")),
+        sa.Column("minimum_level", sa.Integer()),
+        sa.UniqueConstraint("role_id", "domain_id"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "candidate_job_matches",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("users.user_id")),
+        sa.Column("role_id", sa.Integer(), sa.ForeignKey("job_roles.role_id")),
+        sa.Column("match_score", sa.Integer()),
+        sa.Column("last_updated", sa.DateTime()),
+        sa.UniqueConstraint("candidate_id", "role_id"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "recruiter_availability",
+        sa.Column("availability_id", sa.Integer(), primary_key=True),
+        sa.Column("recruiter_id", sa.Integer(), sa.ForeignKey("recruiters.recruiter_id")),
+        sa.Column("start_time", sa.DateTime()),
+        sa.Column("end_time", sa.DateTime()),
+        sa.Column("is_booked", sa.Boolean()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "interviews",
+        sa.Column("interview_id", sa.Integer(), primary_key=True),
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("users.user_id")),
+        sa.Column("recruiter_id", sa.Integer(), sa.ForeignKey("recruiters.recruiter_id")),
+        sa.Column("role_id", sa.Integer(), sa.ForeignKey("job_roles.role_id")),
+        sa.Column("scheduled_time", sa.DateTime()),
+        sa.Column("status", INTERVIEW_STATUS),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "interview_notes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("interview_id", sa.Integer(), sa.ForeignKey("interviews.interview_id")),
+        sa.Column("recruiter_id", sa.Integer(), sa.ForeignKey("recruiters.recruiter_id")),
+        sa.Column("notes", sa.Text()),
+        sa.Column("fit_score", sa.Integer()),
+        sa.Column("decision", INTERVIEW_DECISION),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "notifications",
+        sa.Column("notification_id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.user_id")),
+        sa.Column("type", sa.String()),
+        sa.Column("message", sa.Text()),
+        sa.Column("is_read", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    for table in (
+        "notifications", "interview_notes", "interviews", "recruiter_availability",
+        "candidate_job_matches", "job_role_requirements", "job_roles", "recruiters", "companies",
+        "candidate_task_progress", "tasks", "levels", "candidate_assessments", "assessments",
+        "courses", "candidate_skill_levels", "technical_domains", "user_profiles", "users",
+    ):
+        op.drop_table(table, if_exists=True)
@@ -0,0 +1,45 @@
+"""indexes for the hot filter columns
+
+Matches the WHERE / ORDER BY shapes of the main endpoints. Foreign keys that
+already lead a unique constraint (candidate_task_progress.candidate_id,
+candidate_assessments.candidate_id, job_role_requirements.role_id,
+candidate_skill_levels.candidate_id, candidate_job_matches.candidate_id)
+are served by its index and are not duplicated here.
+
+Revision ID: 0001
+Revises: 0000
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = "0000"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns); kept in step with __table_args__ in models.py
+INDEXES = [
+    ("ix_notifications_user_created", "notifications", ["user_id", sa.text("created_at DESC")]),
+    ("ix_interviews_recruiter_time", "interviews", ["recruiter_id", "scheduled_time"]),
+    ("ix_interview_notes_interview", "interview_notes", ["interview_id"]),
+    ("ix_recruiter_availability_recruiter_start", "recruiter_availability", ["recruiter_id", "start_time"]),
+    ("ix_levels_course_order", "levels", ["course_id", "order"]),
+    ("ix_tasks_level_order", "tasks", ["level_id", "order"]),
+    ("ix_assessments_course", "assessments", ["course_id"]),
+    ("ix_recruiters_user", "recruiters", ["user_id"]),
+    ("ix_job_roles_company", "job_roles", ["company_id"]),
+    ("ix_candidate_skill_levels_domain_candidate", "candidate_skill_levels", ["domain_id", "candidate_id"]),
+    ("ix_candidate_job_matches_role_score", "candidate_job_matches", ["role_id", "match_score"]),
+]
+
+
+def upgrade():
+    # databases built with create_all() from the current models already have these
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,32 @@
+"""hidden test cases for server-side grading
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "task_test_cases",
+        sa.Column("test_id", sa.Integer(), primary_key=True),
+        sa.Column("task_id", sa.Integer(), sa.ForeignKey("tasks.task_id"), nullable=False),
+        sa.Column("stdin", sa.Text()),
+        sa.Column("expression", sa.Text()),
+        sa.Column("expected", sa.Text(), nullable=False),
+        sa.Column("weight", sa.Integer()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_task_test_cases_task", "task_test_cases", ["task_id"], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index("ix_task_test_cases_task", table_name="task_test_cases", if_exists=True)
+    op.drop_table("task_test_cases", if_exists=True)
@@ -0,0 +1,35 @@
+"""persistent cache of grades for normalised submissions
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "grade_cache",
+        sa.Column("key", sa.String(), primary_key=True),
+        sa.Column("task_id", sa.Integer(), sa.ForeignKey("tasks.task_id"), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("passed", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("grade_ms", sa.Float()),
+        sa.Column("hits", sa.Integer()),
+        sa.Column("last_used", sa.DateTime()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_grade_cache_last_used", "grade_cache", ["last_used"], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index("ix_grade_cache_last_used", table_name="grade_cache", if_exists=True)
+    op.drop_table("grade_cache", if_exists=True)
@@ -0,0 +1,55 @@
+"""durable queue of assessment submissions awaiting grading
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "submission_jobs",
+        sa.Column("job_id", sa.Integer(), primary_key=True),
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("users.user_id"), nullable=False),
+        sa.Column("task_id", sa.Integer(), sa.ForeignKey("tasks.task_id"), nullable=False),
+        sa.Column("answer_text", sa.Text(), nullable=False),
+        sa.Column("answer_hash", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("due_at", sa.DateTime(), nullable=False),
+        sa.Column("attempts", sa.Integer()),
+        sa.Column("score", sa.Integer()),
+        sa.Column("passed", sa.Integer()),
+        sa.Column("total", sa.Integer()),
+        sa.Column("result_status", sa.String()),
+        sa.Column("error", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime()),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_submission_jobs_status_due", "submission_jobs", ["status", "due_at", "job_id"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_submission_jobs_candidate_task", "submission_jobs", ["candidate_id", "task_id", "job_id"],
+        if_not_exists=True,
+    )
+    queued = sa.text("status = 'queued'")
+    op.create_index(
+        "ux_submission_jobs_queued", "submission_jobs", ["candidate_id", "task_id"], unique=True,
+        sqlite_where=queued, postgresql_where=queued, if_not_exists=True,
+    )
+
+
+def downgrade():
+    for name in ("ux_submission_jobs_queued", "ix_submission_jobs_candidate_task", "ix_submission_jobs_status_due"):
+        op.drop_index(name, table_name="submission_jobs", if_exists=True)
+    op.drop_table("submission_jobs", if_exists=True)
@@ -0,0 +1,23 @@
+"""index for the candidate interview feed
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_interviews_candidate_time", "interviews", ["candidate_id", "scheduled_time", "interview_id"],
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_interviews_candidate_time", table_name="interviews", if_exists=True)
@@ -0,0 +1,20 @@
+"""index for filtered keyset pages of GET /users/
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_users_role_user", "users", ["role", "user_id"], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index("ix_users_role_user", table_name="users", if_exists=True)
@@ -7,9 +7,11 @@ from sqlalchemy import (
     String,
     Boolean,
     DateTime,
+    Float,
     ForeignKey,
     Text,
     Enum,
+    Index,
     UniqueConstraint,
 )
 from sqlalchemy.orm import declarative_base, relationship
@@ -52,6 +54,21 @@ class User(Base):
     candidate_skills = relationship("CandidateSkillLevel", back_populates="candidate")
     notifications = relationship("Notification", back_populates="user")
 
+    __table_args__ = (
+        Index("ix_users_role_user", "role", "user_id"),
+    )
+
+
+## Candidate personal info + anonymity (recruiters only see the name when not anonymous)
+class UserProfile(Base):
+    __tablename__ = "user_profiles"
+
+    user_id = Column(Integer, ForeignKey("users.user_id"), primary_key=True)
+    name = Column(String)
+    dob = Column(DateTime)
+    photo = Column(String)
+    is_anonymous = Column(Boolean, default=True)
+
 # =====================================================
 # CANDIDATE DOMAIN + SKILLS
 # =====================================================
@@ -71,6 +88,7 @@ class CandidateSkillLevel(Base):
     __tablename__ = "candidate_skill_levels"
     __table_args__ = (
         UniqueConstraint("candidate_id", "domain_id"),
+        Index("ix_candidate_skill_levels_domain_candidate", "domain_id", "candidate_id"),
     )
 
     id = Column(Integer, primary_key=True)
@@ -103,6 +121,9 @@ class Course(Base):
 
 class Assessment(Base):
     __tablename__ = "assessments"
+    __table_args__ = (
+        Index("ix_assessments_course", "course_id"),
+    )
 
     assessment_id = Column(Integer, primary_key=True)
     course_id = Column(Integer, ForeignKey("courses.course_id"))
@@ -140,6 +161,9 @@ class CandidateTaskProgress(Base):
 
 class Level(Base):
     __tablename__ = "levels"
+    __table_args__ = (
+        Index("ix_levels_course_order", "course_id", "order"),
+    )
 
     level_id = Column(Integer, primary_key=True)
     course_id = Column(Integer, ForeignKey("courses.course_id"))
@@ -152,6 +176,9 @@ class Level(Base):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_level_order", "level_id", "order"),
+    )
 
     task_id = Column(Integer, primary_key=True)
     level_id = Column(Integer, ForeignKey("levels.level_id"))
@@ -162,6 +189,71 @@ class Task(Base):
 
     level = relationship("Level", back_populates="tasks")
 
+
+## Hidden test case for server-side grading of an assessment task
+class TaskTestCase(Base):
+    __tablename__ = "task_test_cases"
+    __table_args__ = (
+        Index("ix_task_test_cases_task", "task_id"),
+    )
+
+    test_id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey("tasks.task_id"), nullable=False)
+    stdin = Column(Text)
+    expression = Column(Text)  # evaluated after the submission runs; compared by repr()
+    expected = Column(Text, nullable=False)  # repr of the value, or the expected stdout
+    weight = Column(Integer, default=1)
+
+
+## Cached grade for a normalised submission (see grade_cache.py)
+class GradeCacheEntry(Base):
+    __tablename__ = "grade_cache"
+    __table_args__ = (
+        Index("ix_grade_cache_last_used", "last_used"),
+    )
+
+    key = Column(String, primary_key=True)  # sha256 of task, test-suite version and normalised source
+    task_id = Column(Integer, ForeignKey("tasks.task_id"), nullable=False)
+    score = Column(Integer, nullable=False)
+    passed = Column(Integer, nullable=False)
+    total = Column(Integer, nullable=False)
+    status = Column(String, nullable=False)
+    grade_ms = Column(Float)  # sandbox time the original grading took
+    hits = Column(Integer, default=0)
+    last_used = Column(DateTime, default=datetime.utcnow)
+
+
+## Assessment submission waiting for / finished with grading (see submission_queue.py)
+class SubmissionJob(Base):
+    __tablename__ = "submission_jobs"
+
+    job_id = Column(Integer, primary_key=True)
+    candidate_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
+    task_id = Column(Integer, ForeignKey("tasks.task_id"), nullable=False)
+    answer_text = Column(Text, nullable=False)
+    answer_hash = Column(String, nullable=False)  # sha256 of answer_text
+    status = Column(String, nullable=False, default="queued")  # queued / running / done / failed
+    due_at = Column(DateTime, nullable=False)  # grading order: earliest first
+    attempts = Column(Integer, default=0)
+    score = Column(Integer)
+    passed = Column(Integer)
+    total = Column(Integer)
+    result_status = Column(String)  # grading.GradeResult.status
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_submission_jobs_status_due", "status", "due_at", "job_id"),
+        Index("ix_submission_jobs_candidate_task", "candidate_id", "task_id", "job_id"),
+        # at most one queued job per candidate and task; resubmissions update it
+        Index(
+            "ux_submission_jobs_queued", "candidate_id", "task_id", unique=True,
+            sqlite_where=status == "queued", postgresql_where=status == "queued",
+        ),
+    )
+
 class Company(Base):
     __tablename__ = "companies"
 
@@ -177,6 +269,9 @@ class Company(Base):
 ## Recruiter working for company 
 class Recruiter(Base):
     __tablename__ = "recruiters"
+    __table_args__ = (
+        Index("ix_recruiters_user", "user_id"),
+    )
 
     recruiter_id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.user_id"))
@@ -189,6 +284,9 @@ class Recruiter(Base):
 ## Jobs offered by company
 class JobRole(Base):
     __tablename__ = "job_roles"
+    __table_args__ = (
+        Index("ix_job_roles_company", "company_id"),
+    )
 
     role_id = Column(Integer, primary_key=True)
     company_id = Column(Integer, ForeignKey("companies.company_id"))
@@ -228,6 +326,7 @@ class CandidateJobMatch(Base):
     __tablename__ = "candidate_job_matches"
     __table_args__ = (
         UniqueConstraint("candidate_id", "role_id"),
+        Index("ix_candidate_job_matches_role_score", "role_id", "match_score"),
     )
 
     id = Column(Integer, primary_key=True)
@@ -243,6 +342,9 @@ class CandidateJobMatch(Base):
 
 class RecruiterAvailability(Base):
     __tablename__ = "recruiter_availability"
+    __table_args__ = (
+        Index("ix_recruiter_availability_recruiter_start", "recruiter_id", "start_time"),
+    )
 
     availability_id = Column(Integer, primary_key=True)
     recruiter_id = Column(Integer, ForeignKey("recruiters.recruiter_id"))
@@ -255,6 +357,10 @@ class RecruiterAvailability(Base):
 ## Interview scheduled between candidate and recruite
 class Interview(Base):
     __tablename__ = "interviews"
+    __table_args__ = (
+        Index("ix_interviews_recruiter_time", "recruiter_id", "scheduled_time"),
+        Index("ix_interviews_candidate_time", "candidate_id", "scheduled_time", "interview_id"),
+    )
 
     interview_id = Column(Integer, primary_key=True)
     candidate_id = Column(Integer, ForeignKey("users.user_id"))
@@ -267,6 +373,9 @@ class Interview(Base):
 ## Notes by recruiter after interview
 class InterviewNote(Base):
     __tablename__ = "interview_notes"
+    __table_args__ = (
+        Index("ix_interview_notes_interview", "interview_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     interview_id = Column(Integer, ForeignKey("interviews.interview_id"))
@@ -290,4 +399,9 @@ class Notification(Base):
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # newest-first feed per user
+    __table_args__ = (
+        Index("ix_notifications_user_created", "user_id", created_at.desc()),
+    )
+
     user = relationship("User", back_populates="notifications")
@@ -0,0 +1,185 @@
+# notification outbox
+# Endpoints hand notifications to an in-process outbox instead of inserting
+# them inside their own transaction. One background thread writes them in
+# batches with a single executemany per batch, then pushes them to connected
+# clients. Unread counts per user are kept in memory next to it, so badges
+# never run a COUNT(*).
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import func, insert, select, update
+
+from db import SessionLocal
+from events import publish_notifications
+from models import Notification
+
+log = logging.getLogger(__name__)
+
+# rows per INSERT
+BATCH = int(os.getenv("NOTIFICATION_BATCH", "1000"))
+
+# how long a notification may wait for others to share its batch
+FLUSH_SECONDS = float(os.getenv("NOTIFICATION_FLUSH_SECONDS", "0.2"))
+
+# a batch that fails this many times is dropped (and logged)
+MAX_ATTEMPTS = 3
+
+# cached unread counts older than this are recounted, bounding drift from
+# other processes writing notifications
+COUNT_MAX_AGE = 60
+
+
+class NotificationOutbox:
+    """
+    Queue of notification rows waiting to be written. Rows are stamped with
+    created_at when posted, so the feed order does not depend on when a
+    batch lands.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._cond = threading.Condition()
+        # held for a batch's INSERT and COMMIT, so a recount never sees half of one
+        self._flushing = threading.Lock()
+        self._pending = []
+        # user_id -> rows queued or being written
+        self._unwritten = Counter()
+        # user_id -> (unread count, loaded_at)
+        self._unread = {}
+        self._attempts = 0
+        self._stopped = False
+        self._thread = None
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+    def post(self, user_id, type, message):
+        self.post_many([{"user_id": user_id, "type": type, "message": message}])
+
+    def post_many(self, rows):
+        """Queue notifications ({user_id, type, message} dicts)."""
+        now = datetime.utcnow()
+        rows = [{**row, "is_read": False, "created_at": now} for row in rows if row["user_id"] is not None]
+        if not rows:
+            return
+        with self._cond:
+            self._pending.extend(rows)
+            for row in rows:
+                user_id = row["user_id"]
+                self._unwritten[user_id] += 1
+                if user_id in self._unread:
+                    count, loaded_at = self._unread[user_id]
+                    self._unread[user_id] = (count + 1, loaded_at)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name="notification-outbox", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self, user_id=None):
+        """
+        Write queued rows now: all of them, or only if `user_id` has any
+        (read-your-writes for that user's feed).
+        """
+        while True:
+            with self._cond:
+                waiting = self._unwritten[user_id] if user_id is not None else len(self._pending)
+                if not waiting:
+                    return
+            if not self._write():
+                return
+
+    def _write(self) -> bool:
+        """Write one batch; False when it failed."""
+        with self._flushing:
+            with self._cond:
+                batch = self._pending[:BATCH]
+            if not batch:
+                return True
+            try:
+                with self.session_factory() as db:
+                    ids = db.scalars(
+                        insert(Notification).returning(Notification.notification_id, sort_by_parameter_order=True),
+                        batch,
+                    ).all()
+                    db.commit()
+            except Exception:
+                with self._cond:
+                    self._attempts += 1
+                    if self._attempts < MAX_ATTEMPTS:
+                        log.exception("notification batch of %d failed, will retry", len(batch))
+                        return False
+                    log.exception("dropping notification batch of %d after %d attempts", len(batch), self._attempts)
+            else:
+                publish_notifications({**row, "notification_id": i} for row, i in zip(batch, ids))
+            with self._cond:
+                self._attempts = 0
+                del self._pending[:len(batch)]
+                self._unwritten.subtract(row["user_id"] for row in batch)
+                self._unwritten += Counter()  # drop zero entries
+                self._cond.notify_all()
+            return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopped or self._pending)
+                if self._stopped:
+                    return
+                # give the batch time to fill up
+                self._cond.wait_for(lambda: self._stopped or len(self._pending) >= BATCH, FLUSH_SECONDS)
+            if not self._write():
+                time.sleep(FLUSH_SECONDS)
+
+    def stop(self, timeout=None):
+        """Stop the writer thread, writing whatever is still queued."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    # -----------------------------
+    # Unread counts
+    # -----------------------------
+    def unread(self, user_id) -> int:
+        with self._cond:
+            entry = self._unread.get(user_id)
+            if entry is not None and time.monotonic() - entry[1] <= COUNT_MAX_AGE:
+                return entry[0]
+        with self._flushing:
+            with self.session_factory() as db:
+                stored = db.scalar(
+                    select(func.count()).select_from(Notification).where(
+                        Notification.user_id == user_id, Notification.is_read.isnot(True)
+                    )
+                )
+            with self._cond:
+                count = stored + self._unwritten[user_id]
+                self._unread[user_id] = (count, time.monotonic())
+        return count
+
+    def mark_read(self, db, user_id, notification_ids=None) -> int:
+        """
+        Mark the user's notifications read (all of them when
+        notification_ids is None) and commit; returns how many changed.
+        """
+        self.flush(user_id)
+        stmt = update(Notification).where(Notification.user_id == user_id, Notification.is_read.isnot(True))
+        if notification_ids is not None:
+            stmt = stmt.where(Notification.notification_id.in_(notification_ids))
+        changed = db.execute(stmt.values(is_read=True).execution_options(synchronize_session=False)).rowcount
+        db.commit()
+        with self._cond:
+            if user_id in self._unread:
+                count, loaded_at = self._unread[user_id]
+                self._unread[user_id] = (max(0, count - changed), loaded_at)
+        return changed
+
+
+outbox = NotificationOutbox()
@@ -0,0 +1,130 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import BaseModel, Field
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from auth import current_user
+from db import SessionLocal
+from models import Notification
+from notification_outbox import outbox
+
+router = APIRouter(
+    prefix="/notifications",
+    tags=["notifications"]
+)
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# -----------------------------
+# Schemas
+# -----------------------------
+
+class NotificationOut(BaseModel):
+    notification_id: int
+    user_id: int
+    type: Optional[str] = None
+    message: Optional[str] = None
+    is_read: bool
+    created_at: Optional[str] = None
+
+
+class MarkReadIn(BaseModel):
+    # None marks every notification of the user read
+    notification_ids: Optional[List[int]] = Field(default=None, max_length=1000)
+
+# -----------------------------
+# Helpers
+# -----------------------------
+
+def parse_notification_cursor(cursor: Optional[str]):
+    """Keyset cursor "<created_at iso>:<notification_id>" from the previous page."""
+    if cursor is None:
+        return None
+    try:
+        created_at, notification_id = cursor.rsplit(":", 1)
+        return datetime.fromisoformat(created_at), int(notification_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def notification_page(db: Session, response: Response, user_id: int, limit: int,
+                      cursor: Optional[str] = None, unread_only: bool = False) -> List[NotificationOut]:
+    """
+    One newest-first page of a user's notifications, walking the
+    (user_id, created_at) index; sets X-Next-Cursor when more may follow.
+    """
+    after = parse_notification_cursor(cursor)
+    # notifications still in the outbox show up on the user's own feed
+    outbox.flush(user_id)
+
+    stmt = (
+        select(Notification)
+        .where(Notification.user_id == user_id)
+        .order_by(Notification.created_at.desc(), Notification.notification_id.desc())
+        .limit(limit)
+    )
+    if unread_only:
+        stmt = stmt.where(Notification.is_read.isnot(True))
+    if after is not None:
+        created_at, notification_id = after
+        stmt = stmt.where(or_(
+            Notification.created_at < created_at,
+            and_(Notification.created_at == created_at, Notification.notification_id < notification_id),
+        ))
+
+    rows = db.scalars(stmt).all()
+    if len(rows) == limit:
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = f"{last.created_at.isoformat()}:{last.notification_id}"
+
+    return [
+        NotificationOut(
+            notification_id=n.notification_id,
+            user_id=n.user_id,
+            type=n.type,
+            message=n.message,
+            is_read=bool(n.is_read),
+            created_at=n.created_at.isoformat() if n.created_at else None,
+        )
+        for n in rows
+    ]
+
+# -----------------------------
+# Routes
+# -----------------------------
+
+@router.get("/users/{user_id}", response_model=List[NotificationOut], dependencies=[Depends(current_user)])
+def list_notifications(
+    user_id: int,
+    response: Response,
+    unread_only: bool = False,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    A user's notifications, newest first. Pass the X-Next-Cursor header of a
+    page as `cursor` to get the next one.
+    """
+    return notification_page(db, response, user_id, limit, cursor, unread_only)
+
+
+@router.get("/users/{user_id}/unread", dependencies=[Depends(current_user)])
+def unread_count(user_id: int):
+    return {"user_id": user_id, "unread": outbox.unread(user_id)}
+
+
+@router.post("/users/{user_id}/read", dependencies=[Depends(current_user)])
+def mark_read(user_id: int, payload: MarkReadIn, db: Session = Depends(get_db)):
+    """Mark the given notifications (or all of them) read."""
+    updated = outbox.mark_read(db, user_id, payload.notification_ids)
+    return {"updated": updated, "unread": outbox.unread(user_id)}
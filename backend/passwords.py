@@ -0,0 +1,190 @@
+# password hashing
+# scrypt by default, PBKDF2-SHA256 as the alternative, both from hashlib so
+# there is nothing extra to install. The key derivation is deliberately
+# CPU-heavy, so every hash and verify runs on a small dedicated thread pool
+# (hashlib releases the GIL while deriving): the event loop and request
+# threads only wait on a future, and once MAX_PENDING derivations are queued
+# callers get HasherBusy instead of piling up. Stored hashes carry their own
+# parameters; a successful verify against older parameters (or a legacy
+# format) also returns a fresh hash, so logins upgrade them transparently.
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+# "scrypt" or "pbkdf2_sha256"; hashes in the other scheme are upgraded on login
+SCHEME = os.getenv("PASSWORD_SCHEME", "scrypt")
+
+# cost parameters; raising any of them rehashes users as they log in.
+# scrypt needs 128 * N * r bytes per derivation (16 MiB at the defaults)
+SCRYPT_N = int(os.getenv("SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.getenv("SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("SCRYPT_P", "1"))
+PBKDF2_ITERATIONS = int(os.getenv("PBKDF2_ITERATIONS", "600000"))
+
+# derivations running at once; more than the core count only adds latency
+WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 2)))
+
+# derivations queued or running before callers are turned away
+MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "64"))
+
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+# what users.create_user stored before real hashing
+LEGACY_PREFIX = "hashed-"
+
+
+class HasherBusy(Exception):
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Too many sign-ins in progress, try again shortly")
+        self.retry_after = retry_after
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode().rstrip("=")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r, dklen=KEY_BYTES
+    )
+
+
+def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations, dklen=KEY_BYTES)
+
+
+# -----------------------------
+# Hash format
+# -----------------------------
+# scrypt$<N>$<r>$<p>$<salt>$<key>
+# pbkdf2_sha256$<iterations>$<salt>$<key>
+def current_params(scheme: str = SCHEME) -> tuple:
+    if scheme == "scrypt":
+        return (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    if scheme == "pbkdf2_sha256":
+        return (PBKDF2_ITERATIONS,)
+    raise ValueError(f"unknown password scheme {scheme!r}")
+
+
+def hash_password(password: str, scheme: str = SCHEME, params: tuple = None) -> str:
+    """Derive a new salted hash. Blocking and slow; see PasswordHasher."""
+    params = params or current_params(scheme)
+    salt = os.urandom(SALT_BYTES)
+    if scheme == "scrypt":
+        key = _scrypt(password, salt, *params)
+    else:
+        key = _pbkdf2(password, salt, *params)
+    return "$".join([scheme, *map(str, params), _b64(salt), _b64(key)])
+
+
+def _verify_bcrypt(password: str, stored: str) -> bool:
+    # only databases seeded by older versions of seed_db.py hold these
+    try:
+        import bcrypt
+    except ImportError:
+        log.warning("bcrypt hash found but the bcrypt package is not installed")
+        return False
+    return bcrypt.checkpw(password.encode(), stored.encode())
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """Check a password against any stored format. Blocking and slow."""
+    if stored.startswith(LEGACY_PREFIX):
+        return hmac.compare_digest(stored.encode(), (LEGACY_PREFIX + password).encode())
+    if stored.startswith("$2"):
+        return _verify_bcrypt(password, stored)
+
+    scheme, *fields = stored.split("$")
+    try:
+        *params, salt, key = fields
+        params = [int(p) for p in params]
+        if scheme == "scrypt" and len(params) == 3:
+            derived = _scrypt(password, _unb64(salt), *params)
+        elif scheme == "pbkdf2_sha256" and len(params) == 1:
+            derived = _pbkdf2(password, _unb64(salt), *params)
+        else:
+            return False
+    except ValueError:  # malformed hash, e.g. a placeholder written by a seed script
+        return False
+    return hmac.compare_digest(derived, _unb64(key))
+
+
+def needs_rehash(stored: str, scheme: str = SCHEME) -> bool:
+    """True unless `stored` uses the configured scheme and cost parameters."""
+    prefix = "$".join([scheme, *map(str, current_params(scheme))]) + "$"
+    return not stored.startswith(prefix)
+
+
+# -----------------------------
+# Bounded executor
+# -----------------------------
+class PasswordHasher:
+    """
+    Runs hash_password / verify_password on `workers` threads with at most
+    `max_pending` derivations queued or running. Blocking callers (sync
+    endpoints) use hash / verify; async endpoints await hash_async /
+    verify_async.
+    """
+
+    def __init__(self, workers=WORKERS, max_pending=MAX_PENDING, scheme=SCHEME):
+        self.scheme = scheme
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hasher")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._dummy = None
+
+    def _submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _check(self, password, stored):
+        """(ok, replacement hash or None)."""
+        if stored is None:
+            # unknown account: spend the same time so response timing does
+            # not reveal which emails are registered
+            if self._dummy is None:
+                self._dummy = hash_password("", self.scheme)
+            verify_password(password, self._dummy)
+            return False, None
+        if not verify_password(password, stored):
+            return False, None
+        if needs_rehash(stored, self.scheme):
+            return True, hash_password(password, self.scheme)
+        return True, None
+
+    def hash(self, password: str) -> str:
+        return self._submit(hash_password, password, self.scheme).result()
+
+    def verify(self, password: str, stored) -> tuple:
+        """(ok, new_hash): new_hash is set when `stored` should be replaced."""
+        return self._submit(self._check, password, stored).result()
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(hash_password, password, self.scheme))
+
+    async def verify_async(self, password: str, stored) -> tuple:
+        return await asyncio.wrap_future(self._submit(self._check, password, stored))
+
+    def stop(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+hasher = PasswordHasher()
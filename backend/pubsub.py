@@ -0,0 +1,135 @@
+# in-process publish/subscribe for the push channel
+# Publishers (request handlers, the notification outbox thread, the match
+# recompute worker) call broker.publish from any thread; subscribers are
+# asyncio tasks reading a bounded queue. LocalBroker keeps everything in this
+# process; a networked broker (Redis pub/sub and the like) only has to
+# implement the same publish/subscribe/unsubscribe methods to replace it.
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+
+# events buffered per subscriber before it is considered too slow
+QUEUE_SIZE = 256
+
+
+class Subscription:
+    """One subscriber's queue of (event, data) pairs across its channels."""
+
+    def __init__(self, broker, channels, maxsize=QUEUE_SIZE):
+        self.broker = broker
+        self.channels = tuple(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        # events lost to a full queue since the subscriber last checked
+        self.dropped = 0
+
+    def _deliver(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def get(self, timeout=None):
+        """Next (event, data), or None when nothing arrived within `timeout`."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.broker.unsubscribe(self)
+
+
+class Broker(ABC):
+    """What a broker implements; one missing a method cannot be constructed."""
+
+    @abstractmethod
+    def publish(self, channel, event, data) -> None:
+        ...
+
+    @abstractmethod
+    def subscribe(self, channels, maxsize=QUEUE_SIZE) -> Subscription:
+        """Must be called from the event loop that will read the subscription."""
+
+    @abstractmethod
+    def unsubscribe(self, subscription) -> None:
+        ...
+
+
+class LocalBroker(Broker):
+    """
+    Broker for a single process. A publish hands the event to each
+    subscriber's event loop with one call_soon_threadsafe per loop, so
+    fan-out to many idle connections costs one wakeup, not one per
+    connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels = defaultdict(set)
+
+    def subscribe(self, channels, maxsize=QUEUE_SIZE):
+        subscription = Subscription(self, channels, maxsize)
+        with self._lock:
+            for channel in subscription.channels:
+                self._channels[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._channels.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._channels[channel]
+
+    def subscribers(self, channel) -> int:
+        with self._lock:
+            return len(self._channels.get(channel, ()))
+
+    def publish(self, channel, event, data):
+        with self._lock:
+            subscribers = self._channels.get(channel)
+            if not subscribers:
+                return
+            by_loop = defaultdict(list)
+            for subscription in subscribers:
+                by_loop[subscription.loop].append(subscription)
+
+        item = (event, data)
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for loop, group in by_loop.items():
+            if loop is current:
+                for subscription in group:
+                    subscription._deliver(item)
+                continue
+            try:
+                loop.call_soon_threadsafe(_deliver_all, group, item)
+            except RuntimeError:
+                # the subscriber's loop has shut down
+                for subscription in group:
+                    self.unsubscribe(subscription)
+
+
+def _deliver_all(subscriptions, item):
+    for subscription in subscriptions:
+        subscription._deliver(item)
+
+
+def user_channel(user_id) -> str:
+    return f"user:{user_id}"
+
+
+def company_channel(company_id) -> str:
+    return f"company:{company_id}"
+
+
+broker = LocalBroker()
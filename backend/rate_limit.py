@@ -0,0 +1,56 @@
+# in-process token buckets
+# One bucket per key (client IP, email, ...) holding up to `burst` tokens and
+# refilled continuously at `per_minute`. Buckets live in an LRU capped at
+# `max_keys`, so a flood of distinct keys costs bounded memory; an evicted
+# key simply starts again with a full bucket. Limits are per worker process.
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Too many attempts, try again later")
+        self.retry_after = retry_after
+
+
+class TokenBucketLimiter:
+    def __init__(self, burst: float, per_minute: float, max_keys: int = 100_000):
+        self.burst = burst
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+
+    def _level(self, key, now):
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - updated) * self.rate)
+
+    def take(self, key, now=None) -> float:
+        """Spend one token: 0.0 when allowed, else seconds until one is available."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens = self._level(key, now)
+            if tokens < 1:
+                return (1 - tokens) / self.rate
+            self._buckets[key] = (tokens - 1, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return 0.0
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+def check(*limits):
+    """
+    (limiter, key) pairs, checked in order; raises RateLimited from the
+    first empty bucket without spending tokens from the ones after it.
+    """
+    for limiter, key in limits:
+        wait = limiter.take(key)
+        if wait:
+            raise RateLimited(math.ceil(wait))
@@ -1,13 +1,45 @@
 # recruiter functions
-import sqlite3
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Response
 from pydantic import BaseModel, Field
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from auth import current_company, current_recruiter
 from cors_config import add_cors_middleware
+from db import SessionLocal, engine
+from match_index import index as match_index
+from models import (
+    Base,
+    CandidateJobMatch,
+    Company,
+    Interview,
+    InterviewNote,
+    InterviewStatus,
+    JobRole,
+    Recruiter,
+    RecruiterAvailability,
+    User,
+    UserProfile,
+)
+from notification_outbox import outbox
+from notifications import NotificationOut, notification_page
+from scheduling import (
+    INACTIVE,
+    INTERVIEW_LENGTH,
+    IntervalIndex,
+    add_interview,
+    auto_schedule,
+    book_slot,
+    iso,
+    parse_time,
+    release_overlapping,
+    index as schedule_index,
+)
+from session_tokens import Identity, require_secret
 
-DB_PATH = "lyrathon_recruiter.db"
 app = FastAPI(title="Recruiter Backend (Lyrathon)", version="1.0")
 
 add_cors_middleware(app)
@@ -16,221 +48,82 @@ add_cors_middleware(app)
 # -----------------------------
 # DB helpers
 # -----------------------------
-def db() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
-def now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
 
 
 # -----------------------------
-# Schema (subset of your ERD)
+# Schema lives in models.py; make sure it exists
 # -----------------------------
 def init_db() -> None:
-    conn = db()
-    cur = conn.cursor()
-
-    # User (login identity)
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS User (
-        user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        email TEXT UNIQUE NOT NULL,
-        password_hash TEXT,
-        role TEXT NOT NULL CHECK(role IN ('candidate','recruiter','admin')),
-        created_at TEXT NOT NULL,
-        last_login TEXT,
-        is_active INTEGER NOT NULL DEFAULT 1
-    )
-    """)
-
-    # UserProfile (candidate personal info + anonymity)
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS UserProfile (
-        user_id INTEGER PRIMARY KEY,
-        name TEXT,
-        dob TEXT,
-        photo TEXT,
-        is_anonymous INTEGER NOT NULL DEFAULT 1,
-        FOREIGN KEY(user_id) REFERENCES User(user_id)
-    )
-    """)
-
-    # Companies
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS Companies (
-        company_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        description TEXT,
-        created_at TEXT NOT NULL
-    )
-    """)
-
-    # Recruiters (belongs to company + maps to a user)
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS Recruiters (
-        recruiter_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER UNIQUE NOT NULL,
-        company_id INTEGER NOT NULL,
-        job_title TEXT,
-        FOREIGN KEY(user_id) REFERENCES User(user_id),
-        FOREIGN KEY(company_id) REFERENCES Companies(company_id)
-    )
-    """)
-
-    # JobRoles (roles posted by company)
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS JobRoles (
-        role_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        company_id INTEGER NOT NULL,
-        title TEXT NOT NULL,
-        description TEXT,
-        FOREIGN KEY(company_id) REFERENCES Companies(company_id)
-    )
-    """)
-
-    # CandidateJobMatches (precomputed match scores)
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS CandidateJobMatches (
-        candidate_id INTEGER NOT NULL,
-        role_id INTEGER NOT NULL,
-        match_score REAL NOT NULL,
-        last_updated TEXT NOT NULL,
-        PRIMARY KEY(candidate_id, role_id),
-        FOREIGN KEY(candidate_id) REFERENCES User(user_id),
-        FOREIGN KEY(role_id) REFERENCES JobRoles(role_id)
-    )
-    """)
-
-    # RecruiterAvailability (time slots)
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS RecruiterAvailability (
-        availability_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        recruiter_id INTEGER NOT NULL,
-        start_time TEXT NOT NULL,
-        end_time TEXT NOT NULL,
-        is_booked INTEGER NOT NULL DEFAULT 0,
-        FOREIGN KEY(recruiter_id) REFERENCES Recruiters(recruiter_id)
-    )
-    """)
-
-    # Interviews (links candidate + recruiter + role)
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS Interviews (
-        interview_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        candidate_id INTEGER NOT NULL,
-        recruiter_id INTEGER NOT NULL,
-        role_id INTEGER NOT NULL,
-        scheduled_time TEXT,
-        status TEXT NOT NULL CHECK(status IN ('requested','scheduled','completed','cancelled')) DEFAULT 'requested',
-        FOREIGN KEY(candidate_id) REFERENCES User(user_id),
-        FOREIGN KEY(recruiter_id) REFERENCES Recruiters(recruiter_id),
-        FOREIGN KEY(role_id) REFERENCES JobRoles(role_id)
-    )
-    """)
-
-    # InterviewNotes (recruiter notes + decision)
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS InterviewNotes (
-        interview_id INTEGER PRIMARY KEY,
-        recruiter_id INTEGER NOT NULL,
-        notes TEXT,
-        fit_score INTEGER CHECK(fit_score BETWEEN 1 AND 10),
-        decision TEXT CHECK(decision IN ('advance','reject','pending')) DEFAULT 'pending',
-        FOREIGN KEY(interview_id) REFERENCES Interviews(interview_id),
-        FOREIGN KEY(recruiter_id) REFERENCES Recruiters(recruiter_id)
-    )
-    """)
-
-    # Notifications
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS Notifications (
-        notification_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        type TEXT NOT NULL,
-        message TEXT NOT NULL,
-        is_read INTEGER NOT NULL DEFAULT 0,
-        created_at TEXT NOT NULL,
-        FOREIGN KEY(user_id) REFERENCES User(user_id)
-    )
-    """)
-
-    conn.commit()
-    conn.close()
+    Base.metadata.create_all(bind=engine)
 
 
 # -----------------------------
 # Seed demo data (so UI works immediately)
 # -----------------------------
 def seed_demo() -> None:
-    conn = db()
-    cur = conn.cursor()
-
-    # Create a company
-    cur.execute("INSERT OR IGNORE INTO Companies(company_id, name, description, created_at) VALUES (1,?,?,?)",
-                ("Talent Co", "Demo hiring company", now_iso()))
-
-    # Create recruiter user + recruiter record
-    cur.execute("""
-    INSERT OR IGNORE INTO User(user_id, email, password_hash, role, created_at)
-    VALUES (100, ?, ?, 'recruiter', ?)
-    """, ("recruiter@talent.co", "hashed", now_iso()))
-    cur.execute("""
-    INSERT OR IGNORE INTO Recruiters(recruiter_id, user_id, company_id, job_title)
-    VALUES (10, 100, 1, 'Technical Recruiter')
-    """)
-
-    # Create candidate users + profiles
-    cur.execute("""
-    INSERT OR IGNORE INTO User(user_id, email, password_hash, role, created_at)
-    VALUES (200, ?, ?, 'candidate', ?)
-    """, ("cand1@demo.com", "hashed", now_iso()))
-    cur.execute("""
-    INSERT OR IGNORE INTO UserProfile(user_id, name, dob, photo, is_anonymous)
-    VALUES (200, 'Jane Doe', '2002-01-01', NULL, 1)
-    """)
-
-    cur.execute("""
-    INSERT OR IGNORE INTO User(user_id, email, password_hash, role, created_at)
-    VALUES (201, ?, ?, 'candidate', ?)
-    """, ("cand2@demo.com", "hashed", now_iso()))
-    cur.execute("""
-    INSERT OR IGNORE INTO UserProfile(user_id, name, dob, photo, is_anonymous)
-    VALUES (201, 'John Smith', '2001-02-02', NULL, 0)
-    """)
-
-    # Create roles
-    cur.execute("""
-    INSERT OR IGNORE INTO JobRoles(role_id, company_id, title, description)
-    VALUES (1, 1, 'Backend Engineer (C++)', 'Systems, memory safety, APIs')
-    """)
-    cur.execute("""
-    INSERT OR IGNORE INTO JobRoles(role_id, company_id, title, description)
-    VALUES (2, 1, 'Full Stack Engineer', 'React, Node, product work')
-    """)
-
-    # Precomputed matches (CandidateJobMatches)
-    cur.execute("""
-    INSERT OR IGNORE INTO CandidateJobMatches(candidate_id, role_id, match_score, last_updated)
-    VALUES (200, 1, 92.0, ?)
-    """, (now_iso(),))
-    cur.execute("""
-    INSERT OR IGNORE INTO CandidateJobMatches(candidate_id, role_id, match_score, last_updated)
-    VALUES (201, 2, 84.0, ?)
-    """, (now_iso(),))
-
-    conn.commit()
-    conn.close()
+    db = SessionLocal()
+    try:
+        # only rows that are missing are added, like INSERT OR IGNORE
+        def add_missing(model, pk, **values):
+            if db.get(model, pk) is None:
+                db.add(model(**values))
+
+        # Create a company
+        add_missing(Company, 1, company_id=1, name="Talent Co", description="Demo hiring company")
+
+        # Create recruiter user + recruiter record
+        add_missing(User, 100, user_id=100, email="recruiter@talent.co", password_hash="hashed",
+                    role="recruiter", full_name="Demo Recruiter")
+        add_missing(Recruiter, 10, recruiter_id=10, user_id=100, company_id=1, job_title="Technical Recruiter")
+
+        # Create candidate users + profiles
+        add_missing(User, 200, user_id=200, email="cand1@demo.com", password_hash="hashed",
+                    role="candidate", full_name="Jane Doe")
+        add_missing(UserProfile, 200, user_id=200, name="Jane Doe", dob=datetime(2002, 1, 1), is_anonymous=True)
+        add_missing(User, 201, user_id=201, email="cand2@demo.com", password_hash="hashed",
+                    role="candidate", full_name="John Smith")
+        add_missing(UserProfile, 201, user_id=201, name="John Smith", dob=datetime(2001, 2, 2), is_anonymous=False)
+        db.flush()
+
+        # Create roles
+        add_missing(JobRole, 1, role_id=1, company_id=1, title="Backend Engineer (C++)",
+                    description="Systems, memory safety, APIs")
+        add_missing(JobRole, 2, role_id=2, company_id=1, title="Full Stack Engineer",
+                    description="React, Node, product work")
+        db.flush()
+
+        # Precomputed matches (CandidateJobMatches)
+        for candidate_id, role_id, score in ((200, 1, 92), (201, 2, 84)):
+            exists = db.query(CandidateJobMatch.id).filter(
+                CandidateJobMatch.candidate_id == candidate_id,
+                CandidateJobMatch.role_id == role_id,
+            ).first()
+            if not exists:
+                db.add(CandidateJobMatch(candidate_id=candidate_id, role_id=role_id, match_score=score))
+
+        db.commit()
+    finally:
+        db.close()
 
 
 @app.on_event("startup")
 def on_startup():
+    require_secret()
     init_db()
     seed_demo()
 
 
+@app.on_event("shutdown")
+def on_shutdown():
+    outbox.stop(timeout=5)
+
+
 # -----------------------------
 # Pydantic models (request/response)
 # -----------------------------
@@ -249,7 +142,7 @@ class InterviewCreateIn(BaseModel):
     role_id: int
     scheduled_time: Optional[str] = Field(
         default=None,
-        description="ISO datetime string; for MVP you can pass any string",
+        description="ISO datetime string",
     )
 
 
@@ -274,17 +167,42 @@ class AvailabilityIn(BaseModel):
     end_time: str
 
 
+class BookingIn(BaseModel):
+    candidate_id: int
+    role_id: int
+
+
+class FreeSlot(BaseModel):
+    availability_id: int
+    recruiter_id: int
+    start_time: str
+    end_time: str
+
+
+class AutoScheduleIn(BaseModel):
+    start_time: str
+    end_time: str
+    top_n: int = Field(default=50, ge=1, le=1000)
+
+
+class AutoScheduleOut(BaseModel):
+    scheduled: List[InterviewOut]
+    # ranked candidates left without a slot
+    unassigned: List[int]
+
+
 # -----------------------------
-# Helper: verify recruiter belongs to company etc.
+# Helpers
 # -----------------------------
-def get_recruiter_or_404(recruiter_id: int) -> sqlite3.Row:
-    conn = db()
-    cur = conn.cursor()
-    r = cur.execute("SELECT * FROM Recruiters WHERE recruiter_id = ?", (recruiter_id,)).fetchone()
-    conn.close()
-    if not r:
-        raise HTTPException(status_code=404, detail="Recruiter not found")
-    return r
+def parse_pipeline_cursor(cursor: Optional[str]):
+    """Keyset cursor "<score>:<candidate_id>:<role_id>" from the previous page."""
+    if cursor is None:
+        return None
+    try:
+        score, candidate_id, role_id = (int(part) for part in cursor.split(":"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return score, candidate_id, role_id
 
 
 # =========================================================
@@ -292,294 +210,409 @@ def get_recruiter_or_404(recruiter_id: int) -> sqlite3.Row:
 # =========================================================
 
 @app.get("/recruiters/{recruiter_id}/pipeline", response_model=List[PipelineItem])
-def recruiter_pipeline(recruiter_id: int, role_id: Optional[int] = None):
+def recruiter_pipeline(
+    recruiter_id: int,
+    response: Response,
+    role_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    recruiter: Identity = Depends(current_recruiter),
+    db: Session = Depends(get_db),
+):
     """
     Recruiter sees candidate pipeline (matches) for roles in their company.
+    Ranked rows come from the in-memory top-K index; pass the X-Next-Cursor
+    header of a page as `cursor` to get the next one.
     """
-    recruiter = get_recruiter_or_404(recruiter_id)
-    company_id = recruiter["company_id"]
-
-    conn = db()
-    cur = conn.cursor()
+    after = parse_pipeline_cursor(cursor)
 
-    params = [company_id]
-    role_filter = ""
+    role_ids = match_index.company_roles(db, recruiter.company_id)
     if role_id is not None:
-        role_filter = "AND jr.role_id = ?"
-        params.append(role_id)
-
-    rows = cur.execute(f"""
-        SELECT
-            m.candidate_id,
-            up.name,
-            up.is_anonymous,
-            m.role_id,
-            jr.title AS role_title,
-            m.match_score,
-            m.last_updated
-        FROM CandidateJobMatches m
-        JOIN JobRoles jr ON jr.role_id = m.role_id
-        LEFT JOIN UserProfile up ON up.user_id = m.candidate_id
-        WHERE jr.company_id = ?
-        {role_filter}
-        ORDER BY m.match_score DESC
-        LIMIT 50
-    """, params).fetchall()
-
-    conn.close()
+        role_ids = [role_id] if role_id in role_ids else []
+
+    ranked = match_index.top(db, role_ids, limit, after)
+
+    candidate_ids = {r[1] for r in ranked}
+    profiles = {
+        p.user_id: p
+        for p in db.query(UserProfile).filter(UserProfile.user_id.in_(candidate_ids))
+    } if candidate_ids else {}
+    titles = dict(
+        db.query(JobRole.role_id, JobRole.title).filter(JobRole.role_id.in_({r[2] for r in ranked}))
+    ) if ranked else {}
 
     items: List[PipelineItem] = []
-    for r in rows:
-        anon = bool(r["is_anonymous"]) if r["is_anonymous"] is not None else True
-        display_name = f"Anonymous {str(r['candidate_id'])[-4:]}" if anon else (r["name"] or "Candidate")
+    for score, cand_id, r_id, updated in ranked:
+        profile = profiles.get(cand_id)
+        anon = bool(profile.is_anonymous) if profile and profile.is_anonymous is not None else True
+        display_name = f"Anonymous {str(cand_id)[-4:]}" if anon else (profile.name or "Candidate")
         items.append(PipelineItem(
-            candidate_id=r["candidate_id"],
+            candidate_id=cand_id,
             display_name=display_name,
             is_anonymous=anon,
-            role_id=r["role_id"],
-            role_title=r["role_title"],
-            match_score=float(r["match_score"]),
-            last_updated=r["last_updated"],
+            role_id=r_id,
+            role_title=titles.get(r_id) or "",
+            match_score=float(score),
+            last_updated=iso(updated) or "",
         ))
+
+    if len(ranked) == limit:
+        last = ranked[-1]
+        response.headers["X-Next-Cursor"] = f"{last[0]}:{last[1]}:{last[2]}"
     return items
 
 
-@app.get("/recruiters/{recruiter_id}/candidates/{candidate_id}")
-def recruiter_candidate_detail(recruiter_id: int, candidate_id: int):
+@app.get("/recruiters/{recruiter_id}/candidates/{candidate_id}", dependencies=[Depends(current_recruiter)])
+def recruiter_candidate_detail(recruiter_id: int, candidate_id: int, db: Session = Depends(get_db)):
     """
     Candidate detail for recruiter.
     IMPORTANT: If candidate is anonymous, we hide name/photo.
     """
-    _ = get_recruiter_or_404(recruiter_id)
-
-    conn = db()
-    cur = conn.cursor()
-    profile = cur.execute("SELECT * FROM UserProfile WHERE user_id = ?", (candidate_id,)).fetchone()
-    conn.close()
-
+    profile = db.get(UserProfile, candidate_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Candidate profile not found")
 
-    is_anonymous = bool(profile["is_anonymous"])
+    is_anonymous = bool(profile.is_anonymous)
     return {
         "candidate_id": candidate_id,
         "isAnonymous": is_anonymous,
-        "name": None if is_anonymous else profile["name"],
-        "photo": None if is_anonymous else profile["photo"],
+        "name": None if is_anonymous else profile.name,
+        "photo": None if is_anonymous else profile.photo,
         # You can add more safe fields here later (skills, assessments, etc.)
     }
 
 
 @app.post("/recruiters/{recruiter_id}/interviews", response_model=InterviewOut)
-def recruiter_create_interview(recruiter_id: int, payload: InterviewCreateIn):
+def recruiter_create_interview(recruiter_id: int, payload: InterviewCreateIn, recruiter: Identity = Depends(current_recruiter), db: Session = Depends(get_db)):
     """
     Create interview request (or schedule directly if scheduled_time provided).
     """
-    recruiter = get_recruiter_or_404(recruiter_id)
-
-    conn = db()
-    cur = conn.cursor()
-
     # Make sure role exists and belongs to recruiter's company
-    role = cur.execute("""
-        SELECT role_id, title, company_id FROM JobRoles WHERE role_id = ?
-    """, (payload.role_id,)).fetchone()
+    role = db.get(JobRole, payload.role_id)
     if not role:
-        conn.close()
         raise HTTPException(status_code=404, detail="Role not found")
-    if role["company_id"] != recruiter["company_id"]:
-        conn.close()
+    if role.company_id != recruiter.company_id:
         raise HTTPException(status_code=403, detail="Role does not belong to your company")
 
-    status = "scheduled" if payload.scheduled_time else "requested"
-
-    cur.execute("""
-        INSERT INTO Interviews(candidate_id, recruiter_id, role_id, scheduled_time, status)
-        VALUES (?, ?, ?, ?, ?)
-    """, (payload.candidate_id, recruiter_id, payload.role_id, payload.scheduled_time, status))
-    interview_id = cur.lastrowid
-
-    # Notify candidate
-    cur.execute("""
-        INSERT INTO Notifications(user_id, type, message, is_read, created_at)
-        VALUES (?, 'interview', ?, 0, ?)
-    """, (payload.candidate_id, f"Interview {status} for role: {role['title']}", now_iso()))
-
-    conn.commit()
-    conn.close()
+    scheduled_time = parse_time(payload.scheduled_time, "scheduled_time")
+    interview = add_interview(db, recruiter_id, payload.candidate_id, role, scheduled_time)
 
     return InterviewOut(
-        interview_id=interview_id,
+        interview_id=interview.interview_id,
         candidate_id=payload.candidate_id,
         recruiter_id=recruiter_id,
         role_id=payload.role_id,
-        role_title=role["title"],
-        scheduled_time=payload.scheduled_time,
-        status=status
+        role_title=role.title,
+        scheduled_time=iso(scheduled_time),
+        status=interview.status.value,
     )
 
 
 @app.get("/recruiters/{recruiter_id}/interviews", response_model=List[InterviewOut])
-def recruiter_list_interviews(recruiter_id: int):
-    recruiter = get_recruiter_or_404(recruiter_id)
-
-    conn = db()
-    cur = conn.cursor()
-    rows = cur.execute("""
-        SELECT i.*, jr.title AS role_title
-        FROM Interviews i
-        JOIN JobRoles jr ON jr.role_id = i.role_id
-        WHERE i.recruiter_id = ?
-        ORDER BY COALESCE(i.scheduled_time, i.interview_id) DESC
-        LIMIT 100
-    """, (recruiter["recruiter_id"],)).fetchall()
-    conn.close()
+def recruiter_list_interviews(recruiter_id: int, recruiter: Identity = Depends(current_recruiter), db: Session = Depends(get_db)):
+    rows = (
+        db.query(Interview, JobRole.title)
+        .join(JobRole, JobRole.role_id == Interview.role_id)
+        .filter(Interview.recruiter_id == recruiter.recruiter_id)
+        .order_by(func.coalesce(Interview.scheduled_time, Interview.interview_id).desc())
+        .limit(100)
+        .all()
+    )
 
     return [
         InterviewOut(
-            interview_id=r["interview_id"],
-            candidate_id=r["candidate_id"],
-            recruiter_id=r["recruiter_id"],
-            role_id=r["role_id"],
-            role_title=r["role_title"],
-            scheduled_time=r["scheduled_time"],
-            status=r["status"],
+            interview_id=i.interview_id,
+            candidate_id=i.candidate_id,
+            recruiter_id=i.recruiter_id,
+            role_id=i.role_id,
+            role_title=title,
+            scheduled_time=iso(i.scheduled_time),
+            status=i.status.value if i.status else "requested",
         )
-        for r in rows
+        for i, title in rows
     ]
 
 
-@app.patch("/recruiters/{recruiter_id}/interviews/{interview_id}")
-def recruiter_update_interview_status(recruiter_id: int, interview_id: int, status: str):
+@app.patch("/recruiters/{recruiter_id}/interviews/{interview_id}", dependencies=[Depends(current_recruiter)])
+def recruiter_update_interview_status(recruiter_id: int, interview_id: int, status: str, db: Session = Depends(get_db)):
     """
     Update interview status: requested/scheduled/completed/cancelled
     """
-    _ = get_recruiter_or_404(recruiter_id)
     if status not in ("requested", "scheduled", "completed", "cancelled"):
         raise HTTPException(status_code=400, detail="Invalid status")
 
-    conn = db()
-    cur = conn.cursor()
-    row = cur.execute("""
-        SELECT * FROM Interviews WHERE interview_id = ? AND recruiter_id = ?
-    """, (interview_id, recruiter_id)).fetchone()
-    if not row:
-        conn.close()
+    interview = db.query(Interview).filter(
+        Interview.interview_id == interview_id,
+        Interview.recruiter_id == recruiter_id,
+    ).first()
+    if not interview:
         raise HTTPException(status_code=404, detail="Interview not found")
 
-    cur.execute("""
-        UPDATE Interviews SET status = ? WHERE interview_id = ?
-    """, (status, interview_id))
+    if status == "cancelled" and interview.scheduled_time and interview.status != InterviewStatus.cancelled:
+        start = interview.scheduled_time
+        release_overlapping(db, recruiter_id, interview_id, start, start + INTERVIEW_LENGTH)
+    interview.status = status
 
-    # notify candidate
-    cur.execute("""
-        INSERT INTO Notifications(user_id, type, message, is_read, created_at)
-        VALUES (?, 'interview', ?, 0, ?)
-    """, (row["candidate_id"], f"Interview status updated to: {status}", now_iso()))
+    db.commit()
 
-    conn.commit()
-    conn.close()
+    # notify candidate
+    outbox.post(interview.candidate_id, "interview", f"Interview status updated to: {status}")
     return {"ok": True, "interview_id": interview_id, "status": status}
 
 
-@app.post("/recruiters/{recruiter_id}/interviews/{interview_id}/notes")
-def recruiter_write_notes(recruiter_id: int, interview_id: int, payload: NoteIn):
+@app.post("/recruiters/{recruiter_id}/interviews/{interview_id}/notes", dependencies=[Depends(current_recruiter)])
+def recruiter_write_notes(recruiter_id: int, interview_id: int, payload: NoteIn, db: Session = Depends(get_db)):
     """
     Create or update interview notes for an interview.
     """
-    _ = get_recruiter_or_404(recruiter_id)
-
-    conn = db()
-    cur = conn.cursor()
-
-    interview = cur.execute("""
-        SELECT * FROM Interviews WHERE interview_id = ? AND recruiter_id = ?
-    """, (interview_id, recruiter_id)).fetchone()
+    interview = db.query(Interview.interview_id).filter(
+        Interview.interview_id == interview_id,
+        Interview.recruiter_id == recruiter_id,
+    ).first()
     if not interview:
-        conn.close()
         raise HTTPException(status_code=404, detail="Interview not found")
 
-    existing = cur.execute("""
-        SELECT * FROM InterviewNotes WHERE interview_id = ?
-    """, (interview_id,)).fetchone()
-
     decision = payload.decision
     if decision is not None and decision not in ("advance", "reject", "pending"):
-        conn.close()
         raise HTTPException(status_code=400, detail="decision must be advance/reject/pending")
 
+    existing = db.query(InterviewNote).filter(InterviewNote.interview_id == interview_id).first()
     if existing:
-        cur.execute("""
-            UPDATE InterviewNotes
-            SET notes = COALESCE(?, notes),
-                fit_score = COALESCE(?, fit_score),
-                decision = COALESCE(?, decision)
-            WHERE interview_id = ?
-        """, (payload.notes, payload.fit_score, decision, interview_id))
+        if payload.notes is not None:
+            existing.notes = payload.notes
+        if payload.fit_score is not None:
+            existing.fit_score = payload.fit_score
+        if decision is not None:
+            existing.decision = decision
     else:
-        cur.execute("""
-            INSERT INTO InterviewNotes(interview_id, recruiter_id, notes, fit_score, decision)
-            VALUES (?, ?, ?, ?, COALESCE(?, 'pending'))
-        """, (interview_id, recruiter_id, payload.notes, payload.fit_score, decision))
+        db.add(InterviewNote(
+            interview_id=interview_id,
+            recruiter_id=recruiter_id,
+            notes=payload.notes,
+            fit_score=payload.fit_score,
+            decision=decision or "pending",
+        ))
 
-    conn.commit()
-    conn.close()
+    db.commit()
     return {"ok": True, "interview_id": interview_id}
 
 
-@app.post("/recruiters/{recruiter_id}/availability")
-def recruiter_add_availability(recruiter_id: int, payload: AvailabilityIn):
+@app.post("/recruiters/{recruiter_id}/availability", dependencies=[Depends(current_recruiter)])
+def recruiter_add_availability(recruiter_id: int, payload: AvailabilityIn, db: Session = Depends(get_db)):
+    """
+    Add an available time slot. Slots may not overlap the recruiter's other
+    slots or scheduled interviews.
+    """
+    start = parse_time(payload.start_time, "start_time")
+    end = parse_time(payload.end_time, "end_time")
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time")
+
+    with schedule_index.writer(recruiter_id):
+        if schedule_index.schedule(db, recruiter_id).conflicts(start, end):
+            raise HTTPException(status_code=409, detail="Slot overlaps existing availability or an interview")
+        slot = RecruiterAvailability(
+            recruiter_id=recruiter_id,
+            start_time=start,
+            end_time=end,
+            is_booked=False,
+        )
+        db.add(slot)
+        db.commit()
+    return {"ok": True, "availability_id": slot.availability_id}
+
+
+@app.post("/recruiters/{recruiter_id}/availability/{availability_id}/book", response_model=InterviewOut)
+def recruiter_book_slot(
+    recruiter_id: int,
+    availability_id: int,
+    payload: BookingIn,
+    recruiter: Identity = Depends(current_recruiter),
+    db: Session = Depends(get_db),
+):
+    """
+    Book a free slot as a scheduled interview. The slot is claimed with a
+    conditional update, so of two concurrent bookings exactly one succeeds.
+    """
+    role = db.get(JobRole, payload.role_id)
+    if not role:
+        raise HTTPException(status_code=404, detail="Role not found")
+    if role.company_id != recruiter.company_id:
+        raise HTTPException(status_code=403, detail="Role does not belong to your company")
+
+    slot = db.get(RecruiterAvailability, availability_id)
+    if not slot or slot.recruiter_id != recruiter_id:
+        raise HTTPException(status_code=404, detail="Slot not found")
+
+    if not book_slot(db, recruiter_id, availability_id):
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Slot is already booked")
+
+    interview = Interview(
+        candidate_id=payload.candidate_id,
+        recruiter_id=recruiter_id,
+        role_id=payload.role_id,
+        scheduled_time=slot.start_time,
+        status="scheduled",
+    )
+    db.add(interview)
+    db.commit()
+    outbox.post(payload.candidate_id, "interview", f"Interview scheduled for role: {role.title}")
+
+    return InterviewOut(
+        interview_id=interview.interview_id,
+        candidate_id=payload.candidate_id,
+        recruiter_id=recruiter_id,
+        role_id=payload.role_id,
+        role_title=role.title,
+        scheduled_time=iso(slot.start_time),
+        status="scheduled",
+    )
+
+
+@app.post("/recruiters/{recruiter_id}/roles/{role_id}/auto-schedule", response_model=AutoScheduleOut)
+def recruiter_auto_schedule(
+    recruiter_id: int,
+    role_id: int,
+    payload: AutoScheduleIn,
+    recruiter: Identity = Depends(current_recruiter),
+    db: Session = Depends(get_db),
+):
     """
-    Add an available time slot. (MVP scheduling)
+    Schedule the role's top_n matched candidates into the free slots of all
+    the company's recruiters between start_time and end_time, best match
+    earliest. Candidates already interviewing for the role are skipped.
+    Interviews and slot bookings land in one transaction; notifications go
+    out through the outbox once it commits.
     """
-    _ = get_recruiter_or_404(recruiter_id)
+    role = db.get(JobRole, role_id)
+    if not role:
+        raise HTTPException(status_code=404, detail="Role not found")
+    if role.company_id != recruiter.company_id:
+        raise HTTPException(status_code=403, detail="Role does not belong to your company")
 
-    conn = db()
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT INTO RecruiterAvailability(recruiter_id, start_time, end_time, is_booked)
-        VALUES (?, ?, ?, 0)
-    """, (recruiter_id, payload.start_time, payload.end_time))
-    conn.commit()
-    conn.close()
-    return {"ok": True}
+    t1 = parse_time(payload.start_time, "start_time")
+    t2 = parse_time(payload.end_time, "end_time")
+    if t2 <= t1:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time")
 
+    ranked = [cand for _, cand, _, _ in match_index.top(db, [role_id], payload.top_n)]
 
-@app.get("/recruiters/{recruiter_id}/availability")
-def recruiter_list_availability(recruiter_id: int):
-    _ = get_recruiter_or_404(recruiter_id)
+    # the candidates' active interviews: skip those already in this role's
+    # process, and keep the rest from double-booking anyone
+    existing = db.execute(
+        select(Interview.candidate_id, Interview.role_id, Interview.scheduled_time).where(
+            Interview.candidate_id.in_(ranked),
+            or_(Interview.status.is_(None), Interview.status.notin_(INACTIVE)),
+        )
+    ).all() if ranked else []
+    in_process = {cand for cand, r_id, _ in existing if r_id == role_id}
+    own_times = {}
+    for cand, _, t in existing:
+        if t is not None:
+            own_times.setdefault(cand, []).append((t, t + INTERVIEW_LENGTH, None))
+    busy = {cand: IntervalIndex(times) for cand, times in own_times.items()}
+
+    booked, unassigned = auto_schedule(
+        db, recruiter.company_id, [c for c in ranked if c not in in_process], busy, t1, t2
+    )
 
-    conn = db()
-    cur = conn.cursor()
-    rows = cur.execute("""
-        SELECT * FROM RecruiterAvailability
-        WHERE recruiter_id = ?
-        ORDER BY start_time ASC
-    """, (recruiter_id,)).fetchall()
-    conn.close()
+    scheduled = []
+    if booked:
+        rows = [
+            {
+                "candidate_id": cand,
+                "recruiter_id": slot_recruiter,
+                "role_id": role_id,
+                "scheduled_time": start,
+                "status": InterviewStatus.scheduled,
+            }
+            for cand, (start, _, _, slot_recruiter) in booked
+        ]
+        ids = db.scalars(
+            insert(Interview).returning(Interview.interview_id, sort_by_parameter_order=True),
+            rows,
+        ).all()
+        scheduled = [
+            InterviewOut(
+                interview_id=interview_id,
+                candidate_id=row["candidate_id"],
+                recruiter_id=row["recruiter_id"],
+                role_id=role_id,
+                role_title=role.title,
+                scheduled_time=iso(row["scheduled_time"]),
+                status="scheduled",
+            )
+            for interview_id, row in zip(ids, rows)
+        ]
+    db.commit()
+
+    outbox.post_many(
+        {"user_id": cand, "type": "interview", "message": f"Interview scheduled for role: {role.title}"}
+        for cand, _ in booked
+    )
+    return AutoScheduleOut(scheduled=scheduled, unassigned=unassigned)
+
+
+@app.get("/companies/{company_id}/free-slots", response_model=List[FreeSlot], dependencies=[Depends(current_company)])
+def company_free_slots(
+    company_id: int,
+    start: str,
+    end: str,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    """Unbooked slots of the company's recruiters between start and end, earliest first."""
+    t1 = parse_time(start, "start")
+    t2 = parse_time(end, "end")
+    return [
+        FreeSlot(
+            availability_id=slot_id,
+            recruiter_id=recruiter_id,
+            start_time=iso(slot_start),
+            end_time=iso(slot_end),
+        )
+        for slot_start, slot_end, slot_id, recruiter_id in schedule_index.free_slots(db, company_id, t1, t2, limit)
+    ]
 
-    return [dict(r) for r in rows]
 
+@app.get("/recruiters/{recruiter_id}/availability", dependencies=[Depends(current_recruiter)])
+def recruiter_list_availability(recruiter_id: int, db: Session = Depends(get_db)):
+    rows = (
+        db.query(RecruiterAvailability)
+        .filter(RecruiterAvailability.recruiter_id == recruiter_id)
+        .order_by(RecruiterAvailability.start_time.asc())
+        .all()
+    )
 
-@app.get("/recruiters/{recruiter_id}/notifications")
-def recruiter_notifications(recruiter_id: int):
+    return [
+        {
+            "availability_id": r.availability_id,
+            "recruiter_id": r.recruiter_id,
+            "start_time": iso(r.start_time),
+            "end_time": iso(r.end_time),
+            "is_booked": bool(r.is_booked),
+        }
+        for r in rows
+    ]
+
+
+@app.get("/recruiters/{recruiter_id}/notifications", response_model=List[NotificationOut])
+def recruiter_notifications(
+    recruiter_id: int,
+    response: Response,
+    unread_only: bool = False,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    recruiter: Identity = Depends(current_recruiter),
+    db: Session = Depends(get_db),
+):
     """
     If you want recruiter notifications, store them on recruiter user_id.
     (Recruiters table maps recruiter_id -> user_id)
+    Paged like GET /notifications/users/{user_id}.
     """
-    recruiter = get_recruiter_or_404(recruiter_id)
-    user_id = recruiter["user_id"]
-
-    conn = db()
-    cur = conn.cursor()
-    rows = cur.execute("""
-        SELECT * FROM Notifications WHERE user_id = ?
-        ORDER BY created_at DESC
-        LIMIT 100
-    """, (user_id,)).fetchall()
-    conn.close()
-
-    return [dict(r) for r in rows]
+    return notification_page(db, response, recruiter.user_id, limit, cursor, unread_only)
 
 
 # -----------------------------
@@ -587,5 +620,4 @@ def recruiter_notifications(recruiter_id: int):
 # -----------------------------
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("recruiter_backend:app", host="127.0.0.1", port=8000, reload=True)
-
+    uvicorn.run("recruiter:app", host="127.0.0.1", port=8000, reload=True)
@@ -1,10 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import queue
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 from typing import List, Optional
 from sqlalchemy.orm import Session
 # use local imports (run from backend folder) so module imports are consistent with main.py
+from auth import current_recruiter
 from db import SessionLocal
-from models import JobRole, JobRoleRequirement, Recruiter, Interview, InterviewNote
+from models import JobRole, JobRoleRequirement, Interview, InterviewNote
+from session_tokens import Identity
+import role_import
+from content_cache import etag_matches
+from domain_index import registry as domain_registry
+from match_index import index as match_index
+from role_cache import cache as role_cache
+from scheduling import add_interview, parse_time
 
 
 def get_db():
@@ -42,69 +53,112 @@ class NoteIn(BaseModel):
 
 router = APIRouter(prefix="/recruiters", tags=["recruiters"])
 
+# request body chunks buffered ahead of the import parser
+IMPORT_QUEUE_CHUNKS = 16
 
-@router.post("/{recruiter_id}/roles")
-def create_role(recruiter_id: int, payload: RoleCreate, db: Session = Depends(get_db)):
-    # verify recruiter exists and belongs to company
-    recruiter = db.query(Recruiter).filter(Recruiter.recruiter_id == recruiter_id).first()
-    if not recruiter:
-        raise HTTPException(status_code=404, detail="Recruiter not found")
 
+@router.post("/{recruiter_id}/roles")
+def create_role(
+    recruiter_id: int,
+    payload: RoleCreate,
+    recruiter: Identity = Depends(current_recruiter),
+    db: Session = Depends(get_db),
+):
+    # the token says which company the recruiter acts for
     if recruiter.company_id != payload.company_id:
         raise HTTPException(status_code=403, detail="Recruiter does not belong to this company")
 
-    # create the job role
+    # create the job role with its requirements in one transaction; free-text
+    # requirements are resolved to technical domains where one fits
     role = JobRole(company_id=payload.company_id, title=payload.title, description=payload.description)
+    resolved, _ = role_import.resolve_requirements(
+        domain_registry.index(db),
+        [(r.requirement_text, r.level) for r in payload.requirements or ()],
+    )
+    role.requirements = [
+        JobRoleRequirement(domain_id=domain_id, minimum_level=level) for domain_id, level in resolved
+    ]
     db.add(role)
     db.commit()
-    db.refresh(role)
-
-    # store requirements (map to JobRoleRequirement). frontend may supply free-text;
-    # we store minimum_level and leave domain_id empty when domain is unknown.
-    if payload.requirements:
-        for r in payload.requirements:
-            req = JobRoleRequirement(role_id=role.role_id, domain_id=None, minimum_level=(r.level if r.level is not None else None))
-            db.add(req)
-        db.commit()
+    match_index.forget_company(role.company_id)
 
     return {"role_id": role.role_id}
 
 
-@router.get("/{recruiter_id}/roles")
-def list_roles(recruiter_id: int, db: Session = Depends(get_db)):
+@router.post("/{recruiter_id}/roles/import")
+async def import_roles(
+    recruiter_id: int,
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(jsonl|csv)$", description="defaults from Content-Type"),
+    recruiter: Identity = Depends(current_recruiter),
+):
+    """
+    Bulk-create roles for the recruiter's company from a streamed JSON lines
+    ({"title", "description", "requirements": [{"requirement_text", "level"}]})
+    or CSV (title, description, requirements as "text:level;...") body.
+    Rows that fail to parse are reported and skipped.
+    """
+    company_id = recruiter.company_id
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "jsonl"
+
+    chunks = queue.Queue(maxsize=IMPORT_QUEUE_CHUNKS)
+    job = asyncio.get_running_loop().run_in_executor(
+        None, role_import.import_roles, role_import.ChunkReader(chunks), format, company_id
+    )
+    try:
+        async for chunk in request.stream():
+            # the parser stops reading on a fatal error; stop feeding it then
+            while not job.done():
+                try:
+                    chunks.put_nowait(chunk)
+                    break
+                except queue.Full:
+                    await asyncio.sleep(0.01)
+            if job.done():
+                break
+    finally:
+        # ends the stream for the parser, even when the client went away
+        while not job.done():
+            try:
+                chunks.put_nowait(None)
+                break
+            except queue.Full:
+                await asyncio.sleep(0.01)
+    stats = await job
+    return {**stats, "company_id": company_id}
+
+
+@router.get("/{recruiter_id}/roles", dependencies=[Depends(current_recruiter)])
+def list_roles(
+    recruiter_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
     """
     List job roles that belong to the recruiter's company.
+    Served from the per-company role cache; built with one query on a miss.
     """
-    recruiter = db.query(Recruiter).filter(Recruiter.recruiter_id == recruiter_id).first()
-    if not recruiter:
+    cached = role_cache.get(db, recruiter_id)
+    if cached is None:
         raise HTTPException(status_code=404, detail="Recruiter not found")
+    etag, roles = cached
 
-    roles = db.query(JobRole).filter(JobRole.company_id == recruiter.company_id).all()
-
-    out = []
-    for r in roles:
-        reqs = db.query(JobRoleRequirement).filter(JobRoleRequirement.role_id == r.role_id).all()
-        out.append({
-            "role_id": r.role_id,
-            "company_id": r.company_id,
-            "title": r.title,
-            "description": r.description,
-            "requirements": [{
-                "id": q.id,
-                "text": (q.domain.name if q.domain is not None else (f"Level {q.minimum_level}" if q.minimum_level is not None else "")),
-                "level": q.minimum_level
-            } for q in reqs]
-        })
-
-    return out
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return roles
 
 
 @router.post("/{recruiter_id}/interviews")
-def create_interview(recruiter_id: int, payload: InterviewCreateIn, db: Session = Depends(get_db)):
-    recruiter = db.query(Recruiter).filter(Recruiter.recruiter_id == recruiter_id).first()
-    if not recruiter:
-        raise HTTPException(status_code=404, detail="Recruiter not found")
-
+def create_interview(
+    recruiter_id: int,
+    payload: InterviewCreateIn,
+    recruiter: Identity = Depends(current_recruiter),
+    db: Session = Depends(get_db),
+):
     # Make sure role exists and belongs to recruiter's company
     role = db.query(JobRole).filter(JobRole.role_id == payload.role_id).first()
     if not role:
@@ -112,22 +166,15 @@ def create_interview(recruiter_id: int, payload: InterviewCreateIn, db: Session
     if role.company_id != recruiter.company_id:
         raise HTTPException(status_code=403, detail="Role does not belong to your company")
 
-    # create interview
-    interview = Interview(candidate_id=payload.candidate_id, recruiter_id=recruiter_id, role_id=payload.role_id,
-                          scheduled_time=payload.scheduled_time, status=("scheduled" if payload.scheduled_time else "requested"))
-    db.add(interview)
-    db.commit()
-    db.refresh(interview)
+    # same path as the recruiter app: parsed time, conflict check, slots booked, candidate notified
+    scheduled_time = parse_time(payload.scheduled_time, "scheduled_time")
+    interview = add_interview(db, recruiter_id, payload.candidate_id, role, scheduled_time)
 
     return {"interview_id": interview.interview_id}
 
 
-@router.post("/{recruiter_id}/interviews/{interview_id}/notes")
+@router.post("/{recruiter_id}/interviews/{interview_id}/notes", dependencies=[Depends(current_recruiter)])
 def create_or_update_note(recruiter_id: int, interview_id: int, payload: NoteIn, db: Session = Depends(get_db)):
-    recruiter = db.query(Recruiter).filter(Recruiter.recruiter_id == recruiter_id).first()
-    if not recruiter:
-        raise HTTPException(status_code=404, detail="Recruiter not found")
-
     interview = db.query(Interview).filter(Interview.interview_id == interview_id).first()
     if not interview:
         raise HTTPException(status_code=404, detail="Interview not found")
@@ -0,0 +1,177 @@
+# per-company cache for GET /recruiters/{id}/roles
+# A company's role list (with requirements and domain names) is built with one
+# joined query, naming domains from the domain registry, and kept in memory
+# until a write through SessionLocal touches one of its roles, requirements or
+# recruiters. A domain registry change drops everything.
+import threading
+import time
+
+from sqlalchemy import event, inspect, select
+
+from content_cache import make_etag
+from db import SessionLocal
+from domain_index import registry as domain_registry
+from models import JobRole, JobRoleRequirement, Recruiter
+
+# entries older than this are rebuilt, bounding staleness when another
+# process (seed_db.py, a second worker) edits roles
+MAX_AGE_SECONDS = 300
+
+
+def requirement_text(domain_name, minimum_level) -> str:
+    if domain_name is not None:
+        return domain_name
+    return f"Level {minimum_level}" if minimum_level is not None else ""
+
+
+def load_company_roles(db, recruiter_id):
+    """
+    (company_id, roles) for the recruiter's company in one query, or None
+    when the recruiter does not exist. Roles are ordered by id, each with
+    its requirements.
+    """
+    rows = db.execute(
+        select(
+            Recruiter.company_id,
+            JobRole.role_id,
+            JobRole.title,
+            JobRole.description,
+            JobRoleRequirement.id,
+            JobRoleRequirement.minimum_level,
+            JobRoleRequirement.domain_id,
+        )
+        .select_from(Recruiter)
+        .outerjoin(JobRole, JobRole.company_id == Recruiter.company_id)
+        .outerjoin(JobRoleRequirement, JobRoleRequirement.role_id == JobRole.role_id)
+        .where(Recruiter.recruiter_id == recruiter_id)
+        .order_by(JobRole.role_id, JobRoleRequirement.id)
+    ).all()
+    if not rows:
+        return None
+
+    company_id = rows[0].company_id
+    names = domain_registry.names(db, [row.domain_id for row in rows])
+    roles = {}
+    for row, domain_name in zip(rows, names):
+        if row.role_id is None or company_id is None:
+            continue
+        role = roles.get(row.role_id)
+        if role is None:
+            role = roles[row.role_id] = {
+                "role_id": row.role_id,
+                "company_id": company_id,
+                "title": row.title,
+                "description": row.description,
+                "requirements": [],
+            }
+        if row.id is not None:
+            role["requirements"].append({
+                "id": row.id,
+                "text": requirement_text(domain_name, row.minimum_level),
+                "level": row.minimum_level,
+            })
+    return company_id, list(roles.values())
+
+
+class RoleCache:
+    """
+    company_id -> (etag, roles), plus recruiter_id -> company_id so a hit
+    needs no query at all, and role_id -> company_id for requirement writes.
+    """
+
+    def __init__(self, max_age=MAX_AGE_SECONDS):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._companies = {}  # company_id -> (etag, roles, loaded_at)
+        self._recruiters = {}  # recruiter_id -> company_id
+        self._company_of_role = {}
+        # bumped by every invalidation; a load that raced one is not stored
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, db, recruiter_id):
+        """(etag, roles) for the recruiter's company, or None for an unknown recruiter."""
+        with self._lock:
+            company_id = self._recruiters.get(recruiter_id)
+            entry = self._companies.get(company_id, None) if company_id is not None else None
+            if entry is not None and time.monotonic() - entry[2] <= self.max_age:
+                self.hits += 1
+                return entry[0], entry[1]
+            self.misses += 1
+            version = self._version
+
+        loaded = load_company_roles(db, recruiter_id)
+        if loaded is None:
+            return None
+        company_id, roles = loaded
+        etag = make_etag("roles", company_id, roles)
+        with self._lock:
+            if version != self._version:
+                return etag, roles
+            self._recruiters[recruiter_id] = company_id
+            if company_id is not None:
+                self._companies[company_id] = (etag, roles, time.monotonic())
+                self._company_of_role.update((role["role_id"], company_id) for role in roles)
+        return etag, roles
+
+    def invalidate(self, company_ids=(), role_ids=(), recruiter_ids=()):
+        with self._lock:
+            self._version += 1
+            companies = set(company_ids)
+            companies.update(self._company_of_role.get(i) for i in role_ids)
+            companies.discard(None)
+            for company_id in companies:
+                self._companies.pop(company_id, None)
+            for recruiter_id in recruiter_ids:
+                self._recruiters.pop(recruiter_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._version += 1
+            self._companies.clear()
+            self._recruiters.clear()
+            self._company_of_role.clear()
+
+
+cache = RoleCache()
+
+# requirement texts embed domain names
+domain_registry.on_change(cache.clear)
+
+
+# -----------------------------
+# Invalidation hooks
+# -----------------------------
+_INFO_KEY = "roles_dirty"
+
+
+def _dirty(session):
+    return session.info.setdefault(
+        _INFO_KEY, {"company_ids": set(), "role_ids": set(), "recruiter_ids": set()}
+    )
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_dirty(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, JobRole):
+            state = inspect(obj)
+            _dirty(session)["company_ids"].update(state.attrs.company_id.history.sum())
+            _dirty(session)["role_ids"].update(state.attrs.role_id.history.sum())
+        elif isinstance(obj, JobRoleRequirement):
+            _dirty(session)["role_ids"].update(inspect(obj).attrs.role_id.history.sum())
+        elif isinstance(obj, Recruiter):
+            _dirty(session)["recruiter_ids"].update(inspect(obj).attrs.recruiter_id.history.sum())
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _dispatch_dirty(session):
+    dirty = session.info.pop(_INFO_KEY, None)
+    if dirty:
+        cache.invalidate(**{k: {i for i in v if i is not None} for k, v in dirty.items()})
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_dirty(session):
+    session.info.pop(_INFO_KEY, None)
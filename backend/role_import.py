@@ -0,0 +1,213 @@
+# bulk role import
+# Roles arrive as JSON lines or CSV and are parsed as a stream: the endpoint
+# feeds request body chunks to a worker thread through a bounded queue, so
+# neither the whole upload nor the parsed roles are held in memory. Each
+# batch of roles and their requirements is written with two executemany
+# statements in one transaction; requirement text is resolved to a
+# TechnicalDomain through domain_index, and only the imported roles are
+# queued for a match rescore.
+import csv
+import io
+import json
+import queue
+
+from sqlalchemy import insert
+
+import match_tracker
+from db import SessionLocal
+from domain_index import registry as domain_registry
+from match_index import index as match_index
+from models import JobRole, JobRoleRequirement
+from role_cache import cache as role_cache
+
+# roles per transaction
+BATCH = 500
+
+# per-row errors echoed back; the rest are only counted
+MAX_ERRORS = 100
+
+# unresolved requirement texts echoed back
+MAX_UNRESOLVED = 100
+
+# accepted requirement levels (skill levels are 1-5 or 0-100)
+MIN_LEVEL, MAX_LEVEL = 0, 100
+
+
+class ChunkReader(io.RawIOBase):
+    """Blocking file object over byte chunks put on a queue; None ends it."""
+
+    def __init__(self, chunks: queue.Queue):
+        self.chunks = chunks
+        self.buffer = b""
+        self.done = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self.buffer and not self.done:
+            chunk = self.chunks.get()
+            if chunk is None:
+                self.done = True
+            else:
+                self.buffer = chunk
+        n = min(len(b), len(self.buffer))
+        b[:n] = self.buffer[:n]
+        self.buffer = self.buffer[n:]
+        return n
+
+
+# -----------------------------
+# Parsing
+# -----------------------------
+def parse_level(level):
+    """Requirement level as an int in MIN_LEVEL..MAX_LEVEL; None or "" for no level."""
+    if level is None or level == "":
+        return None
+    if isinstance(level, str) and level.strip().isdigit():
+        level = int(level)
+    if not isinstance(level, int) or isinstance(level, bool):
+        raise ValueError("requirement level must be an integer")
+    if not MIN_LEVEL <= level <= MAX_LEVEL:
+        raise ValueError(f"requirement level must be between {MIN_LEVEL} and {MAX_LEVEL}")
+    return level
+
+
+def parse_requirement(item):
+    """{"requirement_text"|"text", "level"} dict or "text[:level]" string -> (text, level)."""
+    if isinstance(item, str):
+        text, _, level = item.rpartition(":")
+        if text and level.strip().isdigit():
+            return text.strip(), parse_level(level)
+        return item.strip(), None
+    if not isinstance(item, dict):
+        raise ValueError("requirements must be strings or objects")
+    text = item.get("requirement_text", item.get("text"))
+    if not isinstance(text, str):
+        raise ValueError("requirement needs requirement_text")
+    return text.strip(), parse_level(item.get("level"))
+
+
+def role_record(title, description, requirements):
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError("title is required")
+    if description is not None and not isinstance(description, str):
+        raise ValueError("description must be a string")
+    if isinstance(requirements, (str, dict)):
+        raise ValueError("requirements must be a list")
+    return {
+        "title": title.strip(),
+        "description": description or None,
+        "requirements": [parse_requirement(r) for r in requirements or () if r],
+    }
+
+
+def jsonl_records(stream):
+    """(line number, record or error message) per non-blank JSON line."""
+    for number, line in enumerate(io.TextIOWrapper(stream, encoding="utf-8"), start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            if not isinstance(item, dict):
+                raise ValueError("expected a JSON object")
+            yield number, role_record(item.get("title"), item.get("description"), item.get("requirements"))
+        except (ValueError, TypeError) as exc:
+            yield number, str(exc)
+
+
+def csv_records(stream):
+    """
+    CSV with a header row: title, optional description, optional
+    requirements as "text:level" items separated by ";".
+    """
+    rows = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8", newline=""))
+    for row in rows:
+        try:
+            requirements = [r for r in (row.get("requirements") or "").split(";") if r.strip()]
+            yield rows.line_num, role_record(row.get("title"), row.get("description"), requirements)
+        except (ValueError, TypeError) as exc:
+            yield rows.line_num, str(exc)
+
+
+PARSERS = {"jsonl": jsonl_records, "csv": csv_records}
+
+
+# -----------------------------
+# Writing
+# -----------------------------
+def resolve_requirements(index, requirements):
+    """
+    (text, level) pairs -> ([(domain_id, level)], unresolved texts).
+    Unresolved texts are kept with domain_id None. (role_id, domain_id) is
+    unique, so texts resolving to one domain keep the highest level.
+    """
+    rows, unresolved, by_domain = [], [], {}
+    for text, level in requirements:
+        domain_id = index.resolve(text)
+        if domain_id is None:
+            unresolved.append(text)
+            rows.append((None, level))
+        elif domain_id not in by_domain or (level or 0) > (by_domain[domain_id] or 0):
+            by_domain[domain_id] = level
+    rows += by_domain.items()
+    return rows, unresolved
+
+
+def write_batch(db, company_id, records, index, stats):
+    role_ids = db.scalars(
+        insert(JobRole).returning(JobRole.role_id, sort_by_parameter_order=True),
+        [{"company_id": company_id, "title": r["title"], "description": r["description"]} for r in records],
+    ).all()
+
+    requirements = []
+    for role_id, record in zip(role_ids, records):
+        resolved, unresolved = resolve_requirements(index, record["requirements"])
+        stats["resolved"] += len(record["requirements"]) - len(unresolved)
+        stats["unresolved_count"] += len(unresolved)
+        stats["unresolved"] += unresolved[:MAX_UNRESOLVED - len(stats["unresolved"])]
+        requirements += [
+            {"role_id": role_id, "domain_id": domain_id, "minimum_level": level}
+            for domain_id, level in resolved
+        ]
+    if requirements:
+        db.execute(insert(JobRoleRequirement), requirements)
+
+    # core inserts skip the flush hooks, so flag the new roles for rescoring
+    match_tracker.mark_dirty(db, role_ids=role_ids)
+    db.commit()
+    stats["roles"] += len(role_ids)
+    stats["requirements"] += len(requirements)
+
+
+def import_roles(stream, fmt, company_id, batch_size=BATCH):
+    """Parse and write roles from a binary stream; returns a summary."""
+    stats = {
+        "roles": 0, "requirements": 0, "resolved": 0,
+        "unresolved_count": 0, "unresolved": [],
+        "error_count": 0, "errors": [],
+    }
+    with SessionLocal() as db:
+        index = domain_registry.index(db)
+        batch = []
+        try:
+            for line, record in PARSERS[fmt](stream):
+                if isinstance(record, str):
+                    stats["error_count"] += 1
+                    if len(stats["errors"]) < MAX_ERRORS:
+                        stats["errors"].append({"line": line, "error": record})
+                    continue
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    write_batch(db, company_id, batch, index, stats)
+                    batch = []
+            if batch:
+                write_batch(db, company_id, batch, index, stats)
+        except UnicodeDecodeError:
+            stats["error_count"] += 1
+            stats["errors"].append({"line": None, "error": "body is not UTF-8"})
+        finally:
+            if stats["roles"]:
+                match_index.forget_company(company_id)
+                role_cache.invalidate(company_ids=[company_id])
+    return stats
@@ -0,0 +1,204 @@
+# grading sandbox worker
+# Started (and kept warm) by grading.SandboxPool as `python -I sandbox_worker.py`.
+# Reads one JSON job per line on stdin and answers with one JSON line on stdout.
+# Jobs carry the code and each test's stdin / expression only; the expected
+# outputs stay in the API process, which compares the outputs reported here.
+# Each job runs in a forked child that is cut off before any submitted code
+# runs: empty environment and working directory, new session, no network
+# namespace where the kernel allows it, rlimits, unprivileged uid when
+# started as root, and an audit hook that refuses sockets, subprocesses,
+# signals, file writes and reads outside the Python installation.
+import builtins
+import ctypes
+import io
+import json
+import os
+import resource
+import select
+import signal
+import sys
+import time
+
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+NOBODY = 65534
+NICE = 10
+
+# captured stdout / repr kept per test
+MAX_OUTPUT = 64 * 1024
+
+BLOCKED_EVENTS = {
+    "socket.__new__", "socket.connect", "socket.bind", "socket.getaddrinfo",
+    "subprocess.Popen", "os.system", "os.exec", "os.posix_spawn", "os.spawn",
+    "os.fork", "os.forkpty", "os.kill", "os.killpg", "signal.pthread_kill",
+    "resource.setrlimit", "ctypes.dlopen", "ctypes.dlsym", "ctypes.cdata",
+    "os.remove", "os.rename", "os.rmdir", "os.mkdir", "os.chmod", "os.chown",
+    "shutil.rmtree", "os.truncate",
+}
+WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_TRUNC | os.O_APPEND
+
+# the only trees files may be opened from: the stdlib and site-packages
+READ_PREFIXES = tuple(sorted({
+    os.path.join(os.path.realpath(prefix), "")
+    for prefix in (sys.prefix, sys.base_prefix, sys.exec_prefix, sys.base_exec_prefix)
+}))
+
+
+def _audit(event, args):
+    if event in BLOCKED_EVENTS:
+        raise PermissionError(f"{event} is not allowed in the grader")
+    # reads of the Python installation (imports) are fine, anything else is not
+    if event == "open":
+        path, mode = args[0], args[1] if len(args) > 1 else None
+        flags = args[2] if len(args) > 2 else 0
+        if (isinstance(mode, str) and any(c in mode for c in "wax+")) or (
+            isinstance(flags, int) and flags & WRITE_FLAGS
+        ):
+            raise PermissionError("writing files is not allowed in the grader")
+        if isinstance(path, int):
+            return
+        if not os.fsdecode(os.path.realpath(path)).startswith(READ_PREFIXES):
+            raise PermissionError("reading files outside the Python installation is not allowed in the grader")
+
+
+# -----------------------------
+# Child: restrict, then run the tests
+# -----------------------------
+def _isolate(limits):
+    os.setsid()
+    # /dev/null on 0-2 so submitted code cannot write into the job protocol
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+    os.environ.clear()
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    root = os.geteuid() == 0
+    # best effort: an empty network namespace; the audit hook covers the rest
+    libc.unshare(CLONE_NEWNET if root else CLONE_NEWUSER | CLONE_NEWNET)
+
+    cpu = int(limits["timeout"]) + 1
+    memory = limits["memory_mb"] * 1024 * 1024
+    for name, value in (
+        (resource.RLIMIT_CPU, cpu),
+        (resource.RLIMIT_AS, memory),
+        (resource.RLIMIT_FSIZE, 0),
+        (resource.RLIMIT_CORE, 0),
+        (resource.RLIMIT_NOFILE, 64),
+    ):
+        resource.setrlimit(name, (value, value))
+
+    if root:
+        os.setgroups([])
+        os.setgid(NOBODY)
+        os.setuid(NOBODY)
+        resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    sys.addaudithook(_audit)
+
+
+def _run_tests(code, inputs):
+    """stdout / repr / error per test; each test gets a fresh namespace."""
+    try:
+        compiled = compile(code, "<submission>", "exec")
+    except (SyntaxError, ValueError) as e:
+        return [{"error": type(e).__name__} for _ in inputs]
+
+    outputs = []
+    for stdin_text, expression in inputs:
+        out = io.StringIO()
+        sys.stdin, sys.stdout, sys.stderr = io.StringIO(stdin_text), out, io.StringIO()
+        result = {}
+        try:
+            namespace = {"__name__": "__main__", "__builtins__": builtins}
+            try:
+                exec(compiled, namespace)
+            except SystemExit as e:
+                if e.code not in (None, 0):
+                    raise
+            if expression:
+                result["value"] = repr(eval(expression, namespace))[:MAX_OUTPUT]
+        except BaseException as e:
+            result["error"] = type(e).__name__
+        result["stdout"] = out.getvalue()[:MAX_OUTPUT]
+        outputs.append(result)
+    return outputs
+
+
+def _child(job, wfd):
+    code = job["code"]
+    inputs = [(t.get("stdin") or "", t.get("expression")) for t in job["tests"]]
+    limits = job["limits"]
+    job.clear()
+    # bound before any submitted code runs, so patching json, os or
+    # sys.modules cannot change how the outputs are reported
+    dumps, write = json.dumps, os.write
+    _isolate(limits)
+    outputs = _run_tests(code, inputs)
+    write(wfd, dumps(outputs).encode())
+    os._exit(0)
+
+
+# -----------------------------
+# Worker: fork per job, enforce the wall clock, collect outputs
+# -----------------------------
+def grade(job):
+    """{"status", "outputs"}; outputs is one dict per test, empty unless the child finished."""
+    tests = job["tests"]
+    timeout = job["limits"]["timeout"]
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        try:
+            _child(job, w)
+        finally:
+            os._exit(1)
+    os.close(w)
+
+    chunks, deadline, timed_out = [], time.monotonic() + timeout, False
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            break
+        ready, _, _ = select.select([r], [], [], remaining)
+        if ready:
+            chunk = os.read(r, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    os.close(r)
+    if timed_out:
+        os.kill(pid, signal.SIGKILL)
+    _, status = os.waitpid(pid, 0)
+
+    if timed_out or os.WIFSIGNALED(status):
+        state = "timeout" if timed_out or os.WTERMSIG(status) in (signal.SIGKILL, signal.SIGXCPU) else "crashed"
+        return {"status": state, "outputs": []}
+    try:
+        outputs = json.loads(b"".join(chunks))
+    except ValueError:
+        return {"status": "crashed", "outputs": []}
+    if not isinstance(outputs, list) or len(outputs) != len(tests):
+        return {"status": "crashed", "outputs": []}
+
+    outputs = [o if isinstance(o, dict) else {"error": "?"} for o in outputs]
+    errors = {o.get("error") for o in outputs} - {None}
+    state = "ok" if not errors else ("memory" if "MemoryError" in errors else "error")
+    return {"status": state, "outputs": outputs}
+
+
+def main():
+    # graders yield the CPU to the API process; children inherit this
+    os.nice(NICE)
+    for line in sys.stdin:
+        job = json.loads(line)
+        del line
+        result = grade(job)
+        sys.stdout.write(json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
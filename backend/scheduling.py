@@ -0,0 +1,383 @@
+# recruiter scheduling index
+# One interval index per recruiter over its availability slots and scheduled
+# interviews, loaded lazily and kept in memory. Free-slot queries for a
+# company bisect into each recruiter's sorted free list, so they cost
+# O(log n + k) per recruiter instead of a scan. Session hooks drop a
+# recruiter's index when its slots or interviews change; booking itself is a
+# conditional UPDATE on is_booked, so it stays atomic across processes.
+import heapq
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate, islice
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import event, inspect, or_, select, update
+
+from db import SessionLocal
+from models import Interview, InterviewStatus, Recruiter, RecruiterAvailability
+from notification_outbox import outbox
+
+# length assumed for an interview scheduled outside a slot
+INTERVIEW_LENGTH = timedelta(minutes=int(os.getenv("INTERVIEW_MINUTES", "60")))
+
+# schedules older than this are reloaded, bounding staleness when another
+# process books or adds slots
+MAX_AGE_SECONDS = 60
+
+# interviews in these states no longer hold the recruiter's time
+INACTIVE = (InterviewStatus.cancelled,)
+
+
+def parse_time(value: Optional[str], field: str) -> Optional[datetime]:
+    """ISO datetime string from the API -> datetime for the DateTime columns."""
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{field} must be an ISO datetime")
+    # columns hold naive UTC, like the utcnow defaults in models.py
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+class IntervalIndex:
+    """
+    Static interval index: intervals sorted by start, plus a running maximum
+    of their ends. Any interval starting before `b` with an end past `a`
+    overlaps [a, b), so an overlap test is one bisect and one lookup.
+    """
+
+    def __init__(self, intervals):
+        # intervals: (start, end, key)
+        self.items = sorted(intervals)
+        self.starts = [start for start, _, _ in self.items]
+        self.max_end = list(accumulate((end for _, end, _ in self.items), max))
+
+    def __len__(self):
+        return len(self.items)
+
+    def overlaps(self, a, b) -> bool:
+        i = bisect_left(self.starts, b)
+        return i > 0 and self.max_end[i - 1] > a
+
+    def starting_within(self, t1, t2):
+        """Intervals with t1 <= start and end <= t2, by start."""
+        i = bisect_left(self.starts, t1)
+        while i < len(self.items) and self.starts[i] < t2:
+            item = self.items[i]
+            if item[1] <= t2:
+                yield item
+            i += 1
+
+
+class RecruiterSchedule:
+    def __init__(self, slots, booked_slots, interviews):
+        # every slot, booked or not, for overlap checks on new slots
+        self.slots = IntervalIndex(slots)
+        self.busy = IntervalIndex(interviews)
+        # bookable: not flagged booked and not overlapped by an interview
+        self.free = IntervalIndex(
+            s for s in slots if s[2] not in booked_slots and not self.busy.overlaps(s[0], s[1])
+        )
+        self.loaded_at = time.monotonic()
+
+    def conflicts(self, start, end) -> bool:
+        return self.slots.overlaps(start, end) or self.busy.overlaps(start, end)
+
+
+class ScheduleIndex:
+    def __init__(self, max_age=MAX_AGE_SECONDS):
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._schedules = {}
+        self._company_recruiters = {}
+        self._writers = {}
+
+    # -----------------------------
+    # Loading
+    # -----------------------------
+    def _load(self, db, recruiter_id):
+        a = RecruiterAvailability
+        slots, booked = [], set()
+        for slot_id, start, end, is_booked in db.execute(
+            select(a.availability_id, a.start_time, a.end_time, a.is_booked)
+            .where(a.recruiter_id == recruiter_id, a.start_time.isnot(None), a.end_time.isnot(None))
+        ):
+            slots.append((start, end, slot_id))
+            if is_booked:
+                booked.add(slot_id)
+        interviews = [
+            (t, t + INTERVIEW_LENGTH, interview_id)
+            for interview_id, t in db.execute(
+                select(Interview.interview_id, Interview.scheduled_time).where(
+                    Interview.recruiter_id == recruiter_id,
+                    Interview.scheduled_time.isnot(None),
+                    or_(Interview.status.is_(None), Interview.status.notin_(INACTIVE)),
+                )
+            )
+        ]
+        return RecruiterSchedule(slots, booked, interviews)
+
+    def schedule(self, db, recruiter_id) -> RecruiterSchedule:
+        with self._lock:
+            entry = self._schedules.get(recruiter_id)
+            if entry is None or time.monotonic() - entry.loaded_at > self.max_age:
+                entry = self._schedules[recruiter_id] = self._load(db, recruiter_id)
+            return entry
+
+    def company_recruiters(self, db, company_id):
+        with self._lock:
+            recruiters = self._company_recruiters.get(company_id)
+            if recruiters is None:
+                recruiters = db.execute(
+                    select(Recruiter.recruiter_id).where(Recruiter.company_id == company_id)
+                ).scalars().all()
+                self._company_recruiters[company_id] = recruiters
+            return recruiters
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def free_slots(self, db, company_id, t1, t2, limit=100):
+        """
+        Up to `limit` (all when None) free (start, end, availability_id,
+        recruiter_id) slots of the company's recruiters inside [t1, t2],
+        earliest first.
+        """
+        def stream(recruiter_id):
+            for start, end, slot_id in self.schedule(db, recruiter_id).free.starting_within(t1, t2):
+                yield start, end, slot_id, recruiter_id
+
+        streams = [stream(r) for r in self.company_recruiters(db, company_id)]
+        return list(islice(heapq.merge(*streams), limit))
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+    def writer(self, recruiter_id):
+        """
+        Lock held around check-then-insert of a recruiter's slot, so two
+        requests in this process cannot both pass the overlap check.
+        """
+        with self._lock:
+            return self._writers.setdefault(recruiter_id, threading.Lock())
+
+    def invalidate(self, recruiter_ids=None):
+        """Drop cached schedules (all of them when recruiter_ids is None)."""
+        with self._lock:
+            if recruiter_ids is None:
+                self._schedules.clear()
+            else:
+                for recruiter_id in recruiter_ids:
+                    self._schedules.pop(recruiter_id, None)
+
+    def forget_company(self, company_id):
+        with self._lock:
+            self._company_recruiters.pop(company_id, None)
+
+
+index = ScheduleIndex()
+
+
+def book_slot(db, recruiter_id, slot_id) -> bool:
+    """
+    Mark one of the recruiter's free slots booked. Only one caller can win:
+    the UPDATE matches is_booked = false at most once. Lands with the
+    caller's commit.
+    """
+    booked = db.execute(
+        update(RecruiterAvailability)
+        .where(
+            RecruiterAvailability.availability_id == slot_id,
+            RecruiterAvailability.recruiter_id == recruiter_id,
+            RecruiterAvailability.is_booked.isnot(True),
+        )
+        .values(is_booked=True)
+    )
+    mark_dirty(db, [recruiter_id])
+    return booked.rowcount == 1
+
+
+def book_overlapping(db, recruiter_id, start, end):
+    """Flag the recruiter's slots that an interview at [start, end) takes up."""
+    db.execute(
+        update(RecruiterAvailability)
+        .where(
+            RecruiterAvailability.recruiter_id == recruiter_id,
+            RecruiterAvailability.start_time < end,
+            RecruiterAvailability.end_time > start,
+        )
+        .values(is_booked=True)
+    )
+    mark_dirty(db, [recruiter_id])
+
+
+def add_interview(db, recruiter_id, candidate_id, role, scheduled_time) -> Interview:
+    """
+    Create and commit an interview for `role` (a request when scheduled_time
+    is None) and notify the candidate. A scheduled one may not overlap the
+    recruiter's other interviews (409) and takes up the slots it overlaps.
+    """
+    status = "scheduled" if scheduled_time else "requested"
+    with index.writer(recruiter_id):
+        if scheduled_time:
+            end = scheduled_time + INTERVIEW_LENGTH
+            if index.schedule(db, recruiter_id).busy.overlaps(scheduled_time, end):
+                raise HTTPException(status_code=409, detail="Recruiter already has an interview at that time")
+        interview = Interview(
+            candidate_id=candidate_id,
+            recruiter_id=recruiter_id,
+            role_id=role.role_id,
+            scheduled_time=scheduled_time,
+            status=status,
+        )
+        db.add(interview)
+        if scheduled_time:
+            # the recruiter's slots covering this time are no longer bookable
+            book_overlapping(db, recruiter_id, scheduled_time, end)
+        db.commit()
+    outbox.post(candidate_id, "interview", f"Interview {status} for role: {role.title}")
+    return interview
+
+
+def release_overlapping(db, recruiter_id, interview_id, start, end):
+    """
+    Reopen the slots a cancelled interview at [start, end) took up, except
+    those another active interview still overlaps.
+    """
+    others = IntervalIndex(
+        (t, t + INTERVIEW_LENGTH, other_id)
+        for other_id, t in db.execute(
+            select(Interview.interview_id, Interview.scheduled_time).where(
+                Interview.recruiter_id == recruiter_id,
+                Interview.interview_id != interview_id,
+                Interview.scheduled_time > start - INTERVIEW_LENGTH,
+                Interview.scheduled_time < end + INTERVIEW_LENGTH,
+                or_(Interview.status.is_(None), Interview.status.notin_(INACTIVE)),
+            )
+        )
+    )
+    a = RecruiterAvailability
+    slot_ids = [
+        slot_id
+        for slot_id, slot_start, slot_end in db.execute(
+            select(a.availability_id, a.start_time, a.end_time).where(
+                a.recruiter_id == recruiter_id, a.start_time < end, a.end_time > start, a.is_booked.is_(True)
+            )
+        )
+        if not others.overlaps(slot_start, slot_end)
+    ]
+    if slot_ids:
+        db.execute(update(a).where(a.availability_id.in_(slot_ids)).values(is_booked=False))
+        mark_dirty(db, [recruiter_id])
+
+
+def claim_slots(db, slot_ids) -> set:
+    """
+    Bulk book_slot: one conditional UPDATE over `slot_ids`, returning the ids
+    this caller won. Slots someone else booked first are left out.
+    """
+    a = RecruiterAvailability
+    claimed = db.execute(
+        update(a)
+        .where(a.availability_id.in_(slot_ids), a.is_booked.isnot(True))
+        .values(is_booked=True)
+        .returning(a.availability_id, a.recruiter_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    mark_dirty(db, {recruiter_id for _, recruiter_id in claimed})
+    return {slot_id for slot_id, _ in claimed}
+
+
+def assign(slots, candidate_ids, busy):
+    """
+    Greedy by score: each candidate, in rank order, takes the earliest
+    remaining slot that does not clash with their own interviews (`busy`:
+    candidate_id -> IntervalIndex). Slots are interchangeable apart from
+    their time, so this is also the min-cost matching when earlier slots
+    are worth more to higher-ranked candidates.
+    Returns ([(candidate_id, slot)], unassigned candidate ids).
+    """
+    remaining = list(slots)
+    pairs, unassigned = [], []
+    for candidate_id in candidate_ids:
+        own = busy.get(candidate_id)
+        for i, slot in enumerate(remaining):
+            if own is None or not own.overlaps(slot[0], slot[1]):
+                pairs.append((candidate_id, remaining.pop(i)))
+                break
+        else:
+            unassigned.append(candidate_id)
+    return pairs, unassigned
+
+
+def auto_schedule(db, company_id, candidate_ids, busy, t1, t2):
+    """
+    Assign ranked candidates to the company's free slots in [t1, t2] and
+    claim them, all inside the caller's transaction. A candidate whose slot
+    was taken concurrently is retried against the slots still left.
+    Returns ([(candidate_id, (start, end, slot_id, recruiter_id))], unassigned).
+    """
+    slots = index.free_slots(db, company_id, t1, t2, limit=None)
+    booked, unassigned, pending = [], [], list(candidate_ids)
+    while pending and slots:
+        pairs, misfits = assign(slots, pending, busy)
+        unassigned.extend(misfits)
+        claimed = claim_slots(db, [slot[2] for _, slot in pairs]) if pairs else set()
+        booked.extend((c, slot) for c, slot in pairs if slot[2] in claimed)
+        tried = {slot[2] for _, slot in pairs}
+        slots = [slot for slot in slots if slot[2] not in tried]
+        pending = [c for c, slot in pairs if slot[2] not in claimed]
+    unassigned.extend(pending)
+    return booked, unassigned
+
+
+# -----------------------------
+# Invalidation hooks
+# -----------------------------
+_INFO_KEY = "schedule_dirty"
+
+
+def _dirty(session):
+    return session.info.setdefault(_INFO_KEY, {"recruiters": set(), "companies": set()})
+
+
+def mark_dirty(session, recruiter_ids=()):
+    """Flag schedules to drop when `session` commits (for bulk updates)."""
+    _dirty(session)["recruiters"].update(i for i in recruiter_ids if i is not None)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_dirty(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (RecruiterAvailability, Interview)):
+            history = inspect(obj).attrs.recruiter_id.history
+            _dirty(session)["recruiters"].update(i for i in history.sum() if i is not None)
+        elif isinstance(obj, Recruiter):
+            history = inspect(obj).attrs.company_id.history
+            _dirty(session)["companies"].update(i for i in history.sum() if i is not None)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _dispatch_dirty(session):
+    dirty = session.info.pop(_INFO_KEY, None)
+    if dirty:
+        if dirty["recruiters"]:
+            index.invalidate(dirty["recruiters"])
+        for company_id in dirty["companies"]:
+            index.forget_company(company_id)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_dirty(session):
+    session.info.pop(_INFO_KEY, None)
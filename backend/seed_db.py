@@ -10,7 +10,7 @@ from datetime import datetime
 
 
 from sqlalchemy.orm import sessionmaker
-from models import Base, TechnicalDomain, Course, Assessment, Level, Task
+from models import Base, TechnicalDomain, Course, Assessment, Level, Task, TaskTestCase
 from db import engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -27,6 +27,7 @@ db.query(JobRole).delete()
 db.query(Recruiter).delete()
 db.query(Company).delete()
 db.query(CandidateAssessment).delete()
+db.query(TaskTestCase).delete()
 db.query(Task).delete()
 db.query(Level).delete()
 db.query(Assessment).delete()
@@ -247,13 +248,20 @@ db.add(task3_4_3)
 db.add(task3_4_4)
 db.commit()
 
-# Seed users
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hidden test cases for server-side grading (/assessments/submit)
+# Only tasks whose expected output or function name is fixed by the prompt.
+test_cases = [
+    TaskTestCase(task_id=task1_3.task_id, expected="Hello, World!"),
+    TaskTestCase(task_id=task2_4.task_id, expected="\n".join(str(i) for i in range(1, 11))),
+    TaskTestCase(task_id=task3_3.task_id, expression="greet('Ada')", expected=repr("Hello, Ada!")),
+    TaskTestCase(task_id=task3_3.task_id, expression="greet('World')", expected=repr("Hello, World!")),
+    TaskTestCase(task_id=task3_3.task_id, expression="greet('')", expected=repr("Hello, !")),
+]
+db.add_all(test_cases)
+db.commit()
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+# Seed users
+from passwords import hash_password
 
 # Candidates
 candidate1 = User(
@@ -0,0 +1,123 @@
+# signed session tokens
+# /auth/login issues an HS256 JWT carrying the caller's user_id, role and,
+# for recruiters, recruiter_id and company_id. Requests present it as
+# "Authorization: Bearer <token>" and it is checked with one HMAC, so
+# endpoints learn who is calling (and which company they act for) without a
+# database lookup. The claims are a snapshot: a recruiter moved to another
+# company keeps the old company_id until the token expires.
+#
+# SESSION_SECRET (required): the HMAC key, shared by every worker; a long
+# random string, e.g. `python -c "import secrets; print(secrets.token_hex(32))"`.
+# Without it the apps refuse to start (require_secret runs in their startup
+# hooks), unless SESSION_INSECURE_DEV=1 is set for local development, which
+# signs with a random per-process key (tokens stop verifying on restart and
+# across workers). Scripts that only import the models can run without it.
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+# lifetime of an issued token
+TTL_SECONDS = int(os.getenv("SESSION_TOKEN_TTL_SECONDS", str(12 * 3600)))
+
+
+def _load_secret() -> Optional[bytes]:
+    secret = os.getenv("SESSION_SECRET")
+    if secret:
+        return secret.encode()
+    if os.getenv("SESSION_INSECURE_DEV") != "1":
+        return None
+    log.warning("SESSION_SECRET is not set; using a random per-process secret (SESSION_INSECURE_DEV=1)")
+    return secrets.token_bytes(32)
+
+
+SECRET = _load_secret()
+
+
+def require_secret():
+    """Startup check: refuse to serve without a signing key."""
+    if SECRET is None:
+        raise RuntimeError("SESSION_SECRET is not set (SESSION_INSECURE_DEV=1 allows a throwaway key in development)")
+
+
+class InvalidToken(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Identity:
+    user_id: int
+    role: str
+    recruiter_id: Optional[int]
+    company_id: Optional[int]
+    expires_at: int  # unix seconds
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _json(value) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+# the only header this module issues or accepts, so there is no "alg" to negotiate
+_HEADER = _b64(_json({"alg": "HS256", "typ": "JWT"}))
+
+
+def _sign(signing_input: str, secret: Optional[bytes]) -> str:
+    secret = secret or SECRET
+    if secret is None:
+        require_secret()
+    return _b64(hmac.new(secret, signing_input.encode(), hashlib.sha256).digest())
+
+
+def issue(user_id: int, role: str, recruiter_id=None, company_id=None, ttl=TTL_SECONDS, now=None, secret=None):
+    """(token, expires_at unix seconds) for the given identity."""
+    expires_at = int(now if now is not None else time.time()) + ttl
+    claims = {"sub": str(user_id), "role": role, "exp": expires_at}
+    if recruiter_id is not None:
+        claims["rid"] = recruiter_id
+        claims["cid"] = company_id
+    signing_input = f"{_HEADER}.{_b64(_json(claims))}"
+    return f"{signing_input}.{_sign(signing_input, secret)}", expires_at
+
+
+def verify(token: str, now=None, secret=None) -> Identity:
+    """Identity from a token this module issued; raises InvalidToken otherwise."""
+    # issued tokens are base64url; anything else (non-ASCII included) cannot match
+    if not token.isascii():
+        raise InvalidToken("Malformed token")
+    try:
+        header, payload, signature = token.split(".")
+    except ValueError:
+        raise InvalidToken("Malformed token")
+    expected = _sign(f"{header}.{payload}", secret)
+    if header != _HEADER or not hmac.compare_digest(signature.encode(), expected.encode()):
+        raise InvalidToken("Invalid token")
+    try:
+        claims = json.loads(_unb64(payload))
+        identity = Identity(
+            user_id=int(claims["sub"]),
+            role=claims["role"],
+            recruiter_id=claims.get("rid"),
+            company_id=claims.get("cid"),
+            expires_at=int(claims["exp"]),
+        )
+    except (ValueError, KeyError, TypeError):
+        raise InvalidToken("Invalid token")
+    if identity.expires_at <= (now if now is not None else time.time()):
+        raise InvalidToken("Token expired")
+    return identity
@@ -0,0 +1,454 @@
+# durable grading queue behind /assessments/submit
+# Submissions are written to submission_jobs and acknowledged straight away; a
+# dispatcher on the event loop claims them in due_at order (timed assessments
+# closest to their limit first), grades them through the grade cache / sandbox
+# pool and records the score. Depth is bounded: past MAX_DEPTH queued jobs,
+# submit answers 429 with a Retry-After estimated from recent grading speed.
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import and_, exists, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import grading
+from async_db import AsyncSessionLocal
+from grade_cache import cache as grade_cache
+from matching import PASS_SCORE
+from models import (
+    Assessment,
+    CandidateAssessment,
+    CandidateTaskProgress,
+    Level,
+    SubmissionJob,
+    Task,
+    TaskTestCase,
+)
+
+log = logging.getLogger(__name__)
+
+# queued jobs accepted before submit starts answering 429
+MAX_DEPTH = int(os.getenv("SUBMISSION_QUEUE_DEPTH", "2000"))
+
+# jobs handed to the sandbox pool at once; a couple per worker keeps it busy
+IN_FLIGHT = int(os.getenv("SUBMISSION_IN_FLIGHT", str(grading.WORKERS * 2)))
+
+# untimed tasks are ordered as if due this far after submission
+UNTIMED_SLACK = timedelta(hours=6)
+
+# a running job not finished within this long is assumed lost and requeued
+LEASE = timedelta(seconds=max(60, grading.TIMEOUT_SECONDS * 10))
+
+# grading attempts before a job is marked failed
+MAX_ATTEMPTS = 3
+
+# queue depth is re-counted at most this often; in between it is tracked locally
+DEPTH_REFRESH_SECONDS = 0.5
+
+# per-task submission rules (type, tests present, time limit) are reloaded after this long
+TASK_RULES_TTL = 60.0
+
+# idle dispatcher re-checks the table this often (other processes may enqueue)
+POLL_SECONDS = 1.0
+
+class QueueFull(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Grading queue is full")
+        self.retry_after = retry_after
+
+
+def answer_hash(answer_text: str) -> str:
+    return hashlib.sha256(answer_text.encode()).hexdigest()
+
+
+def utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@dataclass
+class TaskRules:
+    type: str
+    has_tests: bool
+    time_limit: Optional[int]  # shortest active assessment limit on the course, minutes
+
+
+_task_rules = {}  # task_id -> (loaded_at, TaskRules)
+
+
+async def task_rules(db: AsyncSession, task_id: int) -> Optional[TaskRules]:
+    """What submit needs to know about a task, in one query; None for an unknown task."""
+    cached = _task_rules.get(task_id)
+    if cached is not None and time.monotonic() - cached[0] < TASK_RULES_TTL:
+        return cached[1]
+
+    has_tests = exists().where(TaskTestCase.task_id == Task.task_id)
+    limit = (
+        select(func.min(Assessment.time_limit_minutes))
+        .join(Level, Level.course_id == Assessment.course_id)
+        .where(Level.level_id == Task.level_id, Assessment.is_active.isnot(False))
+        .scalar_subquery()
+    )
+    row = (await db.execute(
+        select(Task.type, has_tests, limit).where(Task.task_id == task_id)
+    )).first()
+    rules = TaskRules(*row) if row is not None else None
+    _task_rules[task_id] = (time.monotonic(), rules)
+    return rules
+
+
+def due_at(now: datetime, limit_minutes, started_at=None) -> datetime:
+    """
+    When the candidate's time runs out. The client-reported start is clamped
+    to the last `limit_minutes`, so it can move a job up to "due now" at most.
+    """
+    if not limit_minutes:
+        return now + UNTIMED_SLACK
+    limit = timedelta(minutes=limit_minutes)
+    started = min(max(utc_naive(started_at or now), now - limit), now)
+    return started + limit
+
+
+async def record_score(db: AsyncSession, candidate_id: int, task_id: int, score: int):
+    """
+    Keep the candidate's best score for an assessment task. Results are keyed
+    by the task id, which is what load_course_progress in assessment.py reads
+    to unlock the next level; a pass also marks the task completed.
+    """
+    for attempt in range(2):
+        existing = await db.scalar(
+            select(CandidateAssessment).where(
+                CandidateAssessment.candidate_id == candidate_id,
+                CandidateAssessment.assessment_id == task_id,
+            )
+        )
+        if existing is None:
+            db.add(CandidateAssessment(
+                candidate_id=candidate_id,
+                assessment_id=task_id,
+                total_score=score,
+                completed_at=datetime.utcnow(),
+            ))
+        elif (existing.total_score or 0) < score:
+            existing.total_score = score
+            existing.completed_at = datetime.utcnow()
+
+        if score >= PASS_SCORE:
+            done = await db.scalar(
+                select(CandidateTaskProgress.id).where(
+                    CandidateTaskProgress.candidate_id == candidate_id,
+                    CandidateTaskProgress.task_id == task_id,
+                )
+            )
+            if done is None:
+                db.add(CandidateTaskProgress(candidate_id=candidate_id, task_id=task_id))
+
+        try:
+            await db.commit()
+            return
+        except IntegrityError:
+            # a concurrent submission inserted first; retry as an update
+            await db.rollback()
+            if attempt:
+                raise
+
+
+class SubmissionQueue:
+    def __init__(self, max_depth=MAX_DEPTH, in_flight=IN_FLIGHT):
+        self.max_depth = max_depth
+        self.in_flight = in_flight
+        self.job_seconds = 0.5  # moving average of time between completions while busy
+        self._last_done = None
+        self._depth = 0
+        self._depth_at = None
+        self._task = None
+        self._wake = None
+        self._grading = set()
+        # one writer at a time from this process: SQLite's busy handler backs
+        # off in sleeps of up to 100 ms, an asyncio queue does not
+        self._writes = asyncio.Lock()
+
+    # -----------------------------
+    # Producer side (request handlers)
+    # -----------------------------
+    async def depth(self, db: AsyncSession) -> int:
+        """Queued jobs, counted from the table every DEPTH_REFRESH_SECONDS."""
+        now = time.monotonic()
+        if self._depth_at is None or now - self._depth_at > DEPTH_REFRESH_SECONDS:
+            self._depth = await db.scalar(
+                select(func.count()).select_from(SubmissionJob).where(SubmissionJob.status == "queued")
+            )
+            self._depth_at = now
+        return self._depth
+
+    def retry_after(self, jobs_ahead: int) -> int:
+        """Seconds until `jobs_ahead` queued jobs are likely graded."""
+        return max(1, min(300, math.ceil(jobs_ahead * self.job_seconds)))
+
+    async def position(self, db: AsyncSession, job: SubmissionJob) -> int:
+        """Queued jobs that will be claimed before `job`."""
+        return await db.scalar(
+            select(func.count()).select_from(SubmissionJob).where(
+                SubmissionJob.status == "queued",
+                (SubmissionJob.due_at < job.due_at)
+                | and_(SubmissionJob.due_at == job.due_at, SubmissionJob.job_id < job.job_id),
+            )
+        )
+
+    async def enqueue(self, db: AsyncSession, candidate_id, task_id, answer_text, time_limit=None, started_at=None):
+        """
+        Queue a submission and return (job, created). A candidate has at most
+        one queued job per task: resubmitting replaces its answer, and sending
+        the latest answer again returns its job instead of grading it twice.
+        Raises QueueFull when MAX_DEPTH jobs are waiting.
+        """
+        digest = answer_hash(answer_text)
+        for attempt in range(3):
+            latest = await db.scalar(
+                select(SubmissionJob)
+                .where(SubmissionJob.candidate_id == candidate_id, SubmissionJob.task_id == task_id)
+                .order_by(SubmissionJob.job_id.desc())
+                .limit(1)
+                .execution_options(populate_existing=True)
+            )
+            if latest is not None and latest.answer_hash == digest and latest.status != "failed":
+                return latest, False
+
+            if latest is not None and latest.status == "queued":
+                # only while still queued; a job the dispatcher just claimed keeps its answer
+                async with self._writing(db):
+                    replaced = await db.execute(
+                        update(SubmissionJob)
+                        .where(SubmissionJob.job_id == latest.job_id, SubmissionJob.status == "queued")
+                        .values(answer_text=answer_text, answer_hash=digest)
+                    )
+                    await db.commit()
+                if replaced.rowcount:
+                    await db.refresh(latest)
+                    return latest, False
+                continue
+
+            depth = await self.depth(db)
+            if depth >= self.max_depth:
+                raise QueueFull(self.retry_after(depth))
+
+            now = datetime.utcnow()
+            job = SubmissionJob(
+                candidate_id=candidate_id,
+                task_id=task_id,
+                answer_text=answer_text,
+                answer_hash=digest,
+                status="queued",
+                due_at=due_at(now, time_limit, started_at),
+                attempts=0,
+                created_at=now,
+            )
+            try:
+                async with self._writing(db):
+                    db.add(job)
+                    await db.commit()
+            except IntegrityError:
+                # a concurrent resubmission queued first; fold into it
+                await db.rollback()
+                continue
+            self._depth += 1
+            self.notify()
+            return job, True
+        raise RuntimeError("submission kept racing with the dispatcher")
+
+    @asynccontextmanager
+    async def _writing(self, db: AsyncSession):
+        """
+        Hold the write lock. The session checks out its pooled connection
+        first, so nothing waits on the pool while holding the lock; callers
+        must not have a write already open on the session.
+        """
+        await db.connection()
+        async with self._writes:
+            yield
+
+    def notify(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    # -----------------------------
+    # Dispatcher
+    # -----------------------------
+    def start(self):
+        """Start dispatching on the running event loop (app startup)."""
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._writes = asyncio.Lock()
+            self._task = asyncio.create_task(self._dispatch(), name="submission-dispatcher")
+
+    async def stop(self):
+        """Cancel the dispatcher; jobs it was grading are requeued once their lease expires."""
+        tasks = [t for t in (self._task, *self._grading) if t is not None]
+        self._task, self._wake = None, None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _claim(self):
+        """Mark the next due job running and return its id (None when the queue is empty)."""
+        async with AsyncSessionLocal() as db:
+            next_job = (
+                select(SubmissionJob.job_id)
+                .where(SubmissionJob.status == "queued")
+                .order_by(SubmissionJob.due_at, SubmissionJob.job_id)
+                .limit(1)
+                .scalar_subquery()
+            )
+            async with self._writing(db):
+                job_id = await db.scalar(
+                    update(SubmissionJob)
+                    .where(SubmissionJob.job_id == next_job, SubmissionJob.status == "queued")
+                    .values(
+                        status="running",
+                        started_at=datetime.utcnow(),
+                        attempts=SubmissionJob.attempts + 1,
+                    )
+                    .returning(SubmissionJob.job_id)
+                )
+                await db.commit()
+            if job_id is not None:
+                self._depth = max(0, self._depth - 1)
+            return job_id
+
+    async def _requeue_stale(self):
+        """Jobs whose grader vanished (process restart, crash) go back to the queue."""
+        cutoff = datetime.utcnow() - LEASE
+        stale = and_(SubmissionJob.status == "running", SubmissionJob.started_at < cutoff)
+        newer = SubmissionJob.__table__.alias("newer")
+        sibling = exists().where(
+            newer.c.candidate_id == SubmissionJob.candidate_id,
+            newer.c.task_id == SubmissionJob.task_id,
+            newer.c.status == "queued",
+        )
+        async with AsyncSessionLocal() as db, self._writing(db):
+            await db.execute(
+                update(SubmissionJob)
+                .where(stale, SubmissionJob.attempts >= MAX_ATTEMPTS)
+                .values(status="failed", error="Grading did not finish", finished_at=datetime.utcnow())
+            )
+            # a newer queued answer for the same task supersedes the lost one
+            await db.execute(
+                update(SubmissionJob)
+                .where(stale, sibling)
+                .values(status="failed", error="Superseded by a newer submission", finished_at=datetime.utcnow())
+            )
+            requeued = await db.execute(update(SubmissionJob).where(stale).values(status="queued"))
+            await db.commit()
+            if requeued.rowcount:
+                log.warning("requeued %d stale grading jobs", requeued.rowcount)
+
+    async def _dispatch(self):
+        slots = asyncio.Semaphore(self.in_flight)
+        last_sweep = 0.0
+        while True:
+            try:
+                if time.monotonic() - last_sweep > LEASE.total_seconds() / 2:
+                    last_sweep = time.monotonic()
+                    await self._requeue_stale()
+
+                await slots.acquire()
+                job_id = await self._claim()
+                if job_id is None:
+                    slots.release()
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), POLL_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                task = asyncio.create_task(self._grade(job_id))
+                self._grading.add(task)
+                task.add_done_callback(self._grading.discard)
+                task.add_done_callback(lambda _: slots.release())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("submission dispatcher failed; retrying")
+                await asyncio.sleep(POLL_SECONDS)
+
+    async def _finish(self, db: AsyncSession, job_id, **values):
+        async with self._writing(db):
+            await db.execute(
+                update(SubmissionJob)
+                .where(SubmissionJob.job_id == job_id)
+                .values(finished_at=datetime.utcnow(), **values)
+            )
+            await db.commit()
+
+    def _completed(self):
+        now = time.monotonic()
+        # only gaps while other jobs were being graded measure throughput
+        if self._last_done is not None and len(self._grading) > 1:
+            self.job_seconds = 0.8 * self.job_seconds + 0.2 * (now - self._last_done)
+        self._last_done = now
+
+    async def _grade(self, job_id):
+        async with AsyncSessionLocal() as db:
+            job = await db.get(SubmissionJob, job_id)
+            candidate_id, task_id, attempts = job.candidate_id, job.task_id, job.attempts
+            tests = (await db.scalars(
+                select(TaskTestCase).where(TaskTestCase.task_id == task_id).order_by(TaskTestCase.test_id)
+            )).all()
+            try:
+                result = await grade_cache.grade(db, task_id, tests, job.answer_text)
+                # cache entry first; the score and the job status follow. The
+                # cache insert is already under way, so it commits outside the lock
+                await db.commit()
+                async with self._writing(db):
+                    await record_score(db, candidate_id, task_id, result.score)
+            except asyncio.CancelledError:
+                raise
+            except grading.GradingUnavailable as e:
+                await db.rollback()
+                await self._finish(db, job_id, status="failed", error=str(e))
+                return
+            except Exception as e:
+                log.exception("grading job %s failed", job_id)
+                await db.rollback()
+                if attempts >= MAX_ATTEMPTS:
+                    await self._finish(db, job_id, status="failed", error=type(e).__name__)
+                else:
+                    # back of its own priority slot; the unique index allows this
+                    # only while no newer answer is queued
+                    try:
+                        await db.execute(
+                            update(SubmissionJob).where(SubmissionJob.job_id == job_id).values(status="queued")
+                        )
+                        await db.commit()
+                    except IntegrityError:
+                        await db.rollback()
+                        await self._finish(db, job_id, status="failed", error="Superseded by a newer submission")
+                return
+
+            await self._finish(
+                db, job_id,
+                status="done", score=result.score, passed=result.passed,
+                total=result.total, result_status=result.status,
+            )
+        self._completed()
+
+    def metrics(self):
+        return {
+            "grading": len(self._grading),
+            "in_flight_limit": self.in_flight,
+            "max_depth": self.max_depth,
+            "job_seconds": round(self.job_seconds, 3),
+        }
+
+
+queue = SubmissionQueue()
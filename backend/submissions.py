@@ -0,0 +1,132 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import BaseModel, Field
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import grading
+from async_db import get_async_db
+from auth import current_identity
+from grade_cache import cache as grade_cache
+from models import GradeCacheEntry, SubmissionJob
+from session_tokens import Identity
+from submission_queue import QueueFull, queue, task_rules
+
+# largest accepted answer_text, in characters
+MAX_SOURCE_CHARS = 64 * 1024
+
+router = APIRouter(
+    prefix="/assessments",
+    tags=["assessments"]
+)
+
+# -----------------------------
+# Schemas
+# -----------------------------
+
+class SubmissionIn(BaseModel):
+    # the candidate is the caller (see current_identity)
+    task_id: int
+    answer_text: str = Field(max_length=MAX_SOURCE_CHARS)
+    # when the candidate opened a timed assessment; orders the grading queue
+    started_at: Optional[datetime] = None
+
+
+class SubmissionOut(BaseModel):
+    job_id: int
+    task_id: int
+    state: str  # queued / running / done / failed
+    position: Optional[int] = None  # queued jobs ahead of this one
+    score: Optional[int] = None
+    passed: Optional[int] = None
+    total: Optional[int] = None
+    status: Optional[str] = None  # grading outcome: ok / error / timeout / memory / crashed
+    error: Optional[str] = None
+
+# -----------------------------
+# Routes
+# -----------------------------
+
+def job_out(job: SubmissionJob, position=None) -> SubmissionOut:
+    return SubmissionOut(
+        job_id=job.job_id,
+        task_id=job.task_id,
+        state=job.status,
+        position=position,
+        score=job.score,
+        passed=job.passed,
+        total=job.total,
+        status=job.result_status,
+        error=job.error,
+    )
+
+
+async def pending_response(db: AsyncSession, job: SubmissionJob, response: Response, position=None) -> SubmissionOut:
+    """Queued/running jobs: 202 with a Location to poll and a Retry-After hint."""
+    if job.status == "running":
+        position = 0
+    elif job.status == "queued" and position is None:
+        position = await queue.position(db, job)
+    if job.status in ("queued", "running"):
+        response.status_code = 202
+        response.headers["Location"] = f"{router.prefix}/submissions/{job.job_id}"
+        response.headers["Retry-After"] = str(queue.retry_after(position + 1))
+    return job_out(job, position)
+
+
+@router.post("/submit", response_model=SubmissionOut)
+async def submit_assessment(
+    payload: SubmissionIn,
+    response: Response,
+    identity: Identity = Depends(current_identity),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rules = await task_rules(db, payload.task_id)
+    if rules is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if rules.type != "assessment":
+        raise HTTPException(status_code=400, detail="Only assessment tasks can be submitted")
+    if not rules.has_tests:
+        raise HTTPException(status_code=400, detail="This task has no server-side tests")
+
+    try:
+        job, created = await queue.enqueue(
+            db, identity.user_id, payload.task_id, payload.answer_text,
+            time_limit=rules.time_limit, started_at=payload.started_at,
+        )
+    except QueueFull as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        )
+
+    # a fresh job's exact position costs a count; the depth bounds it
+    position = max(0, await queue.depth(db) - 1) if created else None
+    return await pending_response(db, job, response, position)
+
+
+@router.get("/submissions/{job_id}", response_model=SubmissionOut)
+async def get_submission(
+    job_id: int,
+    response: Response,
+    identity: Identity = Depends(current_identity),
+    db: AsyncSession = Depends(get_async_db),
+):
+    job = await db.get(SubmissionJob, job_id)
+    # other candidates' jobs look the same as missing ones
+    if not job or job.candidate_id != identity.user_id:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    return await pending_response(db, job, response)
+
+
+@router.get("/grading/metrics")
+async def grading_metrics(db: AsyncSession = Depends(get_async_db)):
+    """Grade cache effectiveness for this process, plus the queue and sandbox backlog."""
+    return {
+        **grade_cache.metrics(),
+        "cache_entries": await db.scalar(select(func.count()).select_from(GradeCacheEntry)),
+        "sandbox_pending": grading.pool.pending,
+        "queue_depth": await queue.depth(db),
+        "queue": queue.metrics(),
+    }
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from datetime import datetime
+from async_db import read_handler
 from db import SessionLocal
 from models import User
+from passwords import HasherBusy, hasher
 
 def get_db():
     db = SessionLocal()
@@ -31,6 +37,32 @@ class UserOut(BaseModel):
     class Config:
         from_attributes = True
 
+# one GET /users/ row; only the requested fields are present
+class UserListItem(BaseModel):
+    user_id: Optional[int] = None
+    email: Optional[str] = None
+    role: Optional[str] = None
+    full_name: Optional[str] = None
+    is_active: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    last_login: Optional[datetime] = None
+
+# columns GET /users/ can project; password_hash is never listed
+LIST_FIELDS = {
+    "user_id": User.user_id,
+    "email": User.email,
+    "role": User.role,
+    "full_name": User.full_name,
+    "is_active": User.is_active,
+    "created_at": User.created_at,
+    "last_login": User.last_login,
+}
+# UserOut's fields, what the endpoint returned before projection
+DEFAULT_FIELDS = ["user_id", "email", "role", "is_active", "created_at"]
+
+# rows per fetch from the server-side cursor when streaming NDJSON
+STREAM_BATCH = 1000
+
 # creates a group of routes under /users
 router = APIRouter (
     prefix="/users",
@@ -43,11 +75,14 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    fake_hash = f"hashed-{user.password}"
+    try:
+        password_hash = hasher.hash(user.password)
+    except HasherBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
 
     db_user = User(
         email=user.email,
-        password_hash = fake_hash,
+        password_hash = password_hash,
         role=user.role,
         full_name=f"{user.first_name} {user.last_name}"
     )
@@ -58,13 +93,96 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
 
     return db_user
 
-@router.get("/", response_model=List[UserOut])
-def list_users(db: Session = Depends(get_db)):
-    return db.query(User).all()
+# -----------------------------
+# Listing helpers
+# -----------------------------
+def parse_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return DEFAULT_FIELDS
+    names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [n for n in names if n not in LIST_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return names or DEFAULT_FIELDS
+
+
+def parse_user_cursor(cursor: Optional[str]):
+    """Keyset cursor: the last user_id of the previous page."""
+    if cursor is None:
+        return None
+    try:
+        return int(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def user_rows_query(names, role=None, active=None, after=None, limit=None):
+    """Plain column rows in user_id order; user_id always comes first."""
+    columns = ["user_id"] + [n for n in names if n != "user_id"]
+    stmt = select(*(LIST_FIELDS[n] for n in columns)).order_by(User.user_id)
+    if role is not None:
+        stmt = stmt.where(User.role == role)
+    if active is not None:
+        stmt = stmt.where(User.is_active == active)
+    if after is not None:
+        stmt = stmt.where(User.user_id > after)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return columns, stmt
+
+
+def row_dict(columns, names, row) -> dict:
+    values = dict(zip(columns, row))
+    return {n: values[n].isoformat() if isinstance(values[n], datetime) else values[n] for n in names}
+
+
+@router.get("/", response_model=List[UserListItem], response_model_exclude_unset=True)
+def list_users(
+    role: Optional[str] = None,
+    active: Optional[bool] = None,
+    fields: Optional[str] = Query(None, description="comma-separated columns, default " + ",".join(DEFAULT_FIELDS)),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: Session = Depends(get_db),
+):
+    """
+    Users in user_id order, optionally filtered by role and is_active, with
+    only the requested columns. JSON responses are one keyset page; pass the
+    X-Next-Cursor header as `cursor` for the next. format=ndjson streams every
+    matching user after `cursor` as JSON lines in constant memory (no limit),
+    for exports.
+    """
+    names = parse_fields(fields)
+    after = parse_user_cursor(cursor)
+
+    if format == "ndjson":
+        columns, stmt = user_rows_query(names, role, active, after)
+
+        def stream():
+            # its own session: the request's is closed once the handler returns
+            with SessionLocal() as session:
+                result = session.execute(stmt.execution_options(yield_per=STREAM_BATCH))
+                for rows in result.partitions():
+                    yield "".join(json.dumps(row_dict(columns, names, row)) + "\n" for row in rows)
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    columns, stmt = user_rows_query(names, role, active, after, limit)
+    rows = db.execute(stmt).all()
+    # rows are already plain JSON; skip re-validating them through the model
+    response = Response(
+        content=json.dumps([row_dict(columns, names, row) for row in rows]),
+        media_type="application/json",
+    )
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = str(rows[-1][0])
+    return response
 
 @router.get("/{user_id}", response_model=UserOut)
+@read_handler
 def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.user_id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -12,4 +12,21 @@ if (typeof window !== 'undefined') {
 	window.RECRUITER_ID = RECRUITER_ID;
 }
 
+// send the session token from /auth/login with every backend call;
+// recruiter endpoints answer 401 without it
+if (typeof window !== 'undefined' && !window.fetch.withSessionToken) {
+	const baseFetch = window.fetch.bind(window);
+	window.fetch = (input, init = {}) => {
+		const token = localStorage.getItem('access_token');
+		const url = typeof input === 'string' ? input : input.url;
+		if (token && url.startsWith(API_BASE)) {
+			const headers = new Headers(init.headers || (input instanceof Request ? input.headers : {}));
+			if (!headers.has('Authorization')) headers.set('Authorization', `Bearer ${token}`);
+			init = { ...init, headers };
+		}
+		return baseFetch(input, init);
+	};
+	window.fetch.withSessionToken = true;
+}
+
 console.log("✅ api-config loaded", API_BASE, RECRUITER_ID);
\ No newline at end of file
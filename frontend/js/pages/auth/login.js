@@ -51,6 +51,7 @@ async function login() {
 
     // Success
     localStorage.setItem("user", JSON.stringify(data));
+    localStorage.setItem("access_token", data.access_token);
 
     if (data.role === "recruiter") {
       // save recruiter id (from backend) and expose globally for non-module pages
@@ -17,6 +17,13 @@ document.addEventListener("DOMContentLoaded", async () => {
     document.querySelector("h4").textContent = "Task Title";
     document.querySelector("p").textContent = "Task content here...";
 
+    // When the candidate opened this task; the server grades submissions
+    // closest to their time limit first
+    const startedKey = `assessment_started_${taskId}`;
+    if (!sessionStorage.getItem(startedKey)) {
+        sessionStorage.setItem(startedKey, new Date().toISOString());
+    }
+
     // Initialize CodeMirror
     const editor = CodeMirror.fromTextArea(document.getElementById("code-editor"), {
         lineNumbers: true,
@@ -81,28 +88,65 @@ sys.stderr = OutputCatcher()
         }
     });
 
+    // Grading is queued server-side: poll the submission until it is graded
+    async function waitForGrade(location, retryAfter) {
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, Math.max(1, retryAfter) * 1000));
+            const response = await fetch(`${API_BASE}${location}`);
+            const result = await response.json();
+            if (response.status !== 202) {
+                return result;
+            }
+            retryAfter = parseInt(response.headers.get("Retry-After") || "1");
+        }
+    }
+
     // Submit code
     submitBtn.addEventListener("click", async () => {
         const code = editor.getValue();
-        const userId = localStorage.getItem("user_id");
 
         try {
             const response = await fetch(`${API_BASE}/assessments/submit`, {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ candidate_id: parseInt(userId), task_id: parseInt(taskId), answer_text: code })
+                // the candidate comes from the session token (added by api-config)
+                body: JSON.stringify({
+                    task_id: parseInt(taskId),
+                    answer_text: code,
+                    started_at: sessionStorage.getItem(startedKey)
+                })
             });
 
-            const result = await response.json();
-            if (response.ok) {
-                alert("Submitted successfully! Score: " + (result.score || "N/A"));
-                window.location.href = "assessments.html";
-            } else {
+            let result = await response.json();
+            if (response.status === 429) {
+                alert("Grading is busy. Please submit again in " + response.headers.get("Retry-After") + " seconds.");
+                return;
+            }
+            if (!response.ok) {
                 alert("Submission failed: " + result.detail);
+                return;
+            }
+
+            if (response.status === 202) {
+                submitBtn.disabled = true;
+                submitBtn.textContent = "Grading...";
+                result = await waitForGrade(
+                    response.headers.get("Location"),
+                    parseInt(response.headers.get("Retry-After") || "1")
+                );
+            }
+            if (result.state === "failed") {
+                alert("Grading failed: " + result.error);
+                submitBtn.disabled = false;
+                submitBtn.textContent = "Submit";
+                return;
             }
+            sessionStorage.removeItem(startedKey);
+            alert("Submitted successfully! Score: " + (result.score ?? "N/A"));
+            window.location.href = "assessments.html";
         } catch (error) {
             console.error("Submit error:", error);
             alert("Error submitting. Please try again.");
         }
     });
-});
\ No newline at end of file
+});
@@ -4,24 +4,24 @@ document.addEventListener("DOMContentLoaded", () => {
     const resetBtn = document.getElementById("reset-interview-filters");
     const listContainer = document.querySelector('.interview-list');
 
-    // get candidate id from localStorage (set at login) or query param
-    const params = new URLSearchParams(window.location.search);
-    const candidateId = 1;
-    // const candidateId = params.get('candidate_id') || localStorage.getItem('user_id');
+    // candidate id from the login response; the feed only answers the
+    // signed-in candidate's own token
+    let candidateId = null;
+    try {
+        candidateId = JSON.parse(localStorage.getItem('user'))?.user_id || null;
+    } catch (e) {}
 
-    function renderInterviews(items) {
-        if (!listContainer) return;
-        if (!items || !items.length) {
-            listContainer.innerHTML = '<div class="muted">No interviews yet.</div>';
-            return;
-        }
+    // result filter -> recruiter decision on the server
+    const DECISIONS = { passed: 'advance', failed: 'reject' };
+    let nextCursor = null;
 
-        listContainer.innerHTML = items.map(i => `
-            <div class="interview-card" data-result="${i.status || ''}" data-type="${i.role_title || ''}">
+    function renderCard(i) {
+        return `
+            <div class="interview-card">
                 <div class="interview-header">
                     <div>
                         <h4>${i.role_title || 'Interview'}</h4>
-                        <p class="company">${i.role_title ? i.role_title : ''}</p>
+                        <p class="company">${i.company_name || ''}</p>
                         <p class="meta">Status: ${i.status || ''}</p>
                     </div>
                     <span class="result ${i.has_notes ? 'passed' : 'muted'}">${i.has_notes ? 'Feedback' : 'No Feedback'}</span>
@@ -30,52 +30,62 @@ document.addEventListener("DOMContentLoaded", () => {
                     <button class="secondary view-feedback" onclick="window.location.href='../../pages/candidate/interview-feedback.html?interview_id=${i.interview_id}'">View Feedback</button>
                 </div>
             </div>
-        `).join('');
+        `;
+    }
 
-        // Re-bind filters
-        applyFilters();
+    function renderInterviews(items, append) {
+        if (!listContainer) return;
+        if (!append) listContainer.innerHTML = '';
+        listContainer.querySelector('.load-more')?.remove();
+
+        if (!append && (!items || !items.length)) {
+            listContainer.innerHTML = '<div class="muted">No interviews yet.</div>';
+            return;
+        }
+
+        listContainer.insertAdjacentHTML('beforeend', items.map(renderCard).join(''));
+
+        if (nextCursor) {
+            const more = document.createElement('button');
+            more.className = 'secondary load-more';
+            more.textContent = 'Load more';
+            more.addEventListener('click', () => loadInterviews(true));
+            listContainer.appendChild(more);
+        }
     }
 
-    async function loadInterviews() {
+    async function loadInterviews(append = false) {
         if (!candidateId) {
             if (listContainer) listContainer.innerHTML = '<div class="muted">Please log in to see interviews.</div>';
             return;
         }
 
+        // filtering and paging happen server-side
+        const query = new URLSearchParams();
+        if (DECISIONS[resultFilter.value]) query.set('decision', DECISIONS[resultFilter.value]);
+        if (typeFilter.value !== 'all') query.set('role', typeFilter.value);
+        if (append && nextCursor) query.set('cursor', nextCursor);
+
         try {
-            const res = await fetch(`${API_BASE}/interviews/candidates/${candidateId}/interviews`);
+            // api-config.js adds the bearer token
+            const res = await fetch(`${API_BASE}/interviews/candidates/${candidateId}/interviews?${query}`);
             if (!res.ok) throw new Error('Failed to load interviews');
+            nextCursor = res.headers.get('X-Next-Cursor');
             const data = await res.json();
-            renderInterviews(data);
+            renderInterviews(data, append);
         } catch (err) {
             console.error('Failed to fetch interviews', err);
             if (listContainer) listContainer.innerHTML = '<div class="muted">Error loading interviews.</div>';
         }
     }
 
-    function applyFilters() {
-        const result = resultFilter.value;
-        const type = typeFilter.value;
-
-        const cards = document.querySelectorAll('.interview-card');
-        cards.forEach(card => {
-            const cardResult = card.dataset.result;
-            const cardType = card.dataset.type;
-
-            const resultMatch = result === 'all' || cardResult === result;
-            const typeMatch = type === 'all' || cardType.toLowerCase().includes(type.toLowerCase());
-
-            card.style.display = (resultMatch && typeMatch) ? 'block' : 'none';
-        });
-    }
-
-    resultFilter.addEventListener('change', applyFilters);
-    typeFilter.addEventListener('change', applyFilters);
+    resultFilter.addEventListener('change', () => loadInterviews());
+    typeFilter.addEventListener('change', () => loadInterviews());
 
     resetBtn.addEventListener('click', () => {
         resultFilter.value = 'all';
         typeFilter.value = 'all';
-        applyFilters();
+        loadInterviews();
     });
 
     // initial load
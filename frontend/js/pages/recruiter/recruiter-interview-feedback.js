@@ -54,7 +54,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // Load roles on page load so the user can pick a role if the query param is non-numeric
     async function loadRoles() {
-        if (!roleSelect) return;
+        if (!roleSelect) return [];
         roleSelect.innerHTML = '<option value="">Loading roles...</option>';
         try {
             const res = await fetch(`${API_BASE}/recruiters/${RECRUITER_ID}/roles`);
@@ -62,7 +62,7 @@ document.addEventListener('DOMContentLoaded', () => {
             const roles = await res.json();
             if (!roles || !roles.length) {
                 roleSelect.innerHTML = '<option value="">No roles available</option>';
-                return;
+                return [];
             }
             roleSelect.innerHTML = '<option value="">Select a role</option>' + roles.map(r => `\n                <option value="${r.role_id}">${r.title}</option>`).join('');
 
@@ -77,13 +77,16 @@ document.addEventListener('DOMContentLoaded', () => {
                     if (match) roleSelect.value = match.role_id;
                 }
             }
+            return roles;
         } catch (e) {
             console.warn('Failed to load roles', e);
             roleSelect.innerHTML = '<option value="">Error loading roles</option>';
+            return [];
         }
     }
 
-    loadRoles();
+    // the submit handler reuses this list instead of fetching it again
+    const rolesLoaded = loadRoles();
 
     // Restore draft if present
     const existingDraft = loadDraft();
@@ -194,15 +197,12 @@ document.addEventListener('DOMContentLoaded', () => {
                 if (/^\d+$/.test(role)) {
                     roleId = parseInt(role, 10);
                 } else {
-                    // fetch roles for recruiter and try to match by title or simple slug
+                    // match the roles loaded with the page by title or simple slug
                     try {
-                        const rolesRes = await fetch(`${API_BASE}/recruiters/${RECRUITER_ID}/roles`);
-                        if (rolesRes.ok) {
-                            const roles = await rolesRes.json();
-                            const lower = role.toLowerCase();
-                            const found = roles.find(r => (r.title && r.title.toLowerCase() === lower) || (r.title && r.title.toLowerCase().includes(lower)) || String(r.role_id) === role);
-                            if (found) roleId = found.role_id;
-                        }
+                        const roles = await rolesLoaded;
+                        const lower = role.toLowerCase();
+                        const found = roles.find(r => (r.title && r.title.toLowerCase() === lower) || (r.title && r.title.toLowerCase().includes(lower)) || String(r.role_id) === role);
+                        if (found) roleId = found.role_id;
                     } catch (e) {
                         // ignore lookup failures, we'll handle missing roleId below
                         console.warn('Role lookup failed', e);
@@ -0,0 +1,73 @@
+document.addEventListener("DOMContentLoaded", () => {
+    const listContainer = document.querySelector('.notifications-list');
+
+    // user id from the login response (falls back to the demo candidate)
+    let userId = 1;
+    try {
+        userId = JSON.parse(localStorage.getItem('user'))?.user_id || userId;
+    } catch (e) {}
+
+    let nextCursor = null;
+
+    function renderItem(n) {
+        const when = n.created_at ? new Date(n.created_at + 'Z').toLocaleString() : '';
+        return `
+            <div class="notification-item${n.is_read ? ' read' : ''}" data-id="${n.notification_id}">
+                <strong>${n.type === 'interview' ? 'Interview' : (n.type || 'Notification')}</strong>
+                <p>${n.message || ''} <span class="time">${when}</span></p>
+            </div>
+        `;
+    }
+
+    function renderMoreButton() {
+        listContainer.querySelector('.load-more')?.remove();
+        if (!nextCursor) return;
+        const more = document.createElement('button');
+        more.className = 'secondary load-more';
+        more.textContent = 'Load more';
+        more.addEventListener('click', () => loadNotifications(true));
+        listContainer.appendChild(more);
+    }
+
+    async function loadNotifications(append = false) {
+        const params = new URLSearchParams({ limit: '20' });
+        if (append && nextCursor) params.set('cursor', nextCursor);
+        try {
+            const res = await fetch(`${API_BASE}/notifications/users/${userId}?${params}`);
+            if (!res.ok) throw new Error(`HTTP ${res.status}`);
+            const items = await res.json();
+            nextCursor = res.headers.get('X-Next-Cursor');
+            if (!append) listContainer.innerHTML = '';
+            listContainer.querySelector('.load-more')?.remove();
+            if (!append && !items.length) {
+                listContainer.innerHTML = '<div class="muted">No notifications yet.</div>';
+                return;
+            }
+            listContainer.insertAdjacentHTML('beforeend', items.map(renderItem).join(''));
+            renderMoreButton();
+        } catch (err) {
+            console.error('Failed to load notifications', err);
+        }
+    }
+
+    // new notifications are pushed over SSE; the browser reconnects on its own.
+    // EventSource cannot send an Authorization header, so the token goes in the URL
+    function subscribe() {
+        const token = localStorage.getItem('access_token');
+        if (!window.EventSource || !token) return;
+        const params = new URLSearchParams({ token });
+        const source = new EventSource(`${API_BASE}/events/users/${userId}?${params}`);
+        source.addEventListener('notification', (e) => {
+            const n = JSON.parse(e.data);
+            listContainer.querySelector('.muted')?.remove();
+            listContainer.insertAdjacentHTML('afterbegin', renderItem(n));
+        });
+        // events were dropped while we lagged behind: reload the first page
+        source.addEventListener('resync', () => loadNotifications(false));
+    }
+
+    if (listContainer) {
+        loadNotifications(false);
+        subscribe();
+    }
+});